@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
 
 def create_ami(instance_id: str, ami_name: str, dry_run: bool = False) -> None:
     """
@@ -13,7 +16,7 @@ def create_ami(instance_id: str, ami_name: str, dry_run: bool = False) -> None:
         ami_name (str): The name to assign to the new AMI.
         dry_run (bool): If True, simulate the creation without making any changes.
     """
-    ec2 = boto3.client('ec2')
+    ec2 = get_client('ec2')
     try:
         response = ec2.create_image(
             InstanceId=instance_id,
@@ -1,33 +1,398 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import heapq
 import logging
+import os
+import sqlite3
 import sys
+import time
+from array import array
+from datetime import date, datetime, timedelta, timezone
 
-def get_aws_billing(start_date: str, end_date: str) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'aws-billing', 'costs.sqlite3')
+
+class CostCache:
+    """
+    SQLite cache of daily Cost Explorer results keyed by account, day, metric and group-by dimensions.
+
+    `fetched_days` records every day that has been fetched, including days without any
+    cost, so that a fetched day is never requested again just because it had no rows.
+    Costs are stored per calling account, since each account (or payer account) sees
+    different costs, so profiles and assumed roles sharing a cache file never see each other's.
+
+    Args:
+        path (str): Path of the SQLite cache file.
+        account (str): Account the costs belong to. Defaults to the caller's account.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, account: str = None):
+        self.account = account or get_client('sts').get_caller_identity()['Account']
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(costs)")}
+        if columns and 'account' not in columns:
+            # Caches written before costs were keyed by account cannot be attributed to one; start over.
+            self.connection.executescript("DROP TABLE costs; DROP TABLE IF EXISTS fetched_days;")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS costs (
+                account TEXT NOT NULL,
+                day TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                group_by TEXT NOT NULL,
+                group_key TEXT NOT NULL,
+                amount REAL NOT NULL,
+                unit TEXT NOT NULL,
+                PRIMARY KEY (account, day, metric, group_by, group_key)
+            );
+            CREATE TABLE IF NOT EXISTS fetched_days (
+                account TEXT NOT NULL,
+                day TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                group_by TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                estimated INTEGER NOT NULL,
+                PRIMARY KEY (account, day, metric, group_by)
+            );
+        """)
+
+    def stale_days(self, days: list, metric: str, group_by: str, refresh_after: date, refresh_ttl: float,
+                   now: float) -> list:
+        """
+        Return the days that must be fetched: never fetched, or still being finalized and fetched
+        more than `refresh_ttl` seconds ago. A day is still being finalized if it falls on or after
+        `refresh_after` or Cost Explorer marked it as estimated.
+        """
+        fetched = {
+            day: (fetched_at, estimated) for day, fetched_at, estimated in self.connection.execute(
+                "SELECT day, fetched_at, estimated FROM fetched_days WHERE account = ? AND metric = ? "
+                "AND group_by = ? AND day BETWEEN ? AND ?",
+                (self.account, metric, group_by, days[0].isoformat(), days[-1].isoformat())
+            )
+        } if days else {}
+        stale = []
+        for day in days:
+            entry = fetched.get(day.isoformat())
+            if entry is None:
+                stale.append(day)
+                continue
+            fetched_at, estimated = entry
+            if (estimated or day >= refresh_after) and now - fetched_at > refresh_ttl:
+                stale.append(day)
+        return stale
+
+    def store(self, start: date, end: date, metric: str, group_by: str, rows, estimated_days: set,
+              now: float) -> None:
+        """
+        Replace the cached rows of the days in [start, end) with freshly fetched (day, group_key, amount, unit) rows.
+
+        `rows` may be a generator that fills `estimated_days` as it runs; it is consumed
+        completely before the days are recorded as fetched.
+        """
+        days = [(start + timedelta(days=n)).isoformat() for n in range((end - start).days)]
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM costs WHERE account = ? AND metric = ? AND group_by = ? AND day >= ? AND day < ?",
+                (self.account, metric, group_by, start.isoformat(), end.isoformat())
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO costs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((self.account, day, metric, group_by, group_key, amount, unit)
+                 for day, group_key, amount, unit in rows)
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO fetched_days VALUES (?, ?, ?, ?, ?, ?)",
+                ((self.account, day, metric, group_by, now, int(day in estimated_days)) for day in days)
+            )
+
+    def query(self, start: date, end: date, metric: str, group_by: str):
+        """Return an iterator over the cached (day, group_key, amount, unit) rows of the days in [start, end), ordered by day."""
+        return self.connection.execute(
+            "SELECT day, group_key, amount, unit FROM costs WHERE account = ? AND metric = ? AND group_by = ? "
+            "AND day >= ? AND day < ? ORDER BY day, group_key",
+            (self.account, metric, group_by, start.isoformat(), end.isoformat())
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+def group_by_key(group_by: list) -> str:
+    """Return the canonical cache key of Cost Explorer GroupBy definitions, e.g. 'DIMENSION:SERVICE'."""
+    return ','.join(f"{g['Type']}:{g['Key']}" for g in group_by or [])
+
+def day_ranges(days: list) -> list:
+    """Merge sorted days into [start, end) ranges of consecutive days."""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return [tuple(r) for r in ranges]
+
+def iter_daily_costs(ce, start: date, end: date, metric: str, group_by: list = None, estimated_days: set = None):
+    """
+    Yield DAILY (day, group_key, amount, unit) rows for [start, end) from Cost Explorer, following every NextPageToken.
+
+    Rows are yielded page by page, so a long grouped range is never held in memory at once.
+    Days that Cost Explorer reports as estimated are added to `estimated_days` as their pages arrive.
+    """
+    request = {
+        'TimePeriod': {'Start': start.isoformat(), 'End': end.isoformat()},
+        'Granularity': 'DAILY',
+        'Metrics': [metric]
+    }
+    if group_by:
+        request['GroupBy'] = group_by
+    while True:
+        response = ce.get_cost_and_usage(**request)
+        for result in response.get('ResultsByTime', []):
+            day = result['TimePeriod']['Start']
+            if result.get('Estimated') and estimated_days is not None:
+                estimated_days.add(day)
+            if group_by:
+                for group in result.get('Groups', []):
+                    value = group['Metrics'][metric]
+                    yield day, '|'.join(group['Keys']), float(value['Amount']), value['Unit']
+            elif metric in result.get('Total', {}):
+                value = result['Total'][metric]
+                yield day, '', float(value['Amount']), value['Unit']
+        if not response.get('NextPageToken'):
+            return
+        request['NextPageToken'] = response['NextPageToken']
+
+def get_daily_costs(ce, cache: CostCache, start: date, end: date, metric: str = 'BlendedCost',
+                    group_by: list = None, refresh_days: int = 3, refresh_ttl: float = 6 * 3600):
+    """
+    Return an iterator over daily (day, group_key, amount, unit) rows for [start, end), fetching only what the cache lacks.
+
+    Days that are not cached yet are fetched in as few Cost Explorer requests as possible, one
+    per run of consecutive missing days. Days within `refresh_days` of today, or reported as
+    estimated, are refetched once their cached copy is older than `refresh_ttl` seconds.
+    """
+    key = group_by_key(group_by)
+    now = time.time()
+    today = datetime.now(timezone.utc).date()
+    days = [start + timedelta(days=n) for n in range((end - start).days)]
+    stale = cache.stale_days(days, metric, key, today - timedelta(days=refresh_days), refresh_ttl, now)
+    for range_start, range_end in day_ranges(stale):
+        logging.info(f"Fetching {metric} from Cost Explorer for {range_start} to {range_end}.")
+        estimated_days = set()
+        rows = iter_daily_costs(ce, range_start, range_end, metric, group_by, estimated_days)
+        cache.store(range_start, range_end, metric, key, rows, estimated_days, now)
+    return cache.query(start, end, metric, key)
+
+class CostTable:
+    """
+    Compact columnar store of daily costs over a contiguous range of days.
+
+    Each row is held as a day index ('H'), a dictionary-encoded group index ('I') and an
+    amount ('d') in stdlib arrays, about 14 bytes per row instead of a tuple of Python
+    objects. Aggregations use NumPy when it is installed and plain loops otherwise.
+    """
+
+    def __init__(self, start: date, end: date):
+        self.start = start
+        self.days = [start + timedelta(days=n) for n in range((end - start).days)]
+        self.groups = []
+        self.group_index = {}
+        self.unit = None
+        self.day_ids = array('H')
+        self.group_ids = array('I')
+        self.amounts = array('d')
+
+    @classmethod
+    def from_rows(cls, start: date, end: date, rows) -> 'CostTable':
+        """Build a table from (day, group_key, amount, unit) rows, consuming them one at a time."""
+        table = cls(start, end)
+        for day, group_key, amount, unit in rows:
+            table.append(date.fromisoformat(day), group_key, amount, unit)
+        return table
+
+    def append(self, day: date, group_key: str, amount: float, unit: str) -> None:
+        group_id = self.group_index.get(group_key)
+        if group_id is None:
+            group_id = self.group_index[group_key] = len(self.groups)
+            self.groups.append(group_key)
+        self.unit = self.unit or unit
+        self.day_ids.append((day - self.start).days)
+        self.group_ids.append(group_id)
+        self.amounts.append(amount)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def _sum_by(self, ids: array, size: int, day_range: tuple = None, group_id: int = None) -> array:
+        """Sum amounts into `size` buckets by `ids`, optionally restricted to a [first, last) day index range or one group."""
+        if np is not None:
+            weights = np.frombuffer(self.amounts, dtype=np.float64)
+            keys = np.frombuffer(ids, dtype=np.dtype(ids.typecode))
+            mask = None
+            if day_range is not None:
+                day_ids = np.frombuffer(self.day_ids, dtype=np.uint16)
+                mask = (day_ids >= day_range[0]) & (day_ids < day_range[1])
+            if group_id is not None:
+                group_mask = np.frombuffer(self.group_ids, dtype=np.dtype(self.group_ids.typecode)) == group_id
+                mask = group_mask if mask is None else mask & group_mask
+            if mask is not None:
+                weights, keys = weights[mask], keys[mask]
+            return array('d', np.bincount(keys, weights=weights, minlength=size)[:size].tolist())
+        totals = array('d', bytes(8 * size))
+        for key, day_id, row_group_id, amount in zip(ids, self.day_ids, self.group_ids, self.amounts):
+            if day_range is not None and not day_range[0] <= day_id < day_range[1]:
+                continue
+            if group_id is not None and row_group_id != group_id:
+                continue
+            totals[key] += amount
+        return totals
+
+    def total(self) -> float:
+        return float(np.frombuffer(self.amounts, dtype=np.float64).sum()) if np is not None else sum(self.amounts)
+
+    def group_totals(self, day_range: tuple = None) -> array:
+        """Return the total of each group, indexed like `groups`."""
+        return self._sum_by(self.group_ids, len(self.groups), day_range)
+
+    def daily_totals(self, group_key: str = None) -> array:
+        """Return the total of each day, for all groups or for a single group."""
+        group_id = self.group_index.get(group_key) if group_key is not None else None
+        if group_key is not None and group_id is None:
+            return array('d', bytes(8 * len(self.days)))
+        return self._sum_by(self.day_ids, len(self.days), group_id=group_id)
+
+    def top_groups(self, n: int = 10) -> list:
+        """Return the `n` most expensive (group_key, total) pairs."""
+        totals = self.group_totals()
+        return [(self.groups[i], totals[i]) for i in heapq.nlargest(n, range(len(totals)), key=totals.__getitem__)]
+
+    def rolling_average(self, window: int = 7, group_key: str = None) -> array:
+        """Return the trailing `window`-day average of daily totals; early days average over the days available."""
+        daily = self.daily_totals(group_key)
+        averages = array('d')
+        running = 0.0
+        for i, amount in enumerate(daily):
+            running += amount
+            if i >= window:
+                running -= daily[i - window]
+            averages.append(running / min(i + 1, window))
+        return averages
+
+    def period_over_period(self, period_days: int, n: int = 10) -> list:
+        """
+        Compare the last `period_days` days with the `period_days` days before them.
+
+        Returns:
+            list: Up to `n` (group_key, previous, current) tuples with the largest absolute change.
+        """
+        last = len(self.days)
+        if period_days <= 0 or 2 * period_days > last:
+            raise ValueError(f"Comparing {period_days}-day periods needs at least {2 * period_days} days of data.")
+        current = self.group_totals((last - period_days, last))
+        previous = self.group_totals((last - 2 * period_days, last - period_days))
+        changed = heapq.nlargest(n, range(len(self.groups)), key=lambda i: abs(current[i] - previous[i]))
+        return [(self.groups[i], previous[i], current[i]) for i in changed]
+
+def parse_group_by(values: list) -> list:
+    """
+    Convert --group-by values to Cost Explorer GroupBy definitions.
+
+    'TAG:<key>' groups by a cost allocation tag; anything else is a dimension such as
+    SERVICE or LINKED_ACCOUNT. Cost Explorer accepts at most two groupings.
+    """
+    group_by = []
+    for value in values or []:
+        if value.upper().startswith('TAG:'):
+            group_by.append({'Type': 'TAG', 'Key': value[4:]})
+        else:
+            group_by.append({'Type': 'DIMENSION', 'Key': value.upper()})
+    if len(group_by) > 2:
+        raise ValueError("Cost Explorer supports at most two --group-by values.")
+    return group_by
+
+def get_aws_billing(start_date: str, end_date: str, metric: str = 'BlendedCost', cache_file: str = DEFAULT_CACHE_FILE,
+                    refresh_days: int = 3, refresh_ttl_hours: float = 6, group_by: list = None, top: int = 10,
+                    rolling_window: int = None, compare_days: int = None) -> None:
     """
     Retrieve the AWS billing cost for a specified time period using the Cost Explorer API.
 
+    Daily costs are cached locally, so only days that are missing from the cache, or still
+    being finalized, are requested from Cost Explorer. They are loaded into a CostTable for
+    the total, the top groups, a rolling average and a period-over-period comparison.
+
     Args:
         start_date (str): Start date in YYYY-MM-DD format.
-        end_date (str): End date in YYYY-MM-DD format.
+        end_date (str): End date in YYYY-MM-DD format (exclusive, as in Cost Explorer).
+        metric (str): Cost Explorer metric, e.g. BlendedCost or UnblendedCost.
+        cache_file (str): Path of the SQLite cost cache.
+        refresh_days (int): Days before today whose cached costs are refreshed.
+        refresh_ttl_hours (float): Age after which cached costs in the refresh window are refetched.
+        group_by (list): Cost Explorer GroupBy definitions, e.g. [{'Type': 'DIMENSION', 'Key': 'SERVICE'}].
+        top (int): Number of groups listed in the breakdowns.
+        rolling_window (int): If set, print daily totals with a rolling average over this many days.
+        compare_days (int): If set, compare the last this many days with the period before them.
     """
-    ce = boto3.client('ce')
     try:
-        response = ce.get_cost_and_usage(
-            TimePeriod={'Start': start_date, 'End': end_date},
-            Granularity='MONTHLY',
-            Metrics=['BlendedCost']
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+    except ValueError as e:
+        logging.error(f"Invalid date: {e}")
+        sys.exit(1)
+    if end <= start:
+        logging.error("The end date must be after the start date.")
+        sys.exit(1)
+
+    ce = get_client('ce')
+    try:
+        cache = CostCache(cache_file)
+    except Exception as e:
+        logging.error(f"Error opening the cost cache for the current AWS account: {e}")
+        sys.exit(1)
+    try:
+        rows = get_daily_costs(
+            ce, cache, start, end, metric, group_by=group_by,
+            refresh_days=refresh_days, refresh_ttl=refresh_ttl_hours * 3600
         )
-        results = response.get('ResultsByTime', [])
-        if results:
-            cost_amount = results[0]['Total']['BlendedCost']['Amount']
-            print(f"AWS Billing Cost from {start_date} to {end_date}: {cost_amount} USD")
-        else:
-            print("No cost data found for the specified period.")
+        table = CostTable.from_rows(start, end, rows)
     except Exception as e:
         logging.error(f"Error retrieving AWS billing data: {e}")
         sys.exit(1)
+    finally:
+        cache.close()
+
+    if not len(table):
+        print("No cost data found for the specified period.")
+        return
+    unit = table.unit
+    print(f"AWS Billing Cost from {start_date} to {end_date}: {table.total():.2f} {unit}")
+
+    if group_by:
+        print(f"Top {top} by {group_by_key(group_by)}:")
+        for group_key, amount in table.top_groups(top):
+            print(f"  {group_key or '(none)'}: {amount:.2f} {unit}")
+
+    if rolling_window:
+        print(f"Daily cost with {rolling_window}-day rolling average:")
+        for day, amount, average in zip(table.days, table.daily_totals(), table.rolling_average(rolling_window)):
+            print(f"  {day}: {amount:.2f} {unit} (average {average:.2f} {unit})")
+
+    if compare_days:
+        try:
+            changes = table.period_over_period(compare_days, top)
+        except ValueError as e:
+            logging.error(e)
+            sys.exit(1)
+        print(f"Largest changes, last {compare_days} days vs the {compare_days} days before:")
+        for group_key, previous, current in changes:
+            change = f"{(current - previous) / previous:+.1%}" if previous else "new"
+            print(f"  {group_key or 'Total'}: {previous:.2f} -> {current:.2f} {unit} ({change})")
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -39,13 +404,62 @@ def parse_arguments() -> argparse.Namespace:
     )
     parser.add_argument(
         '--end-date', type=str, default='2023-01-31',
-        help="End date for billing period (YYYY-MM-DD). Default: 2023-01-31"
+        help="End date for billing period (YYYY-MM-DD), exclusive. Default: 2023-01-31"
+    )
+    parser.add_argument(
+        '--metric', type=str, default='BlendedCost',
+        help="Cost Explorer metric to retrieve. Default: BlendedCost"
+    )
+    parser.add_argument(
+        '--cache-file', type=str, default=DEFAULT_CACHE_FILE,
+        help=f"SQLite file caching daily costs. Default: {DEFAULT_CACHE_FILE}"
+    )
+    parser.add_argument(
+        '--refresh-days', type=int, default=3,
+        help="Days before today that are still being finalized and get refreshed. Default: 3"
+    )
+    parser.add_argument(
+        '--refresh-ttl', type=float, default=6,
+        help="Hours after which cached costs of days still being finalized are refetched. Default: 6"
+    )
+    parser.add_argument(
+        '--group-by', action='append',
+        help="Break costs down by a dimension (SERVICE, LINKED_ACCOUNT, ...) or TAG:<key>. Can be given twice."
+    )
+    parser.add_argument(
+        '--top', type=int, default=10,
+        help="Number of groups listed in breakdowns and comparisons. Default: 10"
+    )
+    parser.add_argument(
+        '--rolling-window', type=int,
+        help="Print daily costs with a rolling average over this many days."
+    )
+    parser.add_argument(
+        '--compare-days', type=int,
+        help="Compare the last N days with the N days before them."
     )
     return parser.parse_args()
 
 def main():
+    logging.basicConfig(level=logging.INFO)
     args = parse_arguments()
-    get_aws_billing(args.start_date, args.end_date)
+    try:
+        group_by = parse_group_by(args.group_by)
+    except ValueError as e:
+        logging.error(e)
+        sys.exit(1)
+    get_aws_billing(
+        args.start_date,
+        args.end_date,
+        metric=args.metric,
+        cache_file=args.cache_file,
+        refresh_days=args.refresh_days,
+        refresh_ttl_hours=args.refresh_ttl,
+        group_by=group_by,
+        top=args.top,
+        rolling_window=args.rolling_window,
+        compare_days=args.compare_days
+    )
 
 if __name__ == "__main__":
     main()
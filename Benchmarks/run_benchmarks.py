@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import io
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+# The benchmarks must never reach a real account, so moto always gets fake credentials.
+for name, value in (
+    ('AWS_ACCESS_KEY_ID', 'testing'),
+    ('AWS_SECRET_ACCESS_KEY', 'testing'),
+    ('AWS_SESSION_TOKEN', 'testing'),
+    ('AWS_DEFAULT_REGION', 'us-east-1'),
+    ('MOTO_EC2_LOAD_DEFAULT_AMIS', 'false'),
+):
+    os.environ[name] = value
+os.environ.pop('AWS_PROFILE', None)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+import boto3  # noqa: E402
+import aws_clients  # noqa: E402
+
+try:
+    import moto
+    from moto import mock_aws
+except ImportError:
+    moto = None
+    mock_aws = None
+
+REGION = 'us-east-1'
+SCALE_SUFFIXES = {'k': 1000, 'm': 1000000}
+# DynamoDB BatchWriteItem accepts at most 25 items, and moto allows at most 60 rules per security group.
+DYNAMODB_BATCH_SIZE = 25
+RULES_PER_SECURITY_GROUP = 50
+VERSIONS_PER_FUNCTION = 100
+
+def seed_s3_objects(count: int, bucket_name: str = 'benchmark-source') -> None:
+    s3 = boto3.client('s3', region_name=REGION)
+    s3.create_bucket(Bucket=bucket_name)
+    for index in range(count):
+        s3.put_object(Bucket=bucket_name, Key=f"objects/{index:08d}", Body=b'benchmark')
+
+def seed_s3_cleaner(count: int, work_dir: str) -> dict:
+    seed_s3_objects(count)
+    return {'bucket_name': 'benchmark-source', 'days': -1}
+
+def seed_s3_sync(count: int, work_dir: str) -> dict:
+    seed_s3_objects(count)
+    boto3.client('s3', region_name=REGION).create_bucket(Bucket='benchmark-destination')
+    return {'source_bucket': 'benchmark-source', 'destination_bucket': 'benchmark-destination'}
+
+def seed_snapshots(count: int, work_dir: str) -> dict:
+    ec2 = boto3.client('ec2', region_name=REGION)
+    volume_id = ec2.create_volume(Size=1, AvailabilityZone=f"{REGION}a")['VolumeId']
+    for _ in range(count):
+        ec2.create_snapshot(VolumeId=volume_id)
+    # Snapshots created now are 0 days old, so a negative retention makes all of them eligible.
+    return {'retention_days': -1, 'cache_ttl': 0}
+
+def seed_volumes(count: int, work_dir: str) -> dict:
+    ec2 = boto3.client('ec2', region_name=REGION)
+    for _ in range(count):
+        ec2.create_volume(Size=1, AvailabilityZone=f"{REGION}a")
+    return {'regions': [REGION], 'cache_ttl': 0}
+
+def seed_security_group_rules(count: int, work_dir: str) -> dict:
+    ec2 = boto3.client('ec2', region_name=REGION)
+    for group_index in range(math.ceil(count / RULES_PER_SECURITY_GROUP)):
+        group_id = ec2.create_security_group(
+            GroupName=f"benchmark-{group_index}", Description='benchmark'
+        )['GroupId']
+        # Every other group is open to the world, so the checker has findings to report.
+        cidr = '0.0.0.0/0' if group_index % 2 else f"10.{group_index % 256}.0.0/16"
+        rules = min(RULES_PER_SECURITY_GROUP, count - group_index * RULES_PER_SECURITY_GROUP)
+        ec2.authorize_security_group_ingress(GroupId=group_id, IpPermissions=[
+            {'IpProtocol': 'tcp', 'FromPort': port, 'ToPort': port, 'IpRanges': [{'CidrIp': cidr}]}
+            for port in range(1000, 1000 + rules)
+        ])
+    return {'regions': [REGION], 'cache_ttl': 0}
+
+def seed_dynamodb_items(count: int, work_dir: str) -> dict:
+    dynamodb = boto3.client('dynamodb', region_name=REGION)
+    dynamodb.create_table(
+        TableName='benchmark',
+        KeySchema=[{'AttributeName': 'pk', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'pk', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    for start in range(0, count, DYNAMODB_BATCH_SIZE):
+        dynamodb.batch_write_item(RequestItems={'benchmark': [
+            {'PutRequest': {'Item': {'pk': {'S': f"item-{index:08d}"}, 'value': {'N': str(index)}}}}
+            for index in range(start, min(start + DYNAMODB_BATCH_SIZE, count))
+        ]})
+    boto3.client('s3', region_name=REGION).create_bucket(Bucket='benchmark-export')
+    return {
+        'table_name': 'benchmark',
+        'bucket_name': 'benchmark-export',
+        'file_name': 'benchmark.jsonl',
+        'stream': True,
+        'segments': 4,
+        'checkpoint_file': os.path.join(work_dir, 'benchmark.export-checkpoint.json'),
+    }
+
+def function_code(version: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('handler.py', f"def handler(event, context):\n    return {version}\n")
+    return buffer.getvalue()
+
+def seed_lambda_versions(count: int, work_dir: str) -> dict:
+    role_arn = boto3.client('iam', region_name=REGION).create_role(
+        RoleName='benchmark', AssumeRolePolicyDocument='{}'
+    )['Role']['Arn']
+    lambda_client = boto3.client('lambda', region_name=REGION)
+    for function_index in range(math.ceil(count / VERSIONS_PER_FUNCTION)):
+        function_name = f"benchmark-{function_index}"
+        lambda_client.create_function(
+            FunctionName=function_name, Runtime='python3.12', Role=role_arn,
+            Handler='handler.handler', Code={'ZipFile': function_code(0)}
+        )
+        versions = min(VERSIONS_PER_FUNCTION, count - function_index * VERSIONS_PER_FUNCTION)
+        # moto only publishes a new version when the code changes.
+        for version in range(1, versions + 1):
+            lambda_client.update_function_code(FunctionName=function_name, ZipFile=function_code(version), Publish=True)
+    return {'all_functions': True}
+
+# Benchmark name -> (seed function, script path relative to the repository root, core function).
+# Each seed function creates `count` resources and returns the core function's keyword arguments.
+BENCHMARKS = {
+    's3-object-cleaner': (seed_s3_cleaner, 'S3 Object Cleaner/delete_old_s3_objects.py', 'delete_old_s3_objects'),
+    's3-bucket-sync': (seed_s3_sync, 'S3 Bucket Syncer/sync_s3_buckets.py', 'sync_s3_buckets'),
+    'snapshot-cleaner': (seed_snapshots, 'Snapshot Cleaner/cleanup_snapshots.py', 'cleanup_snapshots'),
+    'ebs-volume-cleaner': (seed_volumes, 'EBS Volume Cleaner/delete_unused_ebs_volumes.py', 'delete_unused_ebs_volumes'),
+    'open-sg-checker': (seed_security_group_rules, 'Open SG Checker/check_open_security_groups.py',
+                        'check_open_security_groups'),
+    'dynamodb-exporter': (seed_dynamodb_items, 'DynamoDB Exporter/export_dynamodb_to_s3.py', 'export_dynamodb_to_s3'),
+    'lambda-version-cleaner': (seed_lambda_versions, 'Lambda Version Cleaner/cleanup_old_lambda_versions.py',
+                               'cleanup_old_lambda_versions'),
+}
+
+class ApiCallCounter:
+    """botocore 'before-call' handler counting API calls per service and operation, across threads."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event_name: str, **kwargs) -> None:
+        _, service, operation = event_name.split('.', 2)
+        with self._lock:
+            self.counts[f"{service}.{operation}"] += 1
+
+def peak_rss_kb() -> int:
+    """Return the peak resident set size of this process in KB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def load_function(path: str, function_name: str):
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0],
+                                                  os.path.join(ROOT_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, function_name)
+
+def run_benchmark(name: str, count: int) -> dict:
+    """
+    Seed `count` resources in a fresh moto backend and time the benchmark's core function.
+
+    Runs in its own process, so the peak RSS belongs to this benchmark alone. Only the core
+    function is timed and counted; its printed output is discarded. The peak RSS includes
+    moto's in-memory copy of the seeded resources, which is also reported on its own.
+    """
+    seed, path, function_name = BENCHMARKS[name]
+    result = {'benchmark': name, 'resources': count}
+    with tempfile.TemporaryDirectory() as work_dir, mock_aws():
+        # Keep the scripts' inventory cache away from the user's, and always fetch.
+        os.environ['AWS_INVENTORY_CACHE_FILE'] = os.path.join(work_dir, 'inventory.sqlite3')
+        os.environ['AWS_INVENTORY_CACHE_TTL'] = '0'
+        started = time.perf_counter()
+        kwargs = seed(count, work_dir)
+        result['seed_seconds'] = round(time.perf_counter() - started, 3)
+        result['seed_peak_rss_kb'] = peak_rss_kb()
+
+        function = load_function(path, function_name)
+        aws_clients.clear_cache()
+        calls = ApiCallCounter()
+        # Clients created from the session after this inherit the handler.
+        aws_clients.get_session().events.register('before-call', calls)
+        status, error = 'ok', None
+        started = time.perf_counter()
+        try:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                function(**kwargs)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                status, error = 'failed', f"exited with status {e.code}"
+        except Exception as e:
+            status, error = 'failed', f"{type(e).__name__}: {e}"
+        result['wall_seconds'] = round(time.perf_counter() - started, 3)
+        result['peak_rss_kb'] = peak_rss_kb()
+        result['api_calls_total'] = sum(calls.counts.values())
+        result['api_calls'] = dict(sorted(calls.counts.items()))
+        result['status'] = status
+        if error:
+            result['error'] = error
+    return result
+
+def parse_scale(text: str) -> int:
+    """Parse a resource count such as 1000, 1k, 100k or 1M."""
+    suffix = text[-1:].lower()
+    try:
+        if suffix in SCALE_SUFFIXES:
+            return int(float(text[:-1]) * SCALE_SUFFIXES[suffix])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid scale '{text}'. Use a count such as 1000, 1k, 100k or 1M.")
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def compare_with_baseline(results: list, baseline_path: str) -> None:
+    """Print the change in wall time and API calls against the matching runs of a previous report."""
+    try:
+        with open(baseline_path) as f:
+            baseline = {(r['benchmark'], r['resources']): r for r in json.load(f)['results']}
+    except Exception as e:
+        logging.error(f"Error reading baseline '{baseline_path}': {e}")
+        return
+    for result in results:
+        previous = baseline.get((result['benchmark'], result['resources']))
+        if previous is None or 'wall_seconds' not in previous:
+            continue
+        ratio = result['wall_seconds'] / max(previous['wall_seconds'], 1e-9)
+        print(f"{result['benchmark']} @ {result['resources']}: wall time x{ratio:.2f} "
+              f"({previous['wall_seconds']:.2f}s -> {result['wall_seconds']:.2f}s), "
+              f"API calls {previous['api_calls_total']} -> {result['api_calls_total']}")
+
+def run_benchmarks(benchmarks: list, scales: list, output_path: str, baseline_path: str = None) -> None:
+    """
+    Run every benchmark at every scale, each in a fresh process, and write the results as JSON.
+
+    Args:
+        benchmarks (list): Names of the benchmarks to run, keys of BENCHMARKS.
+        scales (list): Numbers of resources to seed for each benchmark.
+        output_path (str): Path of the JSON report.
+        baseline_path (str): Optional earlier report to compare wall time and API calls against.
+    """
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'boto3': boto3.__version__,
+        'moto': moto.__version__,
+        'results': [],
+    }
+    context = multiprocessing.get_context('spawn')
+    for count in scales:
+        for name in benchmarks:
+            logging.info(f"Running {name} with {count} resources...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                try:
+                    result = executor.submit(run_benchmark, name, count).result()
+                except Exception as e:
+                    result = {'benchmark': name, 'resources': count, 'status': 'failed', 'error': str(e)}
+            report['results'].append(result)
+            if result['status'] == 'ok':
+                print(f"{name} @ {count}: {result['wall_seconds']:.2f}s, {result['api_calls_total']} API calls, "
+                      f"peak RSS {result['peak_rss_kb'] / 1024:.1f} MB (seeding {result['seed_seconds']:.1f}s)")
+            else:
+                print(f"{name} @ {count}: failed: {result.get('error')}")
+
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}.")
+    if baseline_path:
+        compare_with_baseline(report['results'], baseline_path)
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scripts' core functions against moto's in-process AWS mocks."
+    )
+    parser.add_argument(
+        '--benchmarks', nargs='+', choices=sorted(BENCHMARKS), default=sorted(BENCHMARKS),
+        help="Benchmarks to run. Default is all of them."
+    )
+    parser.add_argument(
+        '--scales', nargs='+', type=parse_scale, default=[1000],
+        help="Numbers of resources to seed, e.g. 1k 100k 1M. Default is 1k."
+    )
+    parser.add_argument(
+        '--output', default='benchmark-results.json',
+        help="Path of the JSON report. Default is benchmark-results.json."
+    )
+    parser.add_argument(
+        '--baseline',
+        help="Earlier JSON report to compare wall time and API calls against."
+    )
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    args = parse_arguments()
+    if mock_aws is None:
+        logging.error("The benchmarks require moto. Install it with: pip install moto")
+        sys.exit(1)
+    run_benchmarks(args.benchmarks, args.scales, args.output, baseline_path=args.baseline)
+
+if __name__ == "__main__":
+    main()
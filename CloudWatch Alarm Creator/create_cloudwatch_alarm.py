@@ -1,8 +1,38 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+
+ALARM_NAME_PREFIX = "CPU_Utilization_"
+# Instance states whose alarms are kept; alarms for any other (or unknown) instance are removed.
+LIVE_INSTANCE_STATES = ['pending', 'running', 'shutting-down', 'stopping', 'stopped']
+# DeleteAlarms accepts at most 100 alarm names per request.
+DELETE_ALARMS_CHUNK_SIZE = 100
+# Alarm fields compared against the desired parameters when reconciling.
+COMPARED_FIELDS = (
+    "MetricName", "Namespace", "Statistic", "Period", "EvaluationPeriods",
+    "Threshold", "ComparisonOperator", "AlarmActions", "Dimensions"
+)
+
+def build_alarm_parameters(instance_id: str, threshold: float, sns_topic_arn: str) -> dict:
+    """Return the put_metric_alarm parameters of the CPU alarm for an instance."""
+    return {
+        "AlarmName": f"{ALARM_NAME_PREFIX}{instance_id}",
+        "MetricName": "CPUUtilization",
+        "Namespace": "AWS/EC2",
+        "Statistic": "Average",
+        "Period": 300,
+        "EvaluationPeriods": 1,
+        "Threshold": threshold,
+        "ComparisonOperator": "GreaterThanThreshold",
+        "AlarmActions": [sns_topic_arn],
+        "Dimensions": [{"Name": "InstanceId", "Value": instance_id}]
+    }
 
 def create_cloudwatch_alarm(instance_id: str, threshold: float = 70.0, sns_topic_arn: str = None, dry_run: bool = False) -> None:
     """
@@ -18,20 +48,9 @@ def create_cloudwatch_alarm(instance_id: str, threshold: float = 70.0, sns_topic
         logging.error("SNS topic ARN is required. Provide it using the '--sns-topic-arn' argument.")
         sys.exit(1)
 
-    alarm_name = f"CPU_Utilization_{instance_id}"
-    parameters = {
-        "AlarmName": alarm_name,
-        "MetricName": "CPUUtilization",
-        "Namespace": "AWS/EC2",
-        "Statistic": "Average",
-        "Period": 300,
-        "EvaluationPeriods": 1,
-        "Threshold": threshold,
-        "ComparisonOperator": "GreaterThanThreshold",
-        "AlarmActions": [sns_topic_arn],
-        "Dimensions": [{"Name": "InstanceId", "Value": instance_id}]
-    }
-    
+    parameters = build_alarm_parameters(instance_id, threshold, sns_topic_arn)
+    alarm_name = parameters["AlarmName"]
+
     if dry_run:
         print("Dry run: The following CloudWatch alarm parameters would be used:")
         for key, value in parameters.items():
@@ -39,20 +58,131 @@ def create_cloudwatch_alarm(instance_id: str, threshold: float = 70.0, sns_topic
         return
 
     try:
-        cloudwatch = boto3.client('cloudwatch')
+        cloudwatch = get_client('cloudwatch')
         cloudwatch.put_metric_alarm(**parameters)
         print(f"CloudWatch alarm '{alarm_name}' created for instance {instance_id}.")
     except Exception as e:
         logging.error(f"Error creating CloudWatch alarm for instance {instance_id}: {e}")
         sys.exit(1)
 
+def get_instance_ids(ec2, filters: list) -> set:
+    """Return the IDs of all instances matching the filters, following pagination."""
+    instance_ids = set()
+    paginator = ec2.get_paginator('describe_instances')
+    for page in paginator.paginate(Filters=filters):
+        for reservation in page.get('Reservations', []):
+            instance_ids.update(instance['InstanceId'] for instance in reservation.get('Instances', []))
+    return instance_ids
+
+def get_existing_alarms(cloudwatch) -> dict:
+    """Return all metric alarms with the CPU alarm name prefix, keyed by alarm name."""
+    alarms = {}
+    paginator = cloudwatch.get_paginator('describe_alarms')
+    for page in paginator.paginate(AlarmNamePrefix=ALARM_NAME_PREFIX, AlarmTypes=['MetricAlarm']):
+        for alarm in page.get('MetricAlarms', []):
+            alarms[alarm['AlarmName']] = alarm
+    return alarms
+
+def alarm_differs(existing: dict, desired: dict) -> bool:
+    """Return True if an existing alarm does not match the desired parameters."""
+    for field in COMPARED_FIELDS:
+        current, wanted = existing.get(field), desired[field]
+        if field == "Dimensions":
+            current = sorted((d["Name"], d["Value"]) for d in current or [])
+            wanted = sorted((d["Name"], d["Value"]) for d in wanted)
+        elif field == "AlarmActions":
+            current, wanted = sorted(current or []), sorted(wanted)
+        if current != wanted:
+            return True
+    return False
+
+def reconcile_alarms(sns_topic_arn: str, threshold: float = 70.0, tags: list = None, instance_ids: list = None,
+                     workers: int = 10, dry_run: bool = False) -> None:
+    """
+    Reconcile CPU alarms for a fleet of instances selected by tag or listed explicitly.
+
+    Existing alarms are fetched in bulk with a paginated describe_alarms call, and only
+    alarms that are missing or whose parameters differ are put, on a bounded worker pool.
+    Alarms whose instance no longer exists or has been terminated are deleted.
+
+    Args:
+        sns_topic_arn (str): The SNS topic ARN to send alarm notifications.
+        threshold (float): CPU utilization threshold for the alarms. Default is 70.0.
+        tags (list): (key, value) pairs; instances carrying all of them are selected.
+        instance_ids (list): Explicit instance IDs to select instead of tags.
+        workers (int): Maximum number of concurrent put_metric_alarm calls.
+        dry_run (bool): If True, report the changes without making them.
+    """
+    ensure_pool_size(workers)
+    ec2 = get_client('ec2')
+    cloudwatch = get_client('cloudwatch')
+    try:
+        live_instances = get_instance_ids(ec2, [{'Name': 'instance-state-name', 'Values': LIVE_INSTANCE_STATES}])
+        if instance_ids:
+            selected = set(instance_ids) & live_instances
+        else:
+            tag_filters = [{'Name': f"tag:{key}", 'Values': [value]} for key, value in tags or []]
+            selected = get_instance_ids(
+                ec2, tag_filters + [{'Name': 'instance-state-name', 'Values': LIVE_INSTANCE_STATES}]
+            )
+        existing = get_existing_alarms(cloudwatch)
+    except Exception as e:
+        logging.error(f"Error retrieving instances or alarms: {e}")
+        sys.exit(1)
+
+    to_put = []
+    for instance_id in sorted(selected):
+        desired = build_alarm_parameters(instance_id, threshold, sns_topic_arn)
+        current = existing.get(desired["AlarmName"])
+        if current is None or alarm_differs(current, desired):
+            to_put.append(desired)
+    to_delete = sorted(
+        name for name in existing if name[len(ALARM_NAME_PREFIX):] not in live_instances
+    )
+    unchanged = len(selected) - len(to_put)
+
+    if dry_run:
+        for parameters in to_put:
+            action = "update" if parameters["AlarmName"] in existing else "create"
+            print(f"Dry run: Would {action} CloudWatch alarm '{parameters['AlarmName']}'.")
+        for name in to_delete:
+            print(f"Dry run: Would delete CloudWatch alarm '{name}' (instance no longer exists).")
+        print(f"Dry run: {len(to_put)} alarms to put, {len(to_delete)} to delete, {unchanged} unchanged.")
+        return
+
+    put_count = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(cloudwatch.put_metric_alarm, **p): p["AlarmName"] for p in to_put}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                put_count += 1
+                print(f"CloudWatch alarm '{futures[future]}' put.")
+            except Exception as e:
+                logging.error(f"Error putting CloudWatch alarm '{futures[future]}': {e}")
+
+    deleted_count = 0
+    for start in range(0, len(to_delete), DELETE_ALARMS_CHUNK_SIZE):
+        chunk = to_delete[start:start + DELETE_ALARMS_CHUNK_SIZE]
+        try:
+            cloudwatch.delete_alarms(AlarmNames=chunk)
+            deleted_count += len(chunk)
+            for name in chunk:
+                print(f"CloudWatch alarm '{name}' deleted (instance no longer exists).")
+        except Exception as e:
+            logging.error(f"Error deleting CloudWatch alarms {', '.join(chunk)}: {e}")
+
+    print(f"Reconciled {len(selected)} instances: {put_count} alarms put, "
+          f"{deleted_count} deleted, {unchanged} unchanged.")
+
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Create a CloudWatch alarm for CPU utilization of an EC2 instance."
+        description="Create a CloudWatch alarm for CPU utilization of an EC2 instance, or reconcile alarms for a fleet."
     )
     parser.add_argument(
         "instance_id",
-        help="The ID of the EC2 instance (e.g., i-1234567890abcdef0)."
+        nargs="?",
+        help="The ID of the EC2 instance (e.g., i-1234567890abcdef0). Omit when using --tag or --instances-file."
     )
     parser.add_argument(
         "--threshold",
@@ -65,19 +195,62 @@ def parse_arguments() -> argparse.Namespace:
         required=True,
         help="The SNS topic ARN for alarm notifications."
     )
+    parser.add_argument(
+        "--tag",
+        action="append",
+        help="Reconcile alarms for all instances with this tag, in the format Key=Value. Can be repeated."
+    )
+    parser.add_argument(
+        "--instances-file",
+        help="Reconcile alarms for the instance IDs listed in this file, one per line."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=10,
+        help="Maximum number of concurrent alarm updates in fleet mode (default: 10)."
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Simulate the alarm creation without making any changes."
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if sum(map(bool, (args.instance_id, args.tag, args.instances_file))) != 1:
+        parser.error("Provide exactly one of an instance ID, --tag or --instances-file.")
+    return args
 
 def main():
     args = parse_arguments()
-    create_cloudwatch_alarm(
-        instance_id=args.instance_id,
-        threshold=args.threshold,
+    if args.instance_id:
+        create_cloudwatch_alarm(
+            instance_id=args.instance_id,
+            threshold=args.threshold,
+            sns_topic_arn=args.sns_topic_arn,
+            dry_run=args.dry_run
+        )
+        return
+
+    tags = []
+    for tag in args.tag or []:
+        if '=' not in tag:
+            logging.error(f"Invalid tag format: '{tag}'. Expected format is Key=Value.")
+            sys.exit(1)
+        tags.append(tuple(tag.split('=', 1)))
+    instance_ids = None
+    if args.instances_file:
+        try:
+            with open(args.instances_file) as f:
+                instance_ids = [line.strip() for line in f if line.strip()]
+        except Exception as e:
+            logging.error(f"Error reading instances file '{args.instances_file}': {e}")
+            sys.exit(1)
+    reconcile_alarms(
         sns_topic_arn=args.sns_topic_arn,
+        threshold=args.threshold,
+        tags=tags,
+        instance_ids=instance_ids,
+        workers=args.workers,
         dry_run=args.dry_run
     )
 
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
 
 def update_dns_record(domain_name: str, ip_address: str, hosted_zone_id: str, dry_run: bool = False) -> None:
     """
@@ -14,7 +17,7 @@ def update_dns_record(domain_name: str, ip_address: str, hosted_zone_id: str, dr
         hosted_zone_id (str): The ID of the Route 53 hosted zone.
         dry_run (bool): If True, simulate the update without making any changes.
     """
-    route53 = boto3.client('route53')
+    route53 = get_client('route53')
     
     change_batch = {
         'Changes': [
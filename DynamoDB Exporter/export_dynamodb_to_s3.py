@@ -1,41 +1,503 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import base64
+import gzip
 import logging
+import os
+import queue
 import sys
 import json
+import threading
+import time
+from boto3.dynamodb.types import TypeDeserializer
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
-def export_dynamodb_to_s3(table_name: str, bucket_name: str, file_name: str, dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MB = 1024 * 1024
+# Every part of a multipart upload except the last must be at least 5 MB.
+MIN_PART_SIZE = 5 * MB
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+class ReadCapacityLimiter:
+    """
+    Token bucket shared by all scan segments that caps consumed read capacity units per second.
+
+    Each segment calls acquire() before a Scan request and charge() with the capacity the
+    response reports, so the combined export stays at or below the configured rate.
+    """
+
+    def __init__(self, units_per_second: float):
+        self.rate = units_per_second
+        self.tokens = units_per_second
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens > 0:
+                    return
+                wait_seconds = -self.tokens / self.rate
+            time.sleep(wait_seconds)
+
+    def charge(self, units: float) -> None:
+        with self._lock:
+            self._refill()
+            self.tokens -= units
+
+def scan_segment(client, table_name: str, segment: int, total_segments: int, limiter=None,
+                 exclusive_start_key: dict = None):
+    """
+    Yield (items, last_evaluated_key) pages from one segment of a parallel scan.
+
+    The last page of the segment has a last_evaluated_key of None.
+
+    Args:
+        client: A boto3 DynamoDB client.
+        table_name (str): The name of the DynamoDB table.
+        segment (int): The segment number to scan.
+        total_segments (int): The total number of segments the scan is split into.
+        limiter (ReadCapacityLimiter): Optional limiter for consumed read capacity.
+        exclusive_start_key (dict): Optional key to resume the segment after.
+    """
+    deserializer = TypeDeserializer()
+    kwargs = {'TableName': table_name, 'ReturnConsumedCapacity': 'TOTAL'}
+    if total_segments > 1:
+        kwargs.update(Segment=segment, TotalSegments=total_segments)
+    if exclusive_start_key:
+        kwargs['ExclusiveStartKey'] = exclusive_start_key
+    while True:
+        if limiter:
+            limiter.acquire()
+        data = client.scan(**kwargs)
+        if limiter:
+            limiter.charge(data.get('ConsumedCapacity', {}).get('CapacityUnits', 0))
+        items = [
+            {name: deserializer.deserialize(value) for name, value in item.items()}
+            for item in data.get('Items', [])
+        ]
+        last_evaluated_key = data.get('LastEvaluatedKey')
+        yield items, last_evaluated_key
+        if not last_evaluated_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_evaluated_key
+
+def iter_scan_pages(client, table_name: str, segments: int = 1, max_read_capacity: float = None,
+                    positions: dict = None):
+    """
+    Run a parallel scan across a thread pool and yield pages from every segment.
+
+    Segments push pages into a bounded queue, so only a few pages are held in memory at
+    once. Pages from different segments are interleaved in arrival order.
+
+    Args:
+        client: A boto3 DynamoDB client.
+        table_name (str): The name of the DynamoDB table.
+        segments (int): Number of parallel scan segments.
+        max_read_capacity (float): Optional cap on consumed read capacity units per second.
+        positions (dict): Optional checkpointed position per segment number, as written by
+            segment_position(), to resume the scan from.
+
+    Yields:
+        tuple: (segment, items, last_evaluated_key) for each scanned page.
+    """
+    positions = positions or {}
+    pending_segments = [segment for segment in range(segments) if not positions.get(segment, {}).get('Done')]
+    limiter = ReadCapacityLimiter(max_read_capacity) if max_read_capacity else None
+    pages = queue.Queue(maxsize=segments * 2)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> None:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def worker(segment: int) -> None:
+        start_key = positions.get(segment, {}).get('ExclusiveStartKey')
+        try:
+            for items, last_evaluated_key in scan_segment(client, table_name, segment, segments, limiter, start_key):
+                if stop.is_set():
+                    return
+                put((segment, items, last_evaluated_key))
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+
+    if not pending_segments:
+        return
+    with ThreadPoolExecutor(max_workers=len(pending_segments)) as executor:
+        for segment in pending_segments:
+            executor.submit(worker, segment)
+        try:
+            remaining = len(pending_segments)
+            while remaining:
+                page = pages.get()
+                if page is done:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            stop.set()
+
+class MultipartUploadWriter:
+    """
+    File-like writer that streams bytes to an S3 object as multipart upload parts.
+
+    Each write() is kept whole within a part: once the buffer reaches the part size it is
+    uploaded as one part on a small thread pool, so at most `max_in_flight` part buffers
+    are held in memory at once and every part ends on a write boundary. An existing
+    upload can be continued by passing its upload ID and completed parts.
+    """
+
+    def __init__(self, s3, bucket_name: str, key: str, part_size: int = 8 * MB, max_in_flight: int = 4,
+                 upload_id: str = None, parts: list = None, bytes_written: int = 0):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_in_flight = max_in_flight
+        self.bytes_written = bytes_written
+        self._buffer = bytearray()
+        self._parts = {part['PartNumber']: part['ETag'] for part in parts or []}
+        self._next_part_number = len(self._parts) + 1
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self.upload_id = upload_id or s3.create_multipart_upload(Bucket=bucket_name, Key=key)['UploadId']
+
+    def _upload_part(self, part_number: int, body: bytes) -> None:
+        response = self.s3.upload_part(
+            Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id, PartNumber=part_number, Body=body
+        )
+        self._parts[part_number] = response['ETag']
+
+    def _flush_part(self) -> int:
+        if len(self._pending) >= self.max_in_flight:
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        part_number = self._next_part_number
+        self._pending.add(self._executor.submit(self._upload_part, part_number, bytes(self._buffer)))
+        self._buffer.clear()
+        self._next_part_number += 1
+        return part_number
+
+    def write(self, data: bytes) -> int:
+        """
+        Buffer data and upload the buffer as a part once it reaches the part size.
+
+        Returns:
+            int: The number of the part that was started, or None if the data is still buffered.
+        """
+        self._buffer += data
+        self.bytes_written += len(data)
+        if len(self._buffer) >= self.part_size:
+            return self._flush_part()
+        return None
+
+    def completed_parts(self) -> list:
+        """Return the parts uploaded without gaps from part 1, in the format CompleteMultipartUpload expects."""
+        parts = []
+        while len(parts) + 1 in self._parts:
+            parts.append({'PartNumber': len(parts) + 1, 'ETag': self._parts[len(parts) + 1]})
+        return parts
+
+    def close(self) -> None:
+        """Upload the remaining buffer and complete the multipart upload."""
+        if self._buffer or self._next_part_number == 1:
+            self._flush_part()
+        for future in wait(self._pending).done:
+            future.result()
+        self._pending.clear()
+        self._executor.shutdown()
+        self.s3.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.completed_parts()}
+        )
+
+    def abort(self) -> None:
+        """Abort the multipart upload and discard any uploaded parts."""
+        self._executor.shutdown(cancel_futures=True)
+        self.s3.abort_multipart_upload(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id)
+
+    def detach(self) -> None:
+        """Stop uploading but leave the multipart upload open so it can be resumed later."""
+        self._executor.shutdown(cancel_futures=True)
+
+def encode_json_lines(items: list) -> bytes:
+    """Encode a page of items as JSON Lines."""
+    return ''.join(json.dumps(item, default=str) + '\n' for item in items).encode('utf-8')
+
+def encode_page(items: list, compression: str = 'none') -> bytes:
+    """
+    Encode a page of items as JSON Lines, compressed as a standalone gzip member or zstd frame.
+
+    Concatenated members and frames decompress as a single stream, so each page can be
+    appended to an object independently of the pages before it.
+    """
+    data = encode_json_lines(items)
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+def part_file_key(file_name: str, index: int, compression: str, rolled: bool) -> str:
+    """Return the S3 key of an export file, numbered under the file name prefix when output is rolled."""
+    if not rolled:
+        return file_name
+    return f"{file_name}/part-{index:05d}.jsonl{COMPRESSION_SUFFIXES[compression]}"
+
+def new_file_state(key: str) -> dict:
+    """Return the checkpoint state of an export file that has not been started yet."""
+    return {'key': key, 'upload_id': None, 'parts': [], 'item_count': 0, 'bytes_written': 0}
+
+def file_manifest_entry(file_state: dict, item_count: int, byte_count: int) -> dict:
+    """Return the manifest entry of a completed export file."""
+    return {'key': file_state['key'], 'item_count': item_count, 'byte_count': byte_count}
+
+def segment_position(last_evaluated_key: dict) -> dict:
+    """Return the checkpoint position of a segment after a page with the given LastEvaluatedKey."""
+    return {'ExclusiveStartKey': last_evaluated_key} if last_evaluated_key else {'Done': True}
+
+def _encode_checkpoint_value(value):
+    # Binary key attributes come back from the low-level client as bytes.
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode_checkpoint_value(obj: dict):
+    if set(obj) == {'__bytes__'}:
+        return base64.b64decode(obj['__bytes__'])
+    return obj
+
+def save_checkpoint(checkpoint_file: str, state: dict) -> None:
+    """Atomically write the export checkpoint to disk."""
+    temp_file = f"{checkpoint_file}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(state, f, default=_encode_checkpoint_value)
+    os.replace(temp_file, checkpoint_file)
+
+def load_checkpoint(checkpoint_file: str) -> dict:
+    """Load an export checkpoint, converting segment numbers back to integers."""
+    with open(checkpoint_file) as f:
+        state = json.load(f, object_hook=_decode_checkpoint_value)
+    state['positions'] = {int(segment): position for segment, position in state['positions'].items()}
+    return state
+
+def stream_export(dynamodb, s3, table_name: str, bucket_name: str, file_name: str, dry_run: bool,
+                  segments: int, max_read_capacity: float, part_size: int,
+                  checkpoint_file: str = None, resume: bool = False,
+                  compression: str = 'none', max_file_size: int = None) -> None:
+    """
+    Export a table as JSON Lines, uploading each scanned page as soon as it is ready.
+
+    Pages are encoded one at a time and streamed into a multipart upload, so peak memory
+    stays at a few part buffers regardless of table size. Whenever the uploaded parts
+    cover more pages, the scan position of every segment and the multipart upload state
+    are checkpointed, so a failed export can be resumed without rescanning or
+    re-uploading finished work.
+
+    With a maximum file size, output rolls over to a new part file under the
+    '<file_name>/' prefix once the current one reaches that size, and a manifest
+    listing each part file's key, item count and byte count is written at the end.
+    """
+    checkpoint_file = checkpoint_file or f"{table_name}.export-checkpoint.json"
+    rolled = bool(max_file_size)
+    state = {
+        'table_name': table_name,
+        'bucket_name': bucket_name,
+        'file_name': file_name,
+        'segments': segments,
+        'compression': compression,
+        'max_file_size': max_file_size,
+        'positions': {},
+        'item_count': 0,
+        'files': [],
+        'current': new_file_state(part_file_key(file_name, 0, compression, rolled))
+    }
+    if resume:
+        try:
+            checkpoint = load_checkpoint(checkpoint_file)
+        except Exception as e:
+            logging.error(f"Error reading checkpoint file '{checkpoint_file}': {e}")
+            sys.exit(1)
+        for name in ('table_name', 'bucket_name', 'file_name', 'segments', 'compression', 'max_file_size'):
+            if checkpoint.get(name) != state[name]:
+                logging.error(
+                    f"Checkpoint file '{checkpoint_file}' was written for {name} '{checkpoint.get(name)}', "
+                    f"not '{state[name]}'."
+                )
+                sys.exit(1)
+        state = checkpoint
+        print(f"Resuming export of DynamoDB table '{table_name}' after {state['item_count']} items.")
+
+    def open_writer() -> MultipartUploadWriter:
+        current = state['current']
+        writer = MultipartUploadWriter(
+            s3, bucket_name, current['key'], part_size,
+            upload_id=current['upload_id'], parts=current['parts'], bytes_written=current['bytes_written']
+        )
+        current['upload_id'] = writer.upload_id
+        save_checkpoint(checkpoint_file, state)
+        return writer
+
+    writer = None if dry_run else open_writer()
+    positions = dict(state['positions'])
+    item_count = state['item_count']
+    file_item_count = state['current']['item_count']
+    # Scan positions captured when each part was started, waiting for the part to finish uploading.
+    unconfirmed = deque()
+    try:
+        for segment, items, last_evaluated_key in iter_scan_pages(
+                dynamodb, table_name, segments, max_read_capacity, positions=state['positions']):
+            item_count += len(items)
+            positions[segment] = segment_position(last_evaluated_key)
+            if not writer:
+                continue
+            file_item_count += len(items)
+            part_number = writer.write(encode_page(items, compression))
+            if part_number:
+                unconfirmed.append((part_number, dict(positions), item_count, file_item_count, writer.bytes_written))
+
+            if rolled and writer.bytes_written >= max_file_size:
+                # Completing the file confirms every page written so far.
+                writer.close()
+                state['files'].append(file_manifest_entry(state['current'], file_item_count, writer.bytes_written))
+                state['positions'], state['item_count'] = dict(positions), item_count
+                state['current'] = new_file_state(part_file_key(file_name, len(state['files']), compression, rolled))
+                unconfirmed.clear()
+                file_item_count = 0
+                writer = open_writer()
+                continue
+
+            parts = writer.completed_parts()
+            checkpoint = None
+            while unconfirmed and unconfirmed[0][0] <= len(parts):
+                checkpoint = unconfirmed.popleft()
+            if checkpoint:
+                confirmed_part, state['positions'], state['item_count'], current_items, current_bytes = checkpoint
+                state['current'].update(
+                    parts=parts[:confirmed_part], item_count=current_items, bytes_written=current_bytes
+                )
+                save_checkpoint(checkpoint_file, state)
+
+        if writer:
+            if file_item_count or not state['files']:
+                writer.close()
+                state['files'].append(file_manifest_entry(state['current'], file_item_count, writer.bytes_written))
+            else:
+                # The last roll-over left an empty file behind.
+                writer.abort()
+            if rolled:
+                manifest = {'table_name': table_name, 'item_count': item_count, 'files': state['files']}
+                s3.put_object(
+                    Bucket=bucket_name, Key=f"{file_name}/manifest.json", Body=json.dumps(manifest, indent=4)
+                )
+    except Exception as e:
+        if writer:
+            writer.detach()
+        logging.error(f"Error exporting DynamoDB table '{table_name}' to s3://{bucket_name}/{file_name}: {e}")
+        if writer:
+            logging.error(f"Progress was saved to '{checkpoint_file}'. Rerun with --resume to continue the export.")
+        sys.exit(1)
+
+    if dry_run:
+        print(f"Dry run: Would export {item_count} items from DynamoDB table '{table_name}' "
+              f"to s3://{bucket_name}/{file_name}.")
+        return
+
+    os.remove(checkpoint_file)
+    total_bytes = sum(entry['byte_count'] for entry in state['files'])
+    if rolled:
+        print(f"Exported {item_count} items ({total_bytes} bytes) in {len(state['files'])} files "
+              f"to s3://{bucket_name}/{file_name}/ (manifest: s3://{bucket_name}/{file_name}/manifest.json)")
+    else:
+        print(f"Exported {item_count} items ({total_bytes} bytes) to s3://{bucket_name}/{file_name}")
+
+def export_dynamodb_to_s3(table_name: str, bucket_name: str, file_name: str, dry_run: bool = False,
+                          segments: int = 1, max_read_capacity: float = None, stream: bool = False,
+                          part_size: int = 8 * MB, checkpoint_file: str = None, resume: bool = False,
+                          compression: str = 'none', max_file_size: int = None) -> None:
     """
     Export all items from a DynamoDB table to a JSON file stored in an S3 bucket.
-    
+
     This function scans the specified DynamoDB table (with pagination support)
     and exports the data as a formatted JSON file to the given S3 bucket.
-    
+    With more than one segment, the table is read with a parallel scan whose
+    segments run on a thread pool and feed the same output.
+    In streaming mode, items are written as JSON Lines and uploaded page by page
+    through a multipart upload instead of being collected in memory first, and
+    progress is checkpointed so a failed export can be resumed. Streamed output can be
+    gzip or zstd compressed and rolled over into size-capped part files with a manifest.
+
     Args:
         table_name (str): The name of the DynamoDB table.
         bucket_name (str): The destination S3 bucket.
         file_name (str): The S3 object key (e.g., backup.json) for the exported data.
         dry_run (bool): If True, simulate the export without uploading to S3.
+        segments (int): Number of parallel scan segments.
+        max_read_capacity (float): Optional cap on consumed read capacity units per second.
+        stream (bool): If True, stream JSON Lines to S3 through a multipart upload.
+        part_size (int): Size in bytes of each multipart upload part in streaming mode.
+        checkpoint_file (str): Path of the checkpoint file in streaming mode. Defaults to
+            '<table_name>.export-checkpoint.json' in the current directory.
+        resume (bool): If True, continue a streaming export from its checkpoint file.
+        compression (str): Compression for streamed output: 'none', 'gzip' or 'zstd'.
+        max_file_size (int): Optional size in bytes at which streamed output rolls over
+            to a new part file.
     """
-    dynamodb = boto3.resource('dynamodb')
-    s3 = boto3.client('s3')
-    table = dynamodb.Table(table_name)
-    
+    ensure_pool_size(segments)
+    dynamodb = get_client('dynamodb')
+    s3 = get_client('s3')
+
+    if (resume or compression != 'none' or max_file_size) and not stream:
+        logging.error("Resuming, compression and part files require '--stream'.")
+        sys.exit(1)
+    if compression == 'zstd' and zstandard is None:
+        logging.error("zstd compression requires the 'zstandard' package. Install it with 'pip install zstandard'.")
+        sys.exit(1)
+
+    if stream:
+        stream_export(
+            dynamodb, s3, table_name, bucket_name, file_name, dry_run, segments, max_read_capacity, part_size,
+            checkpoint_file=checkpoint_file, resume=resume, compression=compression, max_file_size=max_file_size
+        )
+        return
+
     try:
-        data = table.scan()
-        items = data.get('Items', [])
-        # Handle pagination if necessary.
-        while 'LastEvaluatedKey' in data:
-            data = table.scan(ExclusiveStartKey=data['LastEvaluatedKey'])
-            items.extend(data.get('Items', []))
+        items = []
+        for _, page, _ in iter_scan_pages(dynamodb, table_name, segments, max_read_capacity):
+            items.extend(page)
     except Exception as e:
         logging.error(f"Error scanning DynamoDB table '{table_name}': {e}")
         sys.exit(1)
-    
+
     # Convert the data to a formatted JSON string.
     json_data = json.dumps(items, indent=4, default=str)
-    
+
     if dry_run:
         print(f"Dry run: Would export data from DynamoDB table '{table_name}' to s3://{bucket_name}/{file_name}.")
     else:
@@ -66,11 +528,56 @@ def parse_arguments() -> argparse.Namespace:
         '--dry-run', action='store_true',
         help="Simulate the export without actually uploading data to S3."
     )
+    parser.add_argument(
+        '--segments', type=int, default=1,
+        help="Number of parallel scan segments, each read on its own thread. Default is 1."
+    )
+    parser.add_argument(
+        '--max-read-capacity', type=float, default=None,
+        help="Cap on consumed read capacity units per second across all segments. Default is no cap."
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="Stream items as JSON Lines through a multipart upload instead of building one JSON document."
+    )
+    parser.add_argument(
+        '--part-size', type=int, default=8,
+        help="Size in MB of each multipart upload part when streaming (minimum 5). Default is 8."
+    )
+    parser.add_argument(
+        '--checkpoint-file', default=None,
+        help="Checkpoint file for streaming exports. Default is '<table_name>.export-checkpoint.json'."
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help="Resume a failed streaming export from its checkpoint file."
+    )
+    parser.add_argument(
+        '--compression', choices=sorted(COMPRESSION_SUFFIXES), default='none',
+        help="Compress streamed output with gzip or zstd (requires 'zstandard'). Default is none."
+    )
+    parser.add_argument(
+        '--max-file-size', type=int, default=None,
+        help="Roll streamed output over to a new part file every this many MB and write a manifest."
+    )
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    export_dynamodb_to_s3(args.table_name, args.bucket_name, args.file_name, dry_run=args.dry_run)
+    export_dynamodb_to_s3(
+        args.table_name,
+        args.bucket_name,
+        args.file_name,
+        dry_run=args.dry_run,
+        segments=args.segments,
+        max_read_capacity=args.max_read_capacity,
+        stream=args.stream,
+        part_size=args.part_size * MB,
+        checkpoint_file=args.checkpoint_file,
+        resume=args.resume,
+        compression=args.compression,
+        max_file_size=args.max_file_size * MB if args.max_file_size else None
+    )
 
 if __name__ == "__main__":
     main()
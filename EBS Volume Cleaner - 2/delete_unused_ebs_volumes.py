@@ -1,38 +1,58 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
 
-def delete_unused_ebs_volumes(dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
+from inventory_cache import DEFAULT_TTL, InventoryCache  # noqa: E402
+
+def list_available_volume_ids(ec2) -> list:
+    """Return the IDs of all available (unattached) volumes, following pagination."""
+    volume_ids = []
+    paginator = ec2.get_paginator('describe_volumes')
+    for page in paginator.paginate(Filters=[{'Name': 'status', 'Values': ['available']}]):
+        volume_ids.extend(volume['VolumeId'] for volume in page.get('Volumes', []))
+    return volume_ids
+
+def delete_unused_ebs_volumes(dry_run: bool = False, cache_ttl: float = DEFAULT_TTL) -> None:
     """
     Delete all available (unused) EBS volumes in your AWS account.
 
+    A dry run reads the volume listing from the local inventory cache when it is younger
+    than `cache_ttl`; a real run always fetches a fresh one. Deleted volumes are removed from it.
+
     Args:
         dry_run (bool): If True, simulate the deletion without actually deleting volumes.
+        cache_ttl (float): Maximum age in seconds of the cached volume listing; 0 always fetches a fresh one.
     """
-    ec2 = boto3.client('ec2')
+    ec2 = get_client('ec2')
+    region = ec2.meta.region_name
+    cache = InventoryCache(ttl=cache_ttl)
     try:
-        response = ec2.describe_volumes(Filters=[{'Name': 'status', 'Values': ['available']}])
+        volume_ids = cache.listing('available-volumes', region, lambda: list_available_volume_ids(ec2),
+                                   refresh=not dry_run)
     except Exception as e:
         logging.error(f"Error retrieving volumes: {e}")
         sys.exit(1)
     
-    volumes = response.get('Volumes', [])
-    if not volumes:
+    if not volume_ids:
         print("No available volumes found to delete.")
         return
 
-    for volume in volumes:
-        volume_id = volume.get('VolumeId')
+    deleted = []
+    for volume_id in volume_ids:
         try:
             if dry_run:
                 print(f"Dry run: Would delete volume: {volume_id}")
             else:
                 ec2.delete_volume(VolumeId=volume_id)
                 print(f"Deleted volume: {volume_id}")
+                deleted.append(volume_id)
         except Exception as e:
             logging.error(f"Error deleting volume {volume_id}: {e}")
+    cache.discard('available-volumes', region, deleted)
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -43,11 +63,17 @@ def parse_arguments() -> argparse.Namespace:
         action='store_true',
         help="Simulate deletion without actually deleting any volumes."
     )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=DEFAULT_TTL,
+        help=f"Seconds for which a dry run reuses the cached volume listing; 0 always fetches. Default is {DEFAULT_TTL:g}."
+    )
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    delete_unused_ebs_volumes(dry_run=args.dry_run)
+    delete_unused_ebs_volumes(dry_run=args.dry_run, cache_ttl=args.cache_ttl)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
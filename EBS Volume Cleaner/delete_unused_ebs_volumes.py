@@ -1,37 +1,186 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import asyncio
 import sys
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import AsyncExitStack
 
-def delete_unused_ebs_volumes(dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import aws_async  # noqa: E402
+from aws_clients import ensure_pool_size, get_client, get_session  # noqa: E402
+from inventory_cache import DEFAULT_TTL, InventoryCache  # noqa: E402
+
+def get_enabled_regions(session) -> list:
+    """Return the names of all regions enabled for the account."""
+    ec2 = get_client('ec2', session.region_name or 'us-east-1')
+    return sorted(region['RegionName'] for region in ec2.describe_regions()['Regions'])
+
+def list_available_volumes(ec2) -> list:
+    """Return the IDs of all available (unattached) volumes in a region, following pagination."""
+    volume_ids = []
+    paginator = ec2.get_paginator('describe_volumes')
+    for page in paginator.paginate(Filters=[{'Name': 'status', 'Values': ['available']}]):
+        volume_ids.extend(volume['VolumeId'] for volume in page.get('Volumes', []))
+    return volume_ids
+
+async def list_available_volumes_async(ec2) -> list:
+    """Asyncio counterpart of list_available_volumes() for an aiobotocore EC2 client."""
+    volume_ids = []
+    paginator = ec2.get_paginator('describe_volumes')
+    async for page in paginator.paginate(Filters=[{'Name': 'status', 'Values': ['available']}]):
+        volume_ids.extend(volume['VolumeId'] for volume in page.get('Volumes', []))
+    return volume_ids
+
+async def delete_volumes_async(regions: list, cache: InventoryCache, dry_run: bool, workers: int) -> tuple:
+    """
+    Scan the regions and delete their available volumes on one thread, with up to `workers` calls in flight.
+
+    Throttled calls are retried by the clients' adaptive retry mode, which also slows the
+    request rate of the region that throttled.
+
+    Returns:
+        tuple: Whether any volume was found, a dict of the deleted volume IDs per region,
+        and the regions that could not be scanned.
+    """
+    async with AsyncExitStack() as stack:
+        clients = {
+            region: await stack.enter_async_context(
+                aws_async.create_client('ec2', region, max_pool_connections=workers)
+            )
+            for region in regions
+        }
+
+        async def scan(region: str) -> tuple:
+            volume_ids = cache.get('available-volumes', region) if dry_run else None
+            if volume_ids is None:
+                try:
+                    volume_ids = await list_available_volumes_async(clients[region])
+                except Exception as e:
+                    logging.error(f"Error retrieving volumes in {region}: {e}")
+                    return region, None
+                cache.put('available-volumes', region, volume_ids)
+            return region, volume_ids
+
+        found = []
+        failed_regions = []
+        for region, volume_ids in await aws_async.bounded_map(scan, regions, workers):
+            if volume_ids is None:
+                failed_regions.append(region)
+                continue
+            for volume_id in volume_ids:
+                if dry_run:
+                    print(f"Dry run: Volume {volume_id} in {region} would be deleted.")
+                found.append((region, volume_id))
+        if dry_run:
+            return bool(found), {}, failed_regions
+
+        async def delete(volume: tuple) -> tuple:
+            region, volume_id = volume
+            try:
+                await clients[region].delete_volume(VolumeId=volume_id)
+            except Exception as e:
+                logging.error(f"Error deleting volume {volume_id} in {region}: {e}")
+                return None
+            print(f"Deleted volume: {volume_id} in {region}")
+            return volume
+
+        deleted = {}
+        for volume in await aws_async.bounded_map(delete, found, workers):
+            if volume:
+                deleted.setdefault(volume[0], []).append(volume[1])
+        return bool(found), deleted, failed_regions
+
+def delete_unused_ebs_volumes(dry_run: bool = False, regions: list = None, workers: int = 10,
+                              cache_ttl: float = DEFAULT_TTL, backend: str = 'threads') -> None:
     """
     Delete all unused (available) EBS volumes in your AWS account.
-    
+
+    Every enabled region (or the given regions) is scanned in parallel, and volumes are
+    deleted on a shared worker pool. Throttled calls are retried by the per-region clients'
+    adaptive retry mode, which also slows the request rate of the region that throttled.
+    Exits with status 1 if any region could not be scanned.
+    Dry runs read volume listings from the local inventory cache when it is younger than
+    `cache_ttl`; real runs always fetch fresh listings. Deleted volumes are removed from it. With the 'asyncio' backend the
+    scans and deletions run as coroutines on one thread instead.
+
     Args:
         dry_run (bool): If True, only print which volumes would be deleted without actually deleting them.
+        regions (list): Regions to clean up. Defaults to every enabled region.
+        workers (int): Maximum number of concurrent API calls.
+        cache_ttl (float): Maximum age in seconds of cached volume listings; 0 always fetches fresh ones.
+        backend (str): 'threads' for a thread pool, or 'asyncio' for aiobotocore coroutines.
     """
-    ec2 = boto3.client('ec2')
+    if backend == 'asyncio' and not aws_async.available():
+        logging.error(aws_async.MISSING_MESSAGE)
+        sys.exit(1)
+    session = get_session()
     try:
-        volumes = ec2.describe_volumes(Filters=[{'Name': 'status', 'Values': ['available']}])
+        regions = regions or get_enabled_regions(session)
     except Exception as e:
-        logging.error(f"Error retrieving volumes: {e}")
+        logging.error(f"Error retrieving regions: {e}")
         sys.exit(1)
 
-    if not volumes['Volumes']:
-        print("No available volumes to delete.")
+    cache = InventoryCache(ttl=cache_ttl)
+    if backend == 'asyncio':
+        found_any, deleted, failed_regions = asyncio.run(delete_volumes_async(regions, cache, dry_run, workers))
+        report_results(cache, found_any, deleted, failed_regions)
         return
 
-    for volume in volumes['Volumes']:
-        volume_id = volume.get('VolumeId')
-        try:
-            if dry_run:
-                print(f"Dry run: Volume {volume_id} would be deleted.")
-            else:
-                ec2.delete_volume(VolumeId=volume_id)
-                print(f"Deleted volume: {volume_id}")
-        except Exception as e:
-            logging.error(f"Error deleting volume {volume_id}: {e}")
+    # One pooled client per region, shared by every worker.
+    ensure_pool_size(workers)
+    clients = {region: get_client('ec2', region) for region in regions}
+
+    def scan(region: str) -> list:
+        return cache.listing('available-volumes', region, lambda: list_available_volumes(clients[region]),
+                             refresh=not dry_run)
+
+    found_any = False
+    failed_regions = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        scans = {
+            executor.submit(scan, region): region
+            for region in regions
+        }
+        deletions = {}
+        for future in as_completed(scans):
+            region = scans[future]
+            try:
+                volume_ids = future.result()
+            except Exception as e:
+                logging.error(f"Error retrieving volumes in {region}: {e}")
+                failed_regions.append(region)
+                continue
+            for volume_id in volume_ids:
+                found_any = True
+                if dry_run:
+                    print(f"Dry run: Volume {volume_id} in {region} would be deleted.")
+                else:
+                    deletion = executor.submit(clients[region].delete_volume, VolumeId=volume_id)
+                    deletions[deletion] = (region, volume_id)
+
+        deleted = {}
+        for future in as_completed(deletions):
+            region, volume_id = deletions[future]
+            try:
+                future.result()
+                print(f"Deleted volume: {volume_id} in {region}")
+                deleted.setdefault(region, []).append(volume_id)
+            except Exception as e:
+                logging.error(f"Error deleting volume {volume_id} in {region}: {e}")
+
+    report_results(cache, found_any, deleted, failed_regions)
+
+def report_results(cache: InventoryCache, found_any: bool, deleted: dict, failed_regions: list) -> None:
+    """Drop deleted volumes from the cache, then report, exiting with status 1 if any region could not be scanned."""
+    for region, volume_ids in deleted.items():
+        cache.discard('available-volumes', region, volume_ids)
+    if failed_regions:
+        logging.error(f"Could not retrieve volumes in: {', '.join(sorted(failed_regions))}")
+        sys.exit(1)
+    if not found_any:
+        print("No available volumes to delete.")
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
@@ -41,11 +190,29 @@ def parse_arguments():
         '--dry-run', action='store_true',
         help="Perform a dry run without actually deleting volumes."
     )
+    parser.add_argument(
+        '--regions', nargs='+',
+        help="Regions to clean up (e.g., us-east-1 eu-west-1). Defaults to every enabled region."
+    )
+    parser.add_argument(
+        '--workers', type=int, default=10,
+        help="Maximum number of concurrent API calls. Default is 10."
+    )
+    parser.add_argument(
+        '--cache-ttl', type=float, default=DEFAULT_TTL,
+        help=f"Seconds for which a dry run reuses cached volume listings; 0 always fetches. Default is {DEFAULT_TTL:g}."
+    )
+    parser.add_argument(
+        '--backend', choices=aws_async.BACKENDS, default='threads',
+        help="Run API calls on a thread pool, or as asyncio coroutines on one thread (requires aiobotocore). "
+             "Default is threads."
+    )
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    delete_unused_ebs_volumes(dry_run=args.dry_run)
+    delete_unused_ebs_volumes(dry_run=args.dry_run, regions=args.regions, workers=args.workers,
+                              cache_ttl=args.cache_ttl, backend=args.backend)
 
 if __name__ == "__main__":
     main()
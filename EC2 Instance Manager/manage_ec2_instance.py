@@ -1,59 +1,295 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import sys
 import logging
+import re
+import time
+import os
 
-def manage_ec2_instance(instance_id: str, action: str) -> None:
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
+from inventory_cache import InventoryCache  # noqa: E402
+
+ACTIONS = {
+    'start': 'start_instances',
+    'stop': 'stop_instances',
+    'restart': 'reboot_instances',
+    'terminate': 'terminate_instances'
+}
+# State each action settles in; reboots keep the instance running, so there is nothing to wait for.
+TARGET_STATES = {
+    'start': 'running',
+    'stop': 'stopped',
+    'terminate': 'terminated'
+}
+# States from which an instance will never reach the target state of the action.
+FAILED_STATES = {
+    'running': {'shutting-down', 'terminated'},
+    'stopped': {'shutting-down', 'terminated'},
+    'terminated': set()
+}
+# Transitional state an instance passes through on its way to each target state.
+TRANSITION_STATES = {
+    'running': 'pending',
+    'stopped': 'stopping'
+}
+# States an instance reverts to when the action fails, e.g. a start that hits
+# InsufficientInstanceCapacity goes back to 'stopped'. They only count as failures once
+# the instance has left the transitional state, or after the first poll, since the
+# instance may not yet have begun the transition when it is first described.
+REVERTED_STATES = {
+    'running': {'stopped'},
+    'stopped': {'running'},
+    'terminated': set()
+}
+ACTION_CHUNK_SIZE = 100
+# DescribeInstances filters accept at most 200 values each.
+DESCRIBE_CHUNK_SIZE = 200
+INSTANCE_ID_PATTERN = re.compile(r'\bi-[0-9A-Za-z]+\b')
+
+def chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def act_on_instances(method, instance_ids: list) -> tuple:
     """
-    Manage an EC2 instance by performing the specified action.
+    Call a multi-instance action once for a chunk, leaving out instances the call rejects.
+
+    One invalid or terminated instance fails the whole call, so when the error names
+    instances of the chunk, they are set aside and the call is retried without them.
+
+    Returns:
+        tuple: (initiated, rejected) where initiated lists the instances the action was
+        initiated for and rejected maps each rejected instance ID to its error.
+    """
+    rejected = {}
+    while instance_ids:
+        try:
+            method(InstanceIds=instance_ids)
+            return instance_ids, rejected
+        except ClientError as e:
+            named = set(INSTANCE_ID_PATTERN.findall(e.response['Error'].get('Message', ''))) & set(instance_ids)
+            if not named:
+                raise
+            rejected.update((instance_id, e) for instance_id in named)
+            instance_ids = [instance_id for instance_id in instance_ids if instance_id not in named]
+    return instance_ids, rejected
+
+def find_instances_by_tags(ec2, tags: list) -> list:
+    """Return the IDs of all non-terminated instances carrying every (key, value) tag, following pagination."""
+    filters = [{'Name': f"tag:{key}", 'Values': [value]} for key, value in tags]
+    filters.append({'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']})
+    instance_ids = []
+    paginator = ec2.get_paginator('describe_instances')
+    for page in paginator.paginate(Filters=filters):
+        for reservation in page.get('Reservations', []):
+            instance_ids.extend(instance['InstanceId'] for instance in reservation.get('Instances', []))
+    return sorted(instance_ids)
+
+def get_instance_states(ec2, instance_ids: list) -> dict:
+    """Return the current state name of each instance, using paginated describe_instances calls."""
+    states = {}
+    paginator = ec2.get_paginator('describe_instances')
+    for chunk in chunked(instance_ids, DESCRIBE_CHUNK_SIZE):
+        for page in paginator.paginate(Filters=[{'Name': 'instance-id', 'Values': chunk}]):
+            for reservation in page.get('Reservations', []):
+                for instance in reservation.get('Instances', []):
+                    states[instance['InstanceId']] = instance['State']['Name']
+    return states
+
+def wait_for_state(ec2, instance_ids: list, target_state: str, timeout: float = 600, interval: float = 5) -> tuple:
+    """
+    Wait until every instance reaches the target state, using one shared poller.
+
+    Each poll describes only the instances still pending, in batched requests, rather
+    than running one waiter per instance.
+
+    Returns:
+        tuple: (reached, failed, timed_out) where reached maps instance IDs to the seconds
+        it took them to reach the target state, failed maps instance IDs to the state that
+        rules the target out, and timed_out lists the instances still pending at the deadline.
+    """
+    started = time.monotonic()
+    pending = set(instance_ids)
+    reached, failed = {}, {}
+    in_transition = set()
+    polls = 0
+    while pending:
+        states = get_instance_states(ec2, sorted(pending))
+        elapsed = time.monotonic() - started
+        polls += 1
+        for instance_id, state in states.items():
+            if state == target_state:
+                reached[instance_id] = elapsed
+                pending.discard(instance_id)
+            elif state in FAILED_STATES[target_state] or (
+                    state in REVERTED_STATES[target_state] and (instance_id in in_transition or polls > 1)):
+                failed[instance_id] = state
+                pending.discard(instance_id)
+            elif state == TRANSITION_STATES.get(target_state):
+                in_transition.add(instance_id)
+        if not pending or elapsed >= timeout:
+            break
+        time.sleep(min(interval, max(0, timeout - elapsed)))
+    return reached, failed, sorted(pending)
+
+def manage_ec2_instances(instance_ids: list, action: str, wait: bool = True, timeout: float = 600,
+                         interval: float = 5) -> None:
+    """
+    Perform an action on many EC2 instances and wait for them to reach the resulting state.
+
+    Instances are acted on in chunked multi-instance calls; instances a call rejects are
+    reported as failed and the rest of their chunk is retried. Unless `wait` is False, a single
+    poller then tracks every instance until it reaches the target state, and a completion
+    summary with timings is printed.
 
     Args:
-        instance_id (str): The EC2 instance ID.
+        instance_ids (list): The EC2 instance IDs.
         action (str): The action to perform: start, stop, restart, or terminate.
+        wait (bool): If True, wait for the instances to reach the action's target state.
+        timeout (float): Maximum number of seconds to wait.
+        interval (float): Seconds between polls.
     """
-    ec2 = boto3.client('ec2')
-    
-    actions = {
-        'start': 'start_instances',
-        'stop': 'stop_instances',
-        'restart': 'reboot_instances',
-        'terminate': 'terminate_instances'
-    }
-    
-    if action not in actions:
+    if action not in ACTIONS:
         print(f"Invalid action: {action}. Use 'start', 'stop', 'restart', or 'terminate'.")
         sys.exit(1)
-    
+
+    ec2 = get_client('ec2')
+    method = getattr(ec2, ACTIONS[action])
+    started = time.monotonic()
+    initiated, errors = [], 0
+    for chunk in chunked(instance_ids, ACTION_CHUNK_SIZE):
+        try:
+            accepted, rejected = act_on_instances(method, chunk)
+        except Exception as e:
+            errors += len(chunk)
+            logging.error(f"Error while performing {action} on instances {', '.join(chunk)}: {e}")
+            continue
+        for instance_id, error in sorted(rejected.items()):
+            logging.error(f"Error while performing {action} on instance {instance_id}: {error}")
+        errors += len(rejected)
+        if accepted:
+            initiated.extend(accepted)
+            print(f"{action.capitalize()} action initiated for {len(accepted)} instances: {', '.join(accepted)}")
+    action_seconds = time.monotonic() - started
+    if initiated:
+        # Instance states changed, so cached instance inventories are out of date.
+        cache = InventoryCache()
+        for kind in ('running-instances', 'impaired-instances'):
+            cache.invalidate(kind, ec2.meta.region_name)
+
+    target_state = TARGET_STATES.get(action)
+    if not wait or not target_state or not initiated:
+        print(f"{action.capitalize()} initiated for {len(initiated)} instances in {action_seconds:.1f}s, "
+              f"{errors} failed.")
+        if errors:
+            sys.exit(1)
+        return
+
+    print(f"Waiting for {len(initiated)} instances to reach '{target_state}'...")
     try:
-        # Dynamically call the corresponding EC2 method
-        method = getattr(ec2, actions[action])
-        response = method(InstanceIds=[instance_id])
-        print(f"{action.capitalize()} action initiated for instance {instance_id}.")
-        print(response)
+        reached, failed, timed_out = wait_for_state(ec2, initiated, target_state, timeout, interval)
     except Exception as e:
-        logging.error(f"Error while performing {action} on instance {instance_id}: {e}")
+        logging.error(f"Error while waiting for instances to reach '{target_state}': {e}")
+        sys.exit(1)
+
+    for instance_id, state in sorted(failed.items()):
+        logging.error(f"Instance {instance_id} is '{state}' and will not reach '{target_state}'.")
+    if timed_out:
+        logging.error(f"Timed out after {timeout:.0f}s waiting for: {', '.join(timed_out)}")
+
+    total_seconds = time.monotonic() - started
+    print(f"Summary: {len(reached)}/{len(instance_ids)} instances reached '{target_state}', "
+          f"{len(failed)} failed, {len(timed_out)} timed out, {errors} not initiated.")
+    if reached:
+        durations = sorted(reached.values())
+        print(f"Timings: action calls {action_seconds:.1f}s, time to '{target_state}' "
+              f"min {durations[0]:.1f}s / median {durations[len(durations) // 2]:.1f}s / "
+              f"max {durations[-1]:.1f}s, total {total_seconds:.1f}s.")
+    else:
+        print(f"Timings: action calls {action_seconds:.1f}s, total {total_seconds:.1f}s.")
+    if errors or failed or timed_out:
         sys.exit(1)
 
+def manage_ec2_instance(instance_id: str, action: str) -> None:
+    """
+    Manage an EC2 instance by performing the specified action.
+
+    Args:
+        instance_id (str): The EC2 instance ID.
+        action (str): The action to perform: start, stop, restart, or terminate.
+    """
+    manage_ec2_instances([instance_id], action)
+
 def parse_arguments():
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(
-        description="Manage an EC2 instance with start, stop, restart, or terminate actions."
+        description="Manage EC2 instances with start, stop, restart, or terminate actions."
     )
     parser.add_argument(
-        'instance_id',
-        help="The ID of the EC2 instance (e.g., i-0123456789abcdef0)"
+        'instance_ids',
+        nargs='*',
+        help="The IDs of the EC2 instances (e.g., i-0123456789abcdef0). Omit when using --tag."
     )
     parser.add_argument(
         'action',
         choices=['start', 'stop', 'restart', 'terminate'],
-        help="Action to perform on the instance"
+        help="Action to perform on the instances"
+    )
+    parser.add_argument(
+        '--tag',
+        action='append',
+        help="Act on all instances with this tag, in the format Key=Value. Can be repeated."
+    )
+    parser.add_argument(
+        '--no-wait',
+        action='store_true',
+        help="Return once the action is initiated instead of waiting for the target state."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=600,
+        help="Maximum seconds to wait for the target state. Default is 600."
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=5,
+        help="Seconds between state polls. Default is 5."
+    )
+    args = parser.parse_args()
+    if bool(args.instance_ids) == bool(args.tag):
+        parser.error("Provide either instance IDs or --tag.")
+    return args
 
 def main():
     args = parse_arguments()
-    manage_ec2_instance(args.instance_id, args.action.lower())
+    instance_ids = args.instance_ids
+    if args.tag:
+        tags = []
+        for tag in args.tag:
+            if '=' not in tag:
+                logging.error(f"Invalid tag format: '{tag}'. Expected format is Key=Value.")
+                sys.exit(1)
+            tags.append(tuple(tag.split('=', 1)))
+        try:
+            instance_ids = find_instances_by_tags(get_client('ec2'), tags)
+        except Exception as e:
+            logging.error(f"Error finding instances by tag: {e}")
+            sys.exit(1)
+        if not instance_ids:
+            print("No instances found with the given tags.")
+            return
+    manage_ec2_instances(
+        instance_ids,
+        args.action.lower(),
+        wait=not args.no_wait,
+        timeout=args.timeout,
+        interval=args.poll_interval
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import csv
+import json
 import logging
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+
+# CreateTags accepts at most 1000 resource IDs per request.
+MAX_RESOURCES_PER_CALL = 1000
 
 def tag_ec2_instance(instance_id: str, tags: list, dry_run: bool = False) -> None:
     """
@@ -13,7 +22,7 @@ def tag_ec2_instance(instance_id: str, tags: list, dry_run: bool = False) -> Non
         tags (list): List of tags in the format [{'Key': key, 'Value': value}, ...].
         dry_run (bool): If True, simulate tagging without making any changes.
     """
-    ec2 = boto3.client('ec2')
+    ec2 = get_client('ec2')
     try:
         if dry_run:
             print(f"Dry run: Would tag instance {instance_id} with tags: {tags}")
@@ -24,29 +33,190 @@ def tag_ec2_instance(instance_id: str, tags: list, dry_run: bool = False) -> Non
         logging.error(f"Error tagging instance {instance_id}: {e}")
         sys.exit(1)
 
+def iter_tag_requests(stream, input_format: str = 'jsonl'):
+    """
+    Yield (resource_id, tags) pairs from a CSV or JSONL stream.
+
+    JSONL lines look like {"resource_id": "i-1234567890abcdef0", "tags": {"Owner": "DevOps"}}.
+    CSV input has a header row with a 'resource_id' column; every other column is a tag
+    key, and empty cells are skipped.
+    """
+    if input_format == 'csv':
+        for row in csv.DictReader(stream):
+            resource_id = (row.pop('resource_id', None) or '').strip()
+            if resource_id:
+                yield resource_id, {key: value for key, value in row.items() if key and value}
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield record['resource_id'], {str(k): str(v) for k, v in record['tags'].items()}
+        except (ValueError, KeyError, AttributeError) as e:
+            logging.error(f"Skipping invalid JSONL line {line_number}: {e}")
+
+def get_current_tags(ec2, resource_ids: set) -> dict:
+    """
+    Return the current tags of the given resources from a single paginated describe_tags pass.
+
+    Tags of resources outside `resource_ids` are discarded as pages arrive, so memory stays
+    proportional to the requested resources rather than to every tag in the account.
+    """
+    current = {}
+    paginator = ec2.get_paginator('describe_tags')
+    for page in paginator.paginate(PaginationConfig={'PageSize': 1000}):
+        for tag in page.get('Tags', []):
+            if tag['ResourceId'] in resource_ids:
+                current.setdefault(tag['ResourceId'], {})[tag['Key']] = tag['Value']
+    return current
+
+def group_by_tag_set(requests: dict, current: dict) -> dict:
+    """
+    Group resources that need tagging by their identical desired tag set.
+
+    Resources whose current tags already include every desired key and value are left out.
+
+    Returns:
+        dict: Maps a sorted tuple of (key, value) pairs to the list of resource IDs to tag.
+    """
+    groups = {}
+    for resource_id, tags in requests.items():
+        existing = current.get(resource_id, {})
+        if all(existing.get(key) == value for key, value in tags.items()):
+            continue
+        groups.setdefault(tuple(sorted(tags.items())), []).append(resource_id)
+    return groups
+
+def bulk_tag_resources(stream, input_format: str = 'jsonl', batch_size: int = 200,
+                       workers: int = 8, dry_run: bool = False) -> None:
+    """
+    Apply tags to many resources read from a CSV or JSONL stream.
+
+    Resources sharing an identical tag set are tagged together with chunked multi-resource
+    create_tags calls issued on a worker pool, and resources whose current tags (read in
+    one describe_tags pass) already match are skipped.
+
+    Args:
+        stream: Text stream of CSV or JSONL tag requests.
+        input_format (str): 'csv' or 'jsonl'.
+        batch_size (int): Resource IDs per create_tags call, at most 1000.
+        workers (int): Number of concurrent create_tags calls.
+        dry_run (bool): If True, report the calls without making them.
+    """
+    requests = {}
+    for resource_id, tags in iter_tag_requests(stream, input_format):
+        if tags:
+            requests.setdefault(resource_id, {}).update(tags)
+    if not requests:
+        print("No tag requests found in input.")
+        return
+
+    ensure_pool_size(workers)
+    ec2 = get_client('ec2')
+    try:
+        current = get_current_tags(ec2, set(requests))
+    except Exception as e:
+        logging.error(f"Error retrieving current tags: {e}")
+        sys.exit(1)
+
+    groups = group_by_tag_set(requests, current)
+    batch_size = max(1, min(batch_size, MAX_RESOURCES_PER_CALL))
+    batches = [
+        (resource_ids[start:start + batch_size], [{'Key': k, 'Value': v} for k, v in tag_set])
+        for tag_set, resource_ids in groups.items()
+        for start in range(0, len(resource_ids), batch_size)
+    ]
+    to_tag = sum(len(resource_ids) for resource_ids in groups.values())
+    skipped = len(requests) - to_tag
+
+    if dry_run:
+        for resource_ids, tags in batches:
+            print(f"Dry run: Would tag {len(resource_ids)} resources with tags: {tags}")
+        print(f"Dry run: {to_tag} resources to tag in {len(batches)} calls, {skipped} already up to date.")
+        return
+
+    tagged = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(ec2.create_tags, Resources=resource_ids, Tags=tags): (resource_ids, tags)
+            for resource_ids, tags in batches
+        }
+        for future in as_completed(futures):
+            resource_ids, tags = futures[future]
+            try:
+                future.result()
+                tagged += len(resource_ids)
+                print(f"Tagged {len(resource_ids)} resources with tags: {tags}")
+            except Exception as e:
+                failed += len(resource_ids)
+                logging.error(f"Error tagging resources {', '.join(resource_ids)}: {e}")
+
+    print(f"Tagged {tagged} resources, skipped {skipped} already up to date, {failed} failed.")
+    if failed:
+        sys.exit(1)
+
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Tag an EC2 instance with specified key-value pairs."
+        description="Tag an EC2 instance with specified key-value pairs, or bulk-tag resources from stdin."
     )
     parser.add_argument(
         "instance_id",
-        help="The ID of the EC2 instance (e.g., i-1234567890abcdef0)"
+        nargs="?",
+        help="The ID of the EC2 instance (e.g., i-1234567890abcdef0). Omit when using --bulk."
     )
     parser.add_argument(
         "--tags",
         action="append",
-        required=True,
         help="Tag in the format Key=Value. Example: --tags Owner=DevOps"
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Read (resource, tags) requests from stdin and tag them in bulk."
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=["jsonl", "csv"],
+        default="jsonl",
+        help="Format of the bulk input on stdin (default: jsonl)."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=200,
+        help="Resource IDs per create_tags call in bulk mode, at most 1000 (default: 200)."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent create_tags calls in bulk mode (default: 8)."
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Simulate tagging without actually applying changes."
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.bulk:
+        if args.instance_id or args.tags:
+            parser.error("--bulk reads resources and tags from stdin; do not pass an instance ID or --tags.")
+    elif not (args.instance_id and args.tags):
+        parser.error("Provide an instance ID and at least one --tags, or --bulk.")
+    return args
 
 def main():
     args = parse_arguments()
+    if args.bulk:
+        bulk_tag_resources(
+            sys.stdin,
+            input_format=args.input_format,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            dry_run=args.dry_run
+        )
+        return
     # Parse tags from key=value strings to the required dictionary format.
     tags = []
     for tag in args.tags:
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
 
 def rotate_iam_keys(username: str, dry_run: bool = False) -> None:
     """
@@ -15,7 +18,7 @@ def rotate_iam_keys(username: str, dry_run: bool = False) -> None:
         username (str): The IAM username whose keys will be rotated.
         dry_run (bool): If True, simulate the deletion and creation process.
     """
-    iam = boto3.client('iam')
+    iam = get_client('iam')
     
     try:
         response = iam.list_access_keys(UserName=username)
@@ -1,65 +1,208 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
+import re
 import sys
+import os
+from datetime import datetime, timedelta, timezone
 
-def stop_idle_instances(core_threshold: int, dry_run: bool = False) -> None:
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
+from inventory_cache import DEFAULT_TTL, InventoryCache  # noqa: E402
+
+# GetMetricData accepts at most 500 metric queries per request.
+MAX_METRIC_QUERIES = 500
+# Each instance needs three queries: CPUUtilization, NetworkIn and NetworkOut.
+QUERIES_PER_INSTANCE = 3
+STOP_CHUNK_SIZE = 100
+INSTANCE_ID_PATTERN = re.compile(r'\bi-[0-9a-f]+\b')
+
+def chunked(items: list, size: int):
+    """Yield successive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def get_running_instance_ids(ec2) -> list:
+    """Return the IDs of all running instances, following pagination."""
+    instance_ids = []
+    paginator = ec2.get_paginator('describe_instances')
+    for page in paginator.paginate(Filters=[{'Name': 'instance-state-name', 'Values': ['running']}]):
+        for reservation in page.get('Reservations', []):
+            instance_ids.extend(instance['InstanceId'] for instance in reservation.get('Instances', []))
+    return instance_ids
+
+def stop_instances(ec2, instance_ids: list) -> list:
+    """
+    Stop instances with one StopInstances call, leaving out instances the call rejects.
+
+    One terminated or already stopping instance fails the whole call, so when the error
+    names instances of the batch, they are logged and the call is retried without them.
+
+    Returns:
+        list: The IDs of the instances that were stopped.
+    """
+    while instance_ids:
+        try:
+            ec2.stop_instances(InstanceIds=instance_ids)
+            return instance_ids
+        except ClientError as e:
+            rejected = set(INSTANCE_ID_PATTERN.findall(e.response['Error'].get('Message', ''))) & set(instance_ids)
+            if not rejected:
+                raise
+            logging.error(f"Skipping instances {', '.join(sorted(rejected))}: {e}")
+            instance_ids = [instance_id for instance_id in instance_ids if instance_id not in rejected]
+    return instance_ids
+
+def get_instance_metrics(cloudwatch, instance_ids: list, lookback_hours: int) -> dict:
+    """
+    Fetch hourly CPU and network metrics for many instances with batched GetMetricData calls.
+
+    Returns:
+        dict: Maps each instance ID with data to a dict with its average 'cpu' percentage
+        and total 'network' bytes (in + out) over the lookback window.
+    """
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(hours=lookback_hours)
+    metrics = {}
+    for batch in chunked(instance_ids, MAX_METRIC_QUERIES // QUERIES_PER_INSTANCE):
+        queries = []
+        for index, instance_id in enumerate(batch):
+            for prefix, metric_name, stat in (
+                ('cpu', 'CPUUtilization', 'Average'),
+                ('netin', 'NetworkIn', 'Sum'),
+                ('netout', 'NetworkOut', 'Sum'),
+            ):
+                queries.append({
+                    'Id': f"{prefix}{index}",
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': 'AWS/EC2',
+                            'MetricName': metric_name,
+                            'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]
+                        },
+                        'Period': 3600,
+                        'Stat': stat
+                    },
+                    'ReturnData': True
+                })
+
+        values = {}
+        paginator = cloudwatch.get_paginator('get_metric_data')
+        for page in paginator.paginate(MetricDataQueries=queries, StartTime=start_time, EndTime=end_time):
+            for result in page.get('MetricDataResults', []):
+                values.setdefault(result['Id'], []).extend(result.get('Values', []))
+
+        for index, instance_id in enumerate(batch):
+            cpu = values.get(f"cpu{index}")
+            if not cpu:
+                continue
+            metrics[instance_id] = {
+                'cpu': sum(cpu) / len(cpu),
+                'network': sum(values.get(f"netin{index}", [])) + sum(values.get(f"netout{index}", []))
+            }
+    return metrics
+
+def stop_idle_instances(cpu_threshold: float = 5.0, network_threshold_mb: float = 5.0,
+                        lookback_hours: int = 24, dry_run: bool = False, cache_ttl: float = DEFAULT_TTL) -> None:
     """
-    Stop running EC2 instances that are considered idle based on their CPU core count.
+    Stop running EC2 instances that are idle based on their CPU and network metrics.
 
-    Instances with a core count less than the specified threshold are considered idle.
+    An instance is idle when its average CPU utilization over the lookback window is below
+    the CPU threshold and its total network traffic (in + out) is below the network threshold.
+    Metrics for all instances are fetched with batched GetMetricData calls, and idle
+    instances are stopped with chunked multi-instance StopInstances calls.
+    Instances without CPU metrics in the window are never considered idle. A dry run reads
+    the list of running instances from the local inventory cache when it is younger than
+    `cache_ttl`; a real run always fetches a fresh list, so it never acts on instances that
+    have since stopped or terminated. Stopped instances are removed from the cached list.
+    Metrics are always fetched.
 
     Args:
-        core_threshold (int): The CPU core count threshold below which an instance is considered idle.
+        cpu_threshold (float): Average CPU utilization percentage below which an instance is idle.
+        network_threshold_mb (float): Total network traffic in MB below which an instance is idle.
+        lookback_hours (int): Length of the metric window in hours.
         dry_run (bool): If True, simulate stopping the instances without taking action.
+        cache_ttl (float): Maximum age in seconds of the cached instance list; 0 always fetches a fresh one.
     """
-    ec2 = boto3.client('ec2')
+    ec2 = get_client('ec2')
+    cloudwatch = get_client('cloudwatch')
+    region = ec2.meta.region_name
+    cache = InventoryCache(ttl=cache_ttl)
     try:
-        instances = ec2.describe_instances(
-            Filters=[{'Name': 'instance-state-name', 'Values': ['running']}]
-        )
+        instance_ids = cache.listing('running-instances', region, lambda: get_running_instance_ids(ec2),
+                                     refresh=not dry_run)
+        metrics = get_instance_metrics(cloudwatch, instance_ids, lookback_hours)
     except Exception as e:
-        logging.error(f"Error retrieving instances: {e}")
+        logging.error(f"Error retrieving instances or metrics: {e}")
         sys.exit(1)
-    
+
+    network_threshold = network_threshold_mb * 1024 * 1024
+    idle = {
+        instance_id: usage for instance_id, usage in metrics.items()
+        if usage['cpu'] < cpu_threshold and usage['network'] < network_threshold
+    }
+
+    def describe(instance_id: str) -> str:
+        usage = idle[instance_id]
+        return f"{instance_id} (CPU: {usage['cpu']:.2f}%, Network: {usage['network'] / 1024 / 1024:.2f} MB)"
+
     stopped_any = False
-    for reservation in instances.get('Reservations', []):
-        for instance in reservation.get('Instances', []):
-            instance_id = instance.get('InstanceId')
-            cpu_options = instance.get('CpuOptions', {})
-            core_count = cpu_options.get('CoreCount', 0)
-            if core_count < core_threshold:
-                if dry_run:
-                    print(f"Dry run: Would stop idle instance {instance_id} (Core count: {core_count})")
-                else:
-                    try:
-                        ec2.stop_instances(InstanceIds=[instance_id])
-                        print(f"Stopped idle instance {instance_id} (Core count: {core_count})")
-                        stopped_any = True
-                    except Exception as e:
-                        logging.error(f"Error stopping instance {instance_id}: {e}")
+    for batch in chunked(sorted(idle), STOP_CHUNK_SIZE):
+        if dry_run:
+            for instance_id in batch:
+                print(f"Dry run: Would stop idle instance {describe(instance_id)}")
+            continue
+        try:
+            stopped = stop_instances(ec2, batch)
+        except Exception as e:
+            logging.error(f"Error stopping instances {', '.join(batch)}: {e}")
+            continue
+        cache.discard('running-instances', region, stopped)
+        for instance_id in stopped:
+            print(f"Stopped idle instance {describe(instance_id)}")
+        stopped_any = stopped_any or bool(stopped)
 
     if not stopped_any and not dry_run:
-        print("No idle instances found or all instances meet the core threshold.")
+        print("No idle instances found.")
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Stop idle EC2 instances based on a CPU core threshold."
+        description="Stop idle EC2 instances based on CloudWatch CPU and network metrics."
     )
     parser.add_argument(
-        '--threshold', type=int, default=5,
-        help="CPU core count threshold below which an instance is considered idle. Default is 5."
+        '--threshold', type=float, default=5.0,
+        help="Average CPU utilization percentage below which an instance is considered idle. Default is 5."
+    )
+    parser.add_argument(
+        '--network-threshold', type=float, default=5.0,
+        help="Total network traffic (in + out) in MB below which an instance is considered idle. Default is 5."
+    )
+    parser.add_argument(
+        '--lookback-hours', type=int, default=24,
+        help="Number of hours of metrics to evaluate. Default is 24."
     )
     parser.add_argument(
         '--dry-run', action='store_true',
         help="Simulate stopping idle instances without actually stopping them."
     )
+    parser.add_argument(
+        '--cache-ttl', type=float, default=DEFAULT_TTL,
+        help="Seconds for which a dry run reuses the cached list of running instances; 0 always fetches. "
+             f"Default is {DEFAULT_TTL:g}."
+    )
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    stop_idle_instances(core_threshold=args.threshold, dry_run=args.dry_run)
+    stop_idle_instances(
+        cpu_threshold=args.threshold,
+        network_threshold_mb=args.network_threshold,
+        lookback_hours=args.lookback_hours,
+        dry_run=args.dry_run,
+        cache_ttl=args.cache_ttl
+    )
 
 if __name__ == "__main__":
     main()
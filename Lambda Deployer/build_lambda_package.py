@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Bump when the archive layout changes so older cached artifacts are not reused.
+BUILD_FORMAT_VERSION = '3'
+# ZIP timestamps cannot predate 1980, so every entry gets this fixed modification time.
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+EXCLUDED_DIRS = {'__pycache__', '.git'}
+EXCLUDED_SUFFIXES = ('.pyc', '.pyo')
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'lambda-packages')
+# Dependencies are built for the Lambda runtime, whatever the build host runs.
+DEFAULT_PYTHON_VERSION = '3.12'
+DEFAULT_ARCHITECTURE = 'x86_64'
+LAMBDA_PLATFORMS = {
+    'x86_64': 'manylinux2014_x86_64',
+    'arm64': 'manylinux2014_aarch64'
+}
+
+def iter_files(root: str):
+    """Yield (archive_name, path) for every file under a directory, in sorted order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if name not in EXCLUDED_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith(EXCLUDED_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, filename)
+            yield os.path.relpath(path, root).replace(os.sep, '/'), path
+
+def is_executable(path: str) -> bool:
+    return bool(os.stat(path).st_mode & stat.S_IXUSR)
+
+def target_options(python_version: str, architecture: str) -> list:
+    """Return the pip options that select wheels for a Lambda runtime instead of the build host."""
+    return ['--platform', LAMBDA_PLATFORMS[architecture], '--python-version', python_version,
+            '--implementation', 'cp', '--only-binary=:all:']
+
+def archive_hash(download_info: dict) -> str:
+    """Return the 'sha256:<hex>' hash of a resolved wheel from a pip installation report, or None."""
+    archive_info = download_info.get('archive_info', {})
+    if 'sha256' in archive_info.get('hashes', {}):
+        return f"sha256:{archive_info['hashes']['sha256']}"
+    if archive_info.get('hash', '').startswith('sha256='):
+        return archive_info['hash'].replace('=', ':', 1)
+    return None
+
+def dependency_lock(requirements_file: str, python_version: str = DEFAULT_PYTHON_VERSION,
+                    architecture: str = DEFAULT_ARCHITECTURE) -> str:
+    """
+    Return requirements text that pins the complete dependency set to install.
+
+    pip resolves the requirements, including every transitive dependency, for the Lambda
+    runtime's Python version and architecture without installing anything. Each resolved
+    package is pinned to its version and, when the index provides one for every package,
+    to the hash of the exact wheel, so the lock determines the installed files.
+    """
+    with tempfile.TemporaryDirectory() as target_dir:
+        # pip only accepts platform options together with --target, even for a dry run.
+        result = subprocess.run(
+            [sys.executable, '-m', 'pip', 'install', '--dry-run', '--quiet', '--ignore-installed',
+             '--report', '-', '--target', target_dir, *target_options(python_version, architecture),
+             '-r', requirements_file],
+            check=True, capture_output=True, text=True
+        )
+    resolved = [
+        (item['metadata']['name'], item['metadata']['version'], archive_hash(item.get('download_info', {})))
+        for item in json.loads(result.stdout)['install']
+    ]
+    with_hashes = all(sha256 for _, _, sha256 in resolved)
+    return ''.join(sorted(
+        f"{name}=={version}{f' --hash={sha256}' if with_hashes else ''}\n" for name, version, sha256 in resolved
+    ))
+
+def content_key(source_dir: str, lock: str = None, python_version: str = DEFAULT_PYTHON_VERSION,
+                architecture: str = DEFAULT_ARCHITECTURE) -> str:
+    """
+    Return a SHA-256 key over a source tree, its resolved dependency set and the target runtime.
+
+    The key covers each file's archive name, executable bit and contents, the locked
+    dependencies from dependency_lock(), and the Python version and architecture the
+    dependencies are built for, so it changes exactly when the built package would change.
+    """
+    digest = hashlib.sha256(f"format:{BUILD_FORMAT_VERSION}\n".encode())
+    for name, path in iter_files(source_dir):
+        file_digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                file_digest.update(chunk)
+        digest.update(f"file:{name}:{int(is_executable(path))}:{file_digest.hexdigest()}\n".encode())
+    if lock is not None:
+        digest.update(b"requirements:" + hashlib.sha256(lock.encode()).hexdigest().encode() + b"\n")
+        digest.update(f"target:{' '.join(target_options(python_version, architecture))}\n".encode())
+    return digest.hexdigest()
+
+def write_deterministic_zip(zip_path: str, roots: list) -> None:
+    """
+    Write a reproducible ZIP of one or more directories.
+
+    Entries are sorted by name and get a fixed timestamp, fixed permissions and a
+    fixed creator system, so identical inputs always produce byte-identical archives.
+    Files from later roots are skipped if an earlier root already provided that name.
+    """
+    entries = {}
+    for root in roots:
+        for name, path in iter_files(root):
+            entries.setdefault(name, path)
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        for name in sorted(entries):
+            path = entries[name]
+            info = zipfile.ZipInfo(name, date_time=FIXED_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            info.external_attr = ((0o100755 if is_executable(path) else 0o100644) & 0xFFFF) << 16
+            with open(path, 'rb') as f:
+                archive.writestr(info, f.read())
+
+def build_package(function_name: str, source_dir: str, output_path: str, requirements_file: str = None,
+                  cache_dir: str = DEFAULT_CACHE_DIR, python_version: str = DEFAULT_PYTHON_VERSION,
+                  architecture: str = DEFAULT_ARCHITECTURE) -> tuple:
+    """
+    Build a function's deployment package, reusing the cached artifact when inputs are unchanged.
+
+    Dependencies are installed as binary wheels for the Lambda runtime given by
+    `python_version` and `architecture` ('x86_64' or 'arm64'), not for the build host.
+
+    Returns:
+        tuple: (function_name, output_path, key, cached) where cached is True when the
+        artifact came from the build cache.
+    """
+    if not os.path.isdir(source_dir):
+        raise FileNotFoundError(f"Source directory not found: {source_dir}")
+    lock = dependency_lock(requirements_file, python_version, architecture) if requirements_file else None
+    key = content_key(source_dir, lock, python_version, architecture)
+    cached_path = os.path.join(cache_dir, f"{key}.zip")
+    cached = os.path.exists(cached_path)
+
+    if not cached:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.TemporaryDirectory() as build_dir:
+            roots = [source_dir]
+            if lock is not None:
+                # Install exactly the locked set the key was computed from; it is already complete.
+                lock_file = os.path.join(build_dir, 'requirements.lock')
+                with open(lock_file, 'w') as f:
+                    f.write(lock)
+                dependencies_dir = os.path.join(build_dir, 'dependencies')
+                subprocess.run(
+                    [sys.executable, '-m', 'pip', 'install', '--quiet', '--no-compile', '--no-deps',
+                     *target_options(python_version, architecture), '-r', lock_file, '-t', dependencies_dir],
+                    check=True
+                )
+                roots.append(dependencies_dir)
+            temp_zip = os.path.join(build_dir, 'package.zip')
+            write_deterministic_zip(temp_zip, roots)
+            # Publish atomically so concurrent builds never see a partial artifact.
+            temp_cached = f"{cached_path}.{os.getpid()}.tmp"
+            shutil.copyfile(temp_zip, temp_cached)
+            os.replace(temp_cached, cached_path)
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    shutil.copyfile(cached_path, output_path)
+    return function_name, output_path, key, cached
+
+def manifest_errors(manifest) -> list:
+    """Return a description of every malformed entry in a build manifest."""
+    if not isinstance(manifest, dict):
+        return ["expected an object mapping function names to {\"source\": ..., \"requirements\": ...}"]
+    errors = []
+    for function_name, spec in manifest.items():
+        if not isinstance(spec, dict):
+            errors.append(f"entry '{function_name}' must be an object")
+        elif not isinstance(spec.get('source'), str) or not spec['source']:
+            errors.append(f"entry '{function_name}' has no 'source' directory")
+        elif spec.get('requirements') is not None and not isinstance(spec['requirements'], str):
+            errors.append(f"entry '{function_name}' has a 'requirements' value that is not a path")
+    return errors
+
+def build_manifest(manifest_path: str, output_dir: str, cache_dir: str = DEFAULT_CACHE_DIR, workers: int = None,
+                   python_version: str = DEFAULT_PYTHON_VERSION, architecture: str = DEFAULT_ARCHITECTURE) -> None:
+    """
+    Build every function in a JSON build manifest in parallel and write a deploy manifest.
+
+    The build manifest maps function names to their sources, e.g.
+    {"my-function": {"source": "src/my-function", "requirements": "src/my-function/requirements.txt"}}.
+    Relative paths are resolved against the manifest's directory. The resulting
+    '<output_dir>/manifest.json' maps function names to built ZIP files and can be passed
+    to 'deploy_lambda_function.py --manifest'.
+
+    Args:
+        manifest_path (str): Path to the JSON build manifest.
+        output_dir (str): Directory that receives the ZIP files and the deploy manifest.
+        cache_dir (str): Build cache directory.
+        workers (int): Number of functions built concurrently. Defaults to the CPU count.
+        python_version (str): Python version of the Lambda runtime, e.g. '3.12'.
+        architecture (str): Lambda architecture, 'x86_64' or 'arm64'.
+    """
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except Exception as e:
+        logging.error(f"Error reading manifest '{manifest_path}': {e}")
+        sys.exit(1)
+
+    invalid = manifest_errors(manifest)
+    if invalid:
+        for error in invalid:
+            logging.error(f"Invalid build manifest '{manifest_path}': {error}")
+        sys.exit(1)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    def resolve(path: str) -> str:
+        return os.path.join(base_dir, path) if path else None
+
+    deploy_manifest = {}
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                build_package, function_name, resolve(spec['source']),
+                os.path.join(output_dir, f"{function_name}.zip"), resolve(spec.get('requirements')), cache_dir,
+                python_version, architecture
+            ): function_name
+            for function_name, spec in manifest.items()
+        }
+        for future in as_completed(futures):
+            function_name = futures[future]
+            try:
+                _, output_path, key, cached = future.result()
+            except Exception as e:
+                logging.error(f"Error building package for '{function_name}': {e}")
+                failed += 1
+                continue
+            deploy_manifest[function_name] = os.path.basename(output_path)
+            print(f"{'Reused cached' if cached else 'Built'} package for '{function_name}' ({key[:12]}).")
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(dict(sorted(deploy_manifest.items())), f, indent=4)
+    print(f"Built {len(deploy_manifest)} packages into '{output_dir}', {failed} failed.")
+    if failed:
+        sys.exit(1)
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build reproducible, content-addressed Lambda deployment packages with a local build cache."
+    )
+    parser.add_argument(
+        'function_name',
+        nargs='?',
+        help="The name of the Lambda function to build a package for."
+    )
+    parser.add_argument(
+        'source_dir',
+        nargs='?',
+        help="The directory containing the function's source code."
+    )
+    parser.add_argument(
+        '--requirements',
+        help="requirements.txt whose dependencies are installed into the package."
+    )
+    parser.add_argument(
+        '--output',
+        help="Path of the built ZIP file. Default is '<function_name>.zip'."
+    )
+    parser.add_argument(
+        '--manifest',
+        help="JSON build manifest mapping function names to their source and requirements, built in parallel."
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='build',
+        help="Directory for packages and the deploy manifest when using --manifest. Default is 'build'."
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f"Build cache directory. Default is '{DEFAULT_CACHE_DIR}'."
+    )
+    parser.add_argument(
+        '--python-version',
+        default=DEFAULT_PYTHON_VERSION,
+        help=f"Python version of the Lambda runtime that dependencies are built for. Default is {DEFAULT_PYTHON_VERSION}."
+    )
+    parser.add_argument(
+        '--architecture',
+        choices=sorted(LAMBDA_PLATFORMS),
+        default=DEFAULT_ARCHITECTURE,
+        help=f"Lambda architecture that dependencies are built for. Default is {DEFAULT_ARCHITECTURE}."
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help="Number of functions built concurrently with --manifest. Default is the CPU count."
+    )
+    args = parser.parse_args()
+    if not args.manifest and not (args.function_name and args.source_dir):
+        parser.error("Provide a function name and source directory, or --manifest.")
+    return args
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    args = parse_arguments()
+    if args.manifest:
+        build_manifest(args.manifest, args.output_dir, cache_dir=args.cache_dir, workers=args.workers,
+                       python_version=args.python_version, architecture=args.architecture)
+        return
+    try:
+        _, output_path, key, cached = build_package(
+            args.function_name, args.source_dir, args.output or f"{args.function_name}.zip",
+            args.requirements, args.cache_dir, args.python_version, args.architecture
+        )
+    except Exception as e:
+        logging.error(f"Error building package for '{args.function_name}': {e}")
+        sys.exit(1)
+    print(f"{'Reused cached' if cached else 'Built'} package '{output_path}' ({key[:12]}).")
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,160 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import base64
+import hashlib
+import json
 import logging
+import mmap
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def deploy_lambda_function(function_name: str, zip_file_path: str, dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+
+# Packages larger than this cannot be sent in an UpdateFunctionCode request and must go through S3.
+MAX_DIRECT_UPLOAD_SIZE = 50 * 1024 * 1024
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+def package_sha256(zip_file_path: str) -> str:
+    """
+    Return the base64-encoded SHA-256 of a file, in the same format as Lambda's CodeSha256.
+
+    The file is memory-mapped and hashed in chunks, so it is never read into memory whole.
+    """
+    digest = hashlib.sha256()
+    with open(zip_file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                for start in range(0, len(mapped), HASH_CHUNK_SIZE):
+                    digest.update(view[start:start + HASH_CHUNK_SIZE])
+                view.release()
+    return base64.b64encode(digest.digest()).decode('ascii')
+
+def deploy_package(lambda_client, s3_client, function_name: str, zip_file_path: str, dry_run: bool = False,
+                   s3_bucket: str = None, s3_prefix: str = 'lambda-packages/', force: bool = False) -> tuple:
+    """
+    Deploy a package to a function unless the deployed code is already identical.
+
+    Returns:
+        tuple: (status, response) where status is 'unchanged', 'dry-run' or 'updated'.
+    """
+    if not os.path.exists(zip_file_path):
+        raise FileNotFoundError(f"Zip file not found: {zip_file_path}")
+
+    code_sha256 = package_sha256(zip_file_path)
+    if not force:
+        deployed_sha256 = lambda_client.get_function_configuration(FunctionName=function_name)['CodeSha256']
+        if deployed_sha256 == code_sha256:
+            return 'unchanged', None
+
+    if dry_run:
+        return 'dry-run', None
+
+    if os.path.getsize(zip_file_path) > MAX_DIRECT_UPLOAD_SIZE:
+        if not s3_bucket:
+            raise ValueError(
+                f"Zip file '{zip_file_path}' is larger than 50 MB; provide --s3-bucket to deploy it through S3."
+            )
+        # Content-addressed key, so re-uploading an identical package overwrites the same object.
+        digest_hex = base64.b64decode(code_sha256).hex()
+        s3_key = f"{s3_prefix}{function_name}/{digest_hex}.zip"
+        s3_client.upload_file(zip_file_path, s3_bucket, s3_key)
+        response = lambda_client.update_function_code(FunctionName=function_name, S3Bucket=s3_bucket, S3Key=s3_key)
+    else:
+        with open(zip_file_path, 'rb') as f:
+            response = lambda_client.update_function_code(FunctionName=function_name, ZipFile=f.read())
+    return 'updated', response
+
+def deploy_lambda_function(function_name: str, zip_file_path: str, dry_run: bool = False,
+                           s3_bucket: str = None, force: bool = False) -> None:
     """
     Deploy an updated Lambda function code using the provided ZIP file.
 
+    The package is hashed and compared with the function's deployed CodeSha256, and
+    the upload is skipped when the code is unchanged. Packages over the 50 MB direct
+    upload limit are uploaded to S3 first.
+
     Args:
         function_name (str): The name or ARN of the Lambda function.
         zip_file_path (str): The path to the Lambda deployment package (ZIP file).
         dry_run (bool): If True, simulate the deployment without updating the function.
+        s3_bucket (str): S3 bucket used to stage packages larger than 50 MB.
+        force (bool): If True, deploy even when the deployed code is identical.
     """
-    # Check if the zip file exists
-    if not os.path.exists(zip_file_path):
-        logging.error(f"Zip file not found: {zip_file_path}")
-        sys.exit(1)
-
-    # Read the zip file content
+    lambda_client = get_client('lambda')
+    s3_client = get_client('s3')
     try:
-        with open(zip_file_path, 'rb') as f:
-            zip_file_data = f.read()
+        status, response = deploy_package(
+            lambda_client, s3_client, function_name, zip_file_path, dry_run=dry_run, s3_bucket=s3_bucket, force=force
+        )
     except Exception as e:
-        logging.error(f"Error reading zip file '{zip_file_path}': {e}")
+        logging.error(f"Error updating Lambda function '{function_name}': {e}")
         sys.exit(1)
 
-    # Dry run mode: only simulate deployment
-    if dry_run:
+    if status == 'unchanged':
+        print(f"Lambda function '{function_name}' is already up to date; skipping deployment.")
+    elif status == 'dry-run':
         print(f"Dry run: Would update Lambda function '{function_name}' with zip file '{zip_file_path}'.")
-        return
-
-    # Update the Lambda function code
-    lambda_client = boto3.client('lambda')
-    try:
-        response = lambda_client.update_function_code(
-            FunctionName=function_name,
-            ZipFile=zip_file_data
-        )
+    else:
         print(f"Lambda function '{function_name}' updated successfully.")
         print(response)
+
+def deploy_manifest(manifest_path: str, dry_run: bool = False, s3_bucket: str = None,
+                    force: bool = False, workers: int = 8) -> None:
+    """
+    Deploy every function listed in a JSON manifest in parallel.
+
+    The manifest maps function names to ZIP file paths, e.g. {"my-function": "build/my-function.zip"}.
+    Relative paths are resolved against the manifest's directory.
+
+    Args:
+        manifest_path (str): Path to the JSON manifest.
+        dry_run (bool): If True, simulate the deployments without updating any function.
+        s3_bucket (str): S3 bucket used to stage packages larger than 50 MB.
+        force (bool): If True, deploy even when the deployed code is identical.
+        workers (int): Number of functions deployed concurrently.
+    """
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
     except Exception as e:
-        logging.error(f"Error updating Lambda function '{function_name}': {e}")
+        logging.error(f"Error reading manifest '{manifest_path}': {e}")
+        sys.exit(1)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    ensure_pool_size(workers)
+    lambda_client = get_client('lambda')
+    s3_client = get_client('s3')
+    counts = {'updated': 0, 'unchanged': 0, 'dry-run': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                deploy_package, lambda_client, s3_client, function_name, os.path.join(base_dir, zip_file_path),
+                dry_run=dry_run, s3_bucket=s3_bucket, force=force
+            ): function_name
+            for function_name, zip_file_path in manifest.items()
+        }
+        for future in as_completed(futures):
+            function_name = futures[future]
+            try:
+                status, _ = future.result()
+            except Exception as e:
+                logging.error(f"Error updating Lambda function '{function_name}': {e}")
+                counts['failed'] += 1
+                continue
+            counts[status] += 1
+            if status == 'unchanged':
+                print(f"Lambda function '{function_name}' is already up to date; skipping deployment.")
+            elif status == 'dry-run':
+                print(f"Dry run: Would update Lambda function '{function_name}'.")
+            else:
+                print(f"Lambda function '{function_name}' updated successfully.")
+
+    print(f"Deployed {counts['updated']} functions, skipped {counts['unchanged']} unchanged, "
+          f"{counts['dry-run']} would be updated, {counts['failed']} failed.")
+    if counts['failed']:
         sys.exit(1)
 
 def parse_arguments() -> argparse.Namespace:
@@ -51,23 +163,54 @@ def parse_arguments() -> argparse.Namespace:
     )
     parser.add_argument(
         'function_name',
+        nargs='?',
         help="The name or ARN of the Lambda function to update."
     )
     parser.add_argument(
         'zip_file_path',
+        nargs='?',
         help="The file path to the Lambda deployment package (ZIP file)."
     )
+    parser.add_argument(
+        '--manifest',
+        help="JSON file mapping function names to ZIP file paths, deployed in parallel."
+    )
+    parser.add_argument(
+        '--s3-bucket',
+        help="S3 bucket used to stage packages larger than the 50 MB direct upload limit."
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Deploy even when the deployed code already matches the package."
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help="Number of functions deployed concurrently with --manifest. Default is 8."
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
         help="Simulate the deployment without updating the Lambda function."
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.manifest and not (args.function_name and args.zip_file_path):
+        parser.error("Provide a function name and ZIP file path, or --manifest.")
+    return args
 
 def main():
     logging.basicConfig(level=logging.INFO)
     args = parse_arguments()
-    deploy_lambda_function(args.function_name, args.zip_file_path, dry_run=args.dry_run)
+    if args.manifest:
+        deploy_manifest(
+            args.manifest, dry_run=args.dry_run, s3_bucket=args.s3_bucket, force=args.force, workers=args.workers
+        )
+    else:
+        deploy_lambda_function(
+            args.function_name, args.zip_file_path, dry_run=args.dry_run, s3_bucket=args.s3_bucket, force=args.force
+        )
 
 if __name__ == "__main__":
     main()
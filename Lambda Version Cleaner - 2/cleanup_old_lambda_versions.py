@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
 
 def cleanup_old_lambda_versions(function_name: str, dry_run: bool = False) -> None:
     """
@@ -16,7 +19,7 @@ def cleanup_old_lambda_versions(function_name: str, dry_run: bool = False) -> No
         function_name (str): The name or ARN of the Lambda function.
         dry_run (bool): If True, simulate deletion without actually deleting versions.
     """
-    lambda_client = boto3.client('lambda')
+    lambda_client = get_client('lambda')
     
     try:
         response = lambda_client.list_versions_by_function(FunctionName=function_name)
@@ -1,64 +1,163 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def cleanup_old_lambda_versions(function_name: str, dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+
+def list_function_names(lambda_client) -> list:
+    """Return the names of all Lambda functions in the account and region, following pagination."""
+    names = []
+    paginator = lambda_client.get_paginator('list_functions')
+    for page in paginator.paginate():
+        names.extend(function['FunctionName'] for function in page.get('Functions', []))
+    return names
+
+def list_versions(lambda_client, function_name: str) -> list:
+    """Return every published version number of a function, following pagination."""
+    versions = []
+    paginator = lambda_client.get_paginator('list_versions_by_function')
+    for page in paginator.paginate(FunctionName=function_name):
+        versions.extend(v.get('Version') for v in page.get('Versions', []) if v.get('Version') != '$LATEST')
+    return versions
+
+def list_alias_versions(lambda_client, function_name: str) -> set:
+    """Return the versions referenced by any alias of a function, including weighted routing versions."""
+    versions = set()
+    paginator = lambda_client.get_paginator('list_aliases')
+    for page in paginator.paginate(FunctionName=function_name):
+        for alias in page.get('Aliases', []):
+            versions.add(alias.get('FunctionVersion'))
+            versions.update(alias.get('RoutingConfig', {}).get('AdditionalVersionWeights', {}))
+    return versions
+
+def select_versions_to_delete(versions: list, protected: set, keep: int = 0) -> list:
+    """
+    Return the versions that can be deleted, newest first.
+
+    The newest `keep` versions and every version in `protected` are retained.
+    """
+    newest_first = sorted(versions, key=int, reverse=True)
+    return [version for version in newest_first[keep:] if version not in protected]
+
+def cleanup_function(lambda_client, function_name: str, keep: int = 0, dry_run: bool = False) -> list:
+    """
+    Delete the old, unaliased versions of one function.
+
+    Returns:
+        list: Messages describing what was (or would be) deleted, for the caller to print.
     """
-    Clean up old versions of a Lambda function.
+    versions = list_versions(lambda_client, function_name)
+    protected = list_alias_versions(lambda_client, function_name)
+    messages = []
+    for version_number in select_versions_to_delete(versions, protected, keep):
+        if dry_run:
+            messages.append(f"Dry run: Would delete Lambda version {version_number} of '{function_name}'")
+            continue
+        try:
+            lambda_client.delete_function(FunctionName=function_name, Qualifier=version_number)
+            messages.append(f"Deleted Lambda version {version_number} of '{function_name}'")
+        except Exception as e:
+            logging.error(f"Error deleting version {version_number} for function '{function_name}': {e}")
+    return messages
+
+def cleanup_old_lambda_versions(function_name: str = None, dry_run: bool = False, keep: int = 0,
+                                all_functions: bool = False, workers: int = 8) -> None:
+    """
+    Clean up old versions of a Lambda function, or of every function in the account.
 
     This function lists all versions of the specified Lambda function and deletes
-    every version except '$LATEST'. A dry run mode is available to simulate the deletions.
+    every version except '$LATEST', the newest `keep` versions, and any version that
+    an alias points to. In account-wide mode, every function from list_functions is
+    cleaned up on a pool of worker threads. A dry run mode is available to simulate
+    the deletions.
 
     Args:
         function_name (str): The name or ARN of the Lambda function.
         dry_run (bool): If True, simulates deletion without making changes.
+        keep (int): Number of newest published versions to keep per function.
+        all_functions (bool): If True, clean up every function in the account and region.
+        workers (int): Number of functions cleaned up concurrently in account-wide mode.
     """
-    lambda_client = boto3.client('lambda')
-    
+    ensure_pool_size(workers)
+    lambda_client = get_client('lambda')
+
     try:
-        response = lambda_client.list_versions_by_function(FunctionName=function_name)
-        versions = response.get('Versions', [])
+        function_names = list_function_names(lambda_client) if all_functions else [function_name]
     except Exception as e:
-        logging.error(f"Failed to list versions for function '{function_name}': {e}")
+        logging.error(f"Failed to list Lambda functions: {e}")
         sys.exit(1)
-    
-    # Filter out the '$LATEST' version
-    deletable_versions = [v for v in versions if v.get('Version') != '$LATEST']
-    if not deletable_versions:
-        print("No old versions found for deletion.")
-        return
-    
-    for version in deletable_versions:
-        version_number = version.get('Version')
-        if dry_run:
-            print(f"Dry run: Would delete Lambda version {version_number}")
-        else:
+
+    found_any = False
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(cleanup_function, lambda_client, name, keep, dry_run): name
+            for name in function_names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
             try:
-                lambda_client.delete_function(FunctionName=function_name, Qualifier=version_number)
-                print(f"Deleted Lambda version {version_number}")
+                messages = future.result()
             except Exception as e:
-                logging.error(f"Error deleting version {version_number} for function '{function_name}': {e}")
+                logging.error(f"Failed to list versions for function '{name}': {e}")
+                if not all_functions:
+                    sys.exit(1)
+                continue
+            for message in messages:
+                print(message)
+            found_any = found_any or bool(messages)
+
+    if not found_any:
+        print("No old versions found for deletion.")
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Clean up old versions of a Lambda function (excluding '$LATEST')."
+        description="Clean up old versions of a Lambda function (excluding '$LATEST' and aliased versions)."
     )
     parser.add_argument(
         'function_name',
-        help="The name or ARN of the Lambda function."
+        nargs='?',
+        help="The name or ARN of the Lambda function. Omit when using --all."
+    )
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help="Clean up every Lambda function in the account and region."
+    )
+    parser.add_argument(
+        '--keep',
+        type=int,
+        default=0,
+        help="Number of newest published versions to keep per function. Default is 0."
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help="Number of functions cleaned up concurrently with --all. Default is 8."
     )
     parser.add_argument(
         '--dry-run',
         action='store_true',
         help="Simulate deletion without actually deleting any versions."
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if bool(args.function_name) == args.all:
+        parser.error("Provide either a function name or --all.")
+    return args
 
 def main():
     args = parse_arguments()
-    cleanup_old_lambda_versions(args.function_name, dry_run=args.dry_run)
+    cleanup_old_lambda_versions(
+        args.function_name,
+        dry_run=args.dry_run,
+        keep=args.keep,
+        all_functions=args.all,
+        workers=args.workers
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+import aws_clients  # noqa: E402
+from aws_clients import get_client  # noqa: E402
+
+# Operation name -> (script path relative to the repository root, function, whether it takes a `regions` list,
+# whether it takes `dry_run`).
+OPERATIONS = {
+    'delete_unused_ebs_volumes': ('EBS Volume Cleaner/delete_unused_ebs_volumes.py', 'delete_unused_ebs_volumes', True, True),
+    'cleanup_snapshots': ('Snapshot Cleaner/cleanup_snapshots.py', 'cleanup_snapshots', False, True),
+    'check_open_security_groups': ('Open SG Checker/check_open_security_groups.py', 'check_open_security_groups', True, False),
+    'stop_idle_instances': ('Idle Instance Stopper/stop_idle_instances.py', 'stop_idle_instances', False, True),
+    'cleanup_old_lambda_versions': ('Lambda Version Cleaner/cleanup_old_lambda_versions.py', 'cleanup_old_lambda_versions', False, True),
+}
+# Arguments an operation always gets from the runner rather than from --arg.
+FIXED_ARGUMENTS = {
+    'cleanup_old_lambda_versions': {'all_functions': True},
+}
+_modules = {}
+
+def load_operation(operation: str):
+    """Import an operation's script once per process and return its function."""
+    path, function_name = OPERATIONS[operation][:2]
+    module = _modules.get(path)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0],
+                                                      os.path.join(ROOT_DIR, path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return getattr(module, function_name)
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(f"{record.levelname}: {record.getMessage()}")
+
+def run_task(operation: str, account: str, role_arn: str, region: str, arguments: dict) -> dict:
+    """
+    Run one operation for one account and region, capturing its output.
+
+    Runs inside a pool worker: the worker process keeps its imported scripts, sessions and
+    clients between tasks, so interpreter and boto3 startup are paid once per worker.
+
+    Returns:
+        dict: The task's account, region, status ('ok' or 'failed'), duration, output lines and log lines.
+    """
+    started = time.monotonic()
+    output = io.StringIO()
+    handler = _ListHandler()
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    root_logger.setLevel(logging.INFO)
+    status, error = 'ok', None
+    try:
+        profile = aws_clients.assume_role(role_arn) if role_arn else None
+        aws_clients.set_defaults(profile=profile, region=region)
+        function = load_operation(operation)
+        kwargs = dict(arguments, **FIXED_ARGUMENTS.get(operation, {}))
+        if OPERATIONS[operation][2]:
+            kwargs['regions'] = [region]
+        with redirect_stdout(output):
+            function(**kwargs)
+    except SystemExit as e:
+        # The scripts exit with a non-zero status on fatal errors, after logging them.
+        if e.code not in (None, 0):
+            status = 'failed'
+    except Exception as e:
+        status, error = 'failed', f"{type(e).__name__}: {e}"
+    finally:
+        aws_clients.set_defaults()
+        root_logger.removeHandler(handler)
+    logs = handler.records + ([f"ERROR: {error}"] if error else [])
+    return {
+        'operation': operation,
+        'account': account,
+        'region': region,
+        'status': status,
+        'seconds': round(time.monotonic() - started, 3),
+        'output': output.getvalue().splitlines(),
+        'logs': logs,
+    }
+
+def resolve_regions(regions: list) -> list:
+    """Expand 'all' to every region enabled for the calling account."""
+    if regions != ['all']:
+        return regions
+    ec2 = get_client('ec2', aws_clients.get_session().region_name or 'us-east-1')
+    return sorted(region['RegionName'] for region in ec2.describe_regions()['Regions'])
+
+def run_across_accounts(operation: str, accounts: list, regions: list, role_name: str = None,
+                        arguments: dict = None, concurrency: int = 8, report_path: str = None) -> None:
+    """
+    Run an operation for every (account, region) pair on a process pool and merge the results.
+
+    Each account is reached by assuming `role_name` in it; with no accounts, the current
+    credentials are used. At most `concurrency` pairs run at once across all accounts, and
+    every worker process is reused for many pairs.
+
+    Args:
+        operation (str): Name of the operation, a key of OPERATIONS.
+        accounts (list): Account IDs to run in. Empty for the current account only.
+        regions (list): Regions to run in, or ['all'] for every enabled region.
+        role_name (str): Name of the role assumed in each account.
+        arguments (dict): Keyword arguments passed to the operation, e.g. {'dry_run': True}.
+        concurrency (int): Maximum number of (account, region) pairs running at once.
+        report_path (str): Optional path of a JSON file receiving the merged report.
+    """
+    try:
+        regions = resolve_regions(regions)
+    except Exception as e:
+        logging.error(f"Error retrieving regions: {e}")
+        sys.exit(1)
+
+    targets = [(account, f"arn:aws:iam::{account}:role/{role_name}") for account in accounts] or [('current', None)]
+    results = []
+    started = time.monotonic()
+    # Workers are spawned rather than forked: forked workers would inherit the clients (and their
+    # connection pools) cached above by resolve_regions(), which are not safe to share across fork.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=concurrency, mp_context=context) as executor:
+        futures = [
+            executor.submit(run_task, operation, account, role_arn, region, arguments or {})
+            for account, role_arn in targets for region in regions
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"[{result['account']}/{result['region']}] {result['status']} in {result['seconds']:.1f}s",
+                  file=sys.stderr)
+
+    results.sort(key=lambda r: (r['account'], r['region']))
+    for result in results:
+        print(f"=== {operation} in {result['account']} / {result['region']}: {result['status']} "
+              f"({result['seconds']:.1f}s)")
+        for line in result['output'] + result['logs']:
+            print(f"  {line}")
+
+    failed = sum(result['status'] == 'failed' for result in results)
+    elapsed = time.monotonic() - started
+    print(f"Ran {operation} in {len(results)} account-region pairs in {elapsed:.1f}s: "
+          f"{len(results) - failed} succeeded, {failed} failed.")
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump({'operation': operation, 'arguments': arguments or {}, 'seconds': round(elapsed, 3),
+                       'results': results}, f, indent=2)
+        print(f"Report written to {report_path}.")
+    if failed:
+        sys.exit(1)
+
+def parse_argument_value(text: str):
+    """Parse a KEY=VALUE value as JSON when possible (numbers, true/false, lists), else keep the string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run one of the scripts' operations across many AWS accounts and regions."
+    )
+    parser.add_argument(
+        'operation',
+        choices=sorted(OPERATIONS),
+        help="The operation to run."
+    )
+    parser.add_argument(
+        '--accounts', nargs='+', default=[],
+        help="Account IDs to run in, reached through --role-name. Defaults to the current account."
+    )
+    parser.add_argument(
+        '--accounts-file',
+        help="File with one account ID per line, added to --accounts."
+    )
+    parser.add_argument(
+        '--role-name', default='OrganizationAccountAccessRole',
+        help="Role assumed in each account. Default is OrganizationAccountAccessRole."
+    )
+    parser.add_argument(
+        '--regions', nargs='+', required=True,
+        help="Regions to run in (e.g., us-east-1 eu-west-1), or 'all' for every enabled region."
+    )
+    parser.add_argument(
+        '--arg', action='append', default=[],
+        help="Argument for the operation in the format key=value, e.g. --arg retention_days=90. Can be repeated."
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help="Pass dry_run=True to the operation. Not available for read-only operations such as check_open_security_groups."
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=8,
+        help="Maximum number of account-region pairs running at once. Default is 8."
+    )
+    parser.add_argument(
+        '--report',
+        help="Write the merged results to this JSON file."
+    )
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    args = parse_arguments()
+    accounts = list(args.accounts)
+    if args.accounts_file:
+        try:
+            with open(args.accounts_file) as f:
+                accounts.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+        except Exception as e:
+            logging.error(f"Error reading accounts file '{args.accounts_file}': {e}")
+            sys.exit(1)
+
+    arguments = {}
+    for item in args.arg:
+        if '=' not in item:
+            logging.error(f"Invalid argument format: '{item}'. Expected format is key=value.")
+            sys.exit(1)
+        key, value = item.split('=', 1)
+        arguments[key] = parse_argument_value(value)
+    if args.dry_run:
+        if not OPERATIONS[args.operation][3]:
+            logging.error(f"{args.operation} does not support --dry-run.")
+            sys.exit(1)
+        arguments['dry_run'] = True
+
+    run_across_accounts(
+        args.operation,
+        sorted(set(accounts)),
+        args.regions,
+        role_name=args.role_name,
+        arguments=arguments,
+        concurrency=args.concurrency,
+        report_path=args.report
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,228 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import bisect
+import ipaddress
 import logging
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def check_open_security_groups(cidr_filter: str = "0.0.0.0/0") -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import ensure_pool_size, get_client, get_session  # noqa: E402
+from inventory_cache import DEFAULT_TTL, InventoryCache  # noqa: E402
+
+DEFAULT_CIDRS = ["0.0.0.0/0", "::/0"]
+
+class CidrIndex:
     """
-    Check and list security groups that allow open access based on a specified CIDR filter.
+    Interval index of watched CIDR blocks for fast containment and overlap checks.
+
+    Each watched network is stored as an integer [first, last] address interval, sorted by
+    first address per IP version, so a rule is checked against every watched CIDR of its
+    version with one bisect and a short scan of the candidates.
+    """
+
+    def __init__(self, cidrs: list, max_prefix_length: int = 8, max_ipv6_prefix_length: int = 32):
+        self.max_prefix_lengths = {4: max_prefix_length, 6: max_ipv6_prefix_length}
+        self._intervals = {4: [], 6: []}
+        for cidr in cidrs:
+            network = ipaddress.ip_network(cidr, strict=False)
+            self._intervals[network.version].append(
+                (int(network.network_address), int(network.broadcast_address), network)
+            )
+        for intervals in self._intervals.values():
+            intervals.sort(key=lambda interval: interval[0])
+        self._starts = {version: [interval[0] for interval in intervals]
+                        for version, intervals in self._intervals.items()}
+
+    def matches(self, cidr: str) -> list:
+        """
+        Return (watched_network, relation) pairs for the watched CIDRs a rule's CIDR matches.
+
+        A rule matches when it contains a watched CIDR ('contains'), or when it lies within
+        a watched CIDR and its prefix is at most the maximum prefix length for its IP
+        version ('within'), i.e. it is a broad range such as 0.0.0.0/1 or 10.0.0.0/8.
+        """
+        network = ipaddress.ip_network(cidr, strict=False)
+        first, last = int(network.network_address), int(network.broadcast_address)
+        intervals = self._intervals[network.version]
+        matches = []
+        # Only watched intervals starting at or before the rule's last address can overlap it.
+        for start, end, watched in intervals[:bisect.bisect_right(self._starts[network.version], last)]:
+            if end < first:
+                continue
+            if first <= start and end <= last:
+                matches.append((watched, 'contains'))
+            elif start <= first and last <= end and network.prefixlen <= self.max_prefix_lengths[network.version]:
+                matches.append((watched, 'within'))
+        return matches
+
+def get_enabled_regions(session) -> list:
+    """Return the names of all regions enabled for the account."""
+    ec2 = get_client('ec2', session.region_name or 'us-east-1')
+    return sorted(region['RegionName'] for region in ec2.describe_regions()['Regions'])
+
+def list_security_groups(ec2) -> list:
+    """Return the ID, name and ingress CIDR rules of every security group in a region, following pagination."""
+    groups = []
+    paginator = ec2.get_paginator('describe_security_groups')
+    for page in paginator.paginate():
+        for group in page.get('SecurityGroups', []):
+            groups.append({
+                'GroupId': group.get('GroupId'),
+                'GroupName': group.get('GroupName', 'N/A'),
+                'IpPermissions': [
+                    {
+                        'IpProtocol': permission.get('IpProtocol'),
+                        'FromPort': permission.get('FromPort'),
+                        'ToPort': permission.get('ToPort'),
+                        'Cidrs': [ip_range.get('CidrIp') for ip_range in permission.get('IpRanges', [])]
+                        + [ip_range.get('CidrIpv6') for ip_range in permission.get('Ipv6Ranges', [])]
+                    }
+                    for permission in group.get('IpPermissions', [])
+                ]
+            })
+    return groups
+
+def scan_region(groups: list, region: str, index: CidrIndex) -> list:
+    """
+    Return findings for every security group rule in a region that matches the index.
+
+    Returns:
+        list: (region, group_id, group_name, rule_cidr, ports, watched_network, relation) tuples.
+    """
+    findings = []
+    for group in groups:
+        for permission in group['IpPermissions']:
+            protocol = permission['IpProtocol']
+            if protocol == '-1':
+                ports = "all traffic"
+            elif permission['FromPort'] == permission['ToPort']:
+                ports = f"{protocol}/{permission['FromPort']}"
+            else:
+                ports = f"{protocol}/{permission['FromPort']}-{permission['ToPort']}"
+            for cidr in filter(None, permission['Cidrs']):
+                for watched, relation in index.matches(cidr):
+                    findings.append((region, group['GroupId'], group['GroupName'], cidr, ports, watched, relation))
+    return findings
+
+def check_open_security_groups(cidr_filters: list = None, regions: list = None, max_prefix_length: int = 8,
+                               max_ipv6_prefix_length: int = 32, workers: int = 10,
+                               cache_ttl: float = DEFAULT_TTL) -> None:
+    """
+    Check and list security groups that allow open access based on the specified CIDR filters.
+
+    Every enabled region (or the given regions) is scanned in parallel. Each IPv4 and IPv6
+    rule is checked against all watched CIDRs at once with a CidrIndex, so rules that
+    contain a watched CIDR, or broad ranges within one, are reported.
 
     Args:
-        cidr_filter (str): The CIDR block to check for (default: "0.0.0.0/0").
+        cidr_filters (list): The CIDR blocks to check for (default: "0.0.0.0/0" and "::/0").
+        regions (list): Regions to scan. Defaults to every enabled region.
+        max_prefix_length (int): Broadest IPv4 prefix reported for rules within a watched CIDR.
+        max_ipv6_prefix_length (int): Broadest IPv6 prefix reported for rules within a watched CIDR.
+        workers (int): Maximum number of regions scanned concurrently.
+        cache_ttl (float): Maximum age in seconds of cached security group listings; 0 always fetches.
+
+    Exits with status 1 if any region could not be scanned, after reporting the other regions' findings.
     """
-    ec2 = boto3.client('ec2')
+    cidr_filters = cidr_filters or DEFAULT_CIDRS
+    try:
+        index = CidrIndex(cidr_filters, max_prefix_length, max_ipv6_prefix_length)
+    except ValueError as e:
+        logging.error(f"Invalid CIDR filter: {e}")
+        sys.exit(1)
+
+    session = get_session()
     try:
-        response = ec2.describe_security_groups()
-        groups = response.get('SecurityGroups', [])
+        regions = regions or get_enabled_regions(session)
     except Exception as e:
-        logging.error(f"Error retrieving security groups: {e}")
+        logging.error(f"Error retrieving regions: {e}")
         sys.exit(1)
-    
-    open_groups_found = False
-    for group in groups:
-        group_id = group.get('GroupId')
-        group_name = group.get('GroupName', 'N/A')
-        for permission in group.get('IpPermissions', []):
-            for ip_range in permission.get('IpRanges', []):
-                if ip_range.get('CidrIp') == cidr_filter:
-                    print(f"Security Group {group_id} ({group_name}) has open access with CIDR {cidr_filter}!")
-                    open_groups_found = True
 
-    if not open_groups_found:
-        print(f"No security groups found with open access (CIDR {cidr_filter}).")
+    # One pooled client per region, shared by every worker.
+    ensure_pool_size(workers)
+    clients = {region: get_client('ec2', region) for region in regions}
+    cache = InventoryCache(ttl=cache_ttl)
+
+    def scan(region: str) -> list:
+        groups = cache.listing('security-groups', region, lambda: list_security_groups(clients[region]))
+        return scan_region(groups, region, index)
+
+    findings = []
+    failed_regions = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(scan, region): region for region in regions}
+        for future in as_completed(futures):
+            try:
+                findings.extend(future.result())
+            except Exception as e:
+                logging.error(f"Error retrieving security groups in {futures[future]}: {e}")
+                failed_regions.append(futures[future])
+
+    for region, group_id, group_name, cidr, ports, watched, relation in sorted(findings, key=str):
+        match = f"covers {watched}" if relation == 'contains' else f"is a broad range within {watched}"
+        print(f"Security Group {group_id} ({group_name}) in {region} has open access with CIDR {cidr} "
+              f"({ports}), which {match}!")
+
+    if failed_regions:
+        # A region that could not be scanned may hide open groups, so the check must not pass.
+        logging.error(f"Could not check security groups in: {', '.join(sorted(failed_regions))}")
+        sys.exit(1)
+    if not findings:
+        print(f"No security groups found with open access (CIDR {', '.join(cidr_filters)}).")
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Check AWS EC2 security groups for open access based on a specified CIDR."
+        description="Check AWS EC2 security groups for open access based on specified CIDRs."
     )
     parser.add_argument(
         "--cidr",
-        type=str,
-        default="0.0.0.0/0",
-        help="CIDR block to check for open access (default: 0.0.0.0/0)."
+        action="append",
+        help="CIDR block to check for open access. Repeat for several (default: 0.0.0.0/0 and ::/0)."
+    )
+    parser.add_argument(
+        "--regions",
+        nargs="+",
+        help="Regions to scan (e.g., us-east-1 eu-west-1). Defaults to every enabled region."
+    )
+    parser.add_argument(
+        "--max-prefix-length",
+        type=int,
+        default=8,
+        help="Report IPv4 rules within a watched CIDR when their prefix is at most this long (default: 8)."
+    )
+    parser.add_argument(
+        "--max-ipv6-prefix-length",
+        type=int,
+        default=32,
+        help="Report IPv6 rules within a watched CIDR when their prefix is at most this long (default: 32)."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=10,
+        help="Maximum number of regions scanned concurrently (default: 10)."
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help=f"Seconds for which cached security group listings are reused; 0 always fetches (default: {DEFAULT_TTL:g})."
     )
     return parser.parse_args()
 
 def main():
     logging.basicConfig(level=logging.INFO)
     args = parse_arguments()
-    check_open_security_groups(cidr_filter=args.cidr)
+    check_open_security_groups(
+        cidr_filters=args.cidr,
+        regions=args.regions,
+        max_prefix_length=args.max_prefix_length,
+        max_ipv6_prefix_length=args.max_ipv6_prefix_length,
+        workers=args.workers,
+        cache_ttl=args.cache_ttl
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
 import logging
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
 
 def create_rds_snapshot(db_instance_identifier: str, snapshot_id: str, dry_run: bool = False) -> None:
     """
@@ -17,7 +20,7 @@ def create_rds_snapshot(db_instance_identifier: str, snapshot_id: str, dry_run:
         print(f"Dry run: Would create snapshot '{snapshot_id}' for DB instance '{db_instance_identifier}'.")
         return
 
-    rds = boto3.client('rds')
+    rds = get_client('rds')
     try:
         response = rds.create_db_snapshot(
             DBSnapshotIdentifier=snapshot_id,
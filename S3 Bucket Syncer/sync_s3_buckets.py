@@ -1,37 +1,381 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import asyncio
 import logging
+import math
 import sys
+import threading
+import time
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
-def sync_s3_buckets(source_bucket: str, destination_bucket: str, dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import aws_async  # noqa: E402
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+
+MB = 1024 * 1024
+# CopyObject cannot copy objects larger than 5 GB, and a multipart upload has at most 10,000 parts.
+MAX_SINGLE_COPY_SIZE = 5 * 1024 * MB
+MAX_PARTS = 10000
+# Every part of a multipart upload except the last must be at least 5 MB.
+MIN_PART_SIZE = 5 * MB
+# Metadata key recording the source ETag on objects copied with multipart copy,
+# whose own ETag never matches the source.
+SOURCE_ETAG_METADATA_KEY = 'source-etag'
+# Attributes carried over from the source object when a multipart upload is created.
+COPIED_HEAD_ATTRIBUTES = (
+    'CacheControl', 'ContentDisposition', 'ContentEncoding', 'ContentLanguage', 'ContentType', 'Expires'
+)
+
+class ThroughputMeter:
+    """
+    Thread-safe counter that periodically prints objects/s and bytes/s, and counts failed
+    copies and objects found unchanged by their metadata.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.objects = 0
+        self.bytes = 0
+        self.failed = 0
+        self.unchanged = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._lock = threading.Lock()
+
+    def add(self, size: int, message: str = None) -> None:
+        with self._lock:
+            if message:
+                print(message)
+            self.objects += 1
+            self.bytes += size
+            now = time.monotonic()
+            if now - self._last_report >= self.interval:
+                self._last_report = now
+                print(self.summary(now))
+
+    def fail(self) -> None:
+        with self._lock:
+            self.failed += 1
+
+    def skip(self) -> None:
+        with self._lock:
+            self.unchanged += 1
+
+    def summary(self, now: float = None) -> str:
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        return (
+            f"Progress: {self.objects} objects, {self.bytes / MB:.1f} MB in {elapsed:.1f}s "
+            f"({self.objects / elapsed:.1f} objects/s, {self.bytes / MB / elapsed:.2f} MB/s)"
+        )
+
+def iter_objects(s3_client, bucket_name: str):
+    """
+    Yield (key, size, etag) for every object in a bucket, in lexicographic key order.
+
+    Args:
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The name of the S3 bucket to list.
+    """
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket_name):
+        for obj in page.get('Contents', []):
+            yield obj['Key'], obj.get('Size'), obj.get('ETag')
+
+def iter_changed_keys(source_objects, destination_objects):
+    """
+    Merge-join two sorted object listings and yield the source objects that may need copying.
+
+    Both listings must be in the same lexicographic key order that S3 returns. An object is
+    yielded when it is missing from the destination or its size or ETag differs. Only
+    one entry from each listing is held at a time, so memory use is constant.
+
+    A copy's ETag differs from the source's whenever either side is multipart (ETag "...-N"),
+    so such objects are yielded with `verify` set: only the source ETag recorded in the
+    copy's metadata can tell whether they changed, and it is checked by the copy workers
+    rather than with a HEAD request per object on the listing thread.
+
+    Args:
+        source_objects: Iterable of (key, size, etag) tuples for the source bucket.
+        destination_objects: Iterable of (key, size, etag) tuples for the destination bucket.
+
+    Yields:
+        tuple: (key, size, etag, verify) for each new, changed or possibly changed source object.
+    """
+    destination_iter = iter(destination_objects)
+    destination = next(destination_iter, None)
+    for key, size, etag in source_objects:
+        # Skip destination keys that sort before the current source key.
+        while destination is not None and destination[0] < key:
+            destination = next(destination_iter, None)
+        if destination is None or destination[0] != key or destination[1] != size:
+            yield key, size, etag, False
+        elif destination[2] != etag:
+            yield key, size, etag, is_multipart_etag(etag) or is_multipart_etag(destination[2])
+
+def is_multipart_etag(etag: str) -> bool:
+    """Return True for the ETag of an object uploaded in parts ("<hash>-<part count>")."""
+    return bool(etag) and '-' in etag
+
+def has_source_etag(head: dict, etag: str) -> bool:
+    """Return True when a destination object's metadata records `etag` as the ETag of its source."""
+    return head.get('Metadata', {}).get(SOURCE_ETAG_METADATA_KEY) == etag
+
+def copy_small_object(s3_client, source_bucket: str, destination_bucket: str, key: str, etag: str = None) -> None:
+    """
+    Copy an object with a single server-side CopyObject request.
+
+    CopyObject gives the copy a plain MD5 ETag, so when the source ETag is multipart it is
+    recorded in the copy's metadata, along with the source's metadata and content headers.
+    """
+    copy_source = {'Bucket': source_bucket, 'Key': key}
+    if not is_multipart_etag(etag):
+        s3_client.copy_object(Bucket=destination_bucket, Key=key, CopySource=copy_source)
+        return
+    head = s3_client.head_object(Bucket=source_bucket, Key=key)
+    s3_client.copy_object(
+        Bucket=destination_bucket, Key=key, CopySource=copy_source, MetadataDirective='REPLACE',
+        **multipart_upload_args(head, etag)
+    )
+
+async def copy_small_object_async(s3_client, source_bucket: str, destination_bucket: str, key: str,
+                                  etag: str = None) -> None:
+    """Asyncio counterpart of copy_small_object() for an aiobotocore S3 client."""
+    copy_source = {'Bucket': source_bucket, 'Key': key}
+    if not is_multipart_etag(etag):
+        await s3_client.copy_object(Bucket=destination_bucket, Key=key, CopySource=copy_source)
+        return
+    head = await s3_client.head_object(Bucket=source_bucket, Key=key)
+    await s3_client.copy_object(
+        Bucket=destination_bucket, Key=key, CopySource=copy_source, MetadataDirective='REPLACE',
+        **multipart_upload_args(head, etag)
+    )
+
+def part_ranges(size: int, part_size: int):
+    """Yield (part_number, byte_range) for each multipart copy range, growing the part size to stay within MAX_PARTS."""
+    part_size = max(part_size, math.ceil(size / MAX_PARTS))
+    for part_number, start in enumerate(range(0, size, part_size), start=1):
+        yield part_number, f"bytes={start}-{min(start + part_size, size) - 1}"
+
+def multipart_upload_args(head: dict, etag: str) -> dict:
+    """Return the arguments for a multipart upload or replacing copy that carry over the source's attributes and ETag."""
+    extra_args = {name: head[name] for name in COPIED_HEAD_ATTRIBUTES if name in head}
+    metadata = dict(head.get('Metadata', {}))
+    metadata[SOURCE_ETAG_METADATA_KEY] = etag
+    return dict(extra_args, Metadata=metadata)
+
+def copy_large_object(s3_client, part_executor: ThreadPoolExecutor, source_bucket: str,
+                      destination_bucket: str, key: str, size: int, etag: str, part_size: int) -> None:
+    """
+    Copy an object with a multipart upload whose UploadPartCopy ranges run in parallel.
+
+    The source ETag is stored in the destination metadata so later incremental runs can
+    recognise the copy. The upload is aborted if any part fails.
+    """
+    head = s3_client.head_object(Bucket=source_bucket, Key=key)
+    upload_id = s3_client.create_multipart_upload(
+        Bucket=destination_bucket, Key=key, **multipart_upload_args(head, etag)
+    )['UploadId']
+    copy_source = {'Bucket': source_bucket, 'Key': key}
+    try:
+        futures = []
+        for part_number, byte_range in part_ranges(size, part_size):
+            futures.append(part_executor.submit(
+                s3_client.upload_part_copy,
+                Bucket=destination_bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                CopySource=copy_source,
+                CopySourceRange=byte_range
+            ))
+        parts = [
+            {'PartNumber': part_number, 'ETag': future.result()['CopyPartResult']['ETag']}
+            for part_number, future in enumerate(futures, start=1)
+        ]
+        s3_client.complete_multipart_upload(
+            Bucket=destination_bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(Bucket=destination_bucket, Key=key, UploadId=upload_id)
+        raise
+
+async def copy_large_object_async(s3_client, part_slots: asyncio.Semaphore, source_bucket: str,
+                                  destination_bucket: str, key: str, size: int, etag: str, part_size: int) -> None:
+    """
+    Asyncio counterpart of copy_large_object() for an aiobotocore S3 client.
+
+    Part copies wait on `part_slots`, a semaphore separate from the object limit, so object
+    copies waiting on their parts can never starve it.
+    """
+    head = await s3_client.head_object(Bucket=source_bucket, Key=key)
+    upload_id = (await s3_client.create_multipart_upload(
+        Bucket=destination_bucket, Key=key, **multipart_upload_args(head, etag)
+    ))['UploadId']
+    copy_source = {'Bucket': source_bucket, 'Key': key}
+
+    async def copy_part(part_number: int, byte_range: str) -> dict:
+        async with part_slots:
+            response = await s3_client.upload_part_copy(
+                Bucket=destination_bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                CopySource=copy_source,
+                CopySourceRange=byte_range
+            )
+        return {'PartNumber': part_number, 'ETag': response['CopyPartResult']['ETag']}
+
+    try:
+        parts = await asyncio.gather(*(copy_part(*part) for part in part_ranges(size, part_size)))
+        await s3_client.complete_multipart_upload(
+            Bucket=destination_bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': list(parts)}
+        )
+    except Exception:
+        await s3_client.abort_multipart_upload(Bucket=destination_bucket, Key=key, UploadId=upload_id)
+        raise
+
+async def copy_objects_async(objects, source_bucket: str, destination_bucket: str, workers: int,
+                             multipart_threshold: int, part_size: int, meter: ThroughputMeter,
+                             dry_run: bool = False) -> None:
+    """
+    Copy (key, size, etag, verify) objects on one thread with up to `workers` object copies in flight.
+
+    Multipart ranges get their own limit of `workers` part copies. The blocking listing runs
+    in a worker thread while the event loop keeps the copies going. Objects with `verify`
+    set are only copied when the destination's metadata does not record their ETag.
+    """
+    async with aws_async.create_client('s3', max_pool_connections=2 * workers) as s3_client:
+        part_slots = asyncio.Semaphore(workers)
+
+        async def copy(obj: tuple) -> None:
+            key, size, etag, verify = obj
+            try:
+                if verify and has_source_etag(await s3_client.head_object(Bucket=destination_bucket, Key=key), etag):
+                    meter.skip()
+                    return
+                if dry_run:
+                    print(f"Dry run: Would copy '{key}' from '{source_bucket}' to '{destination_bucket}'.")
+                    return
+                if size > multipart_threshold:
+                    await copy_large_object_async(
+                        s3_client, part_slots, source_bucket, destination_bucket, key, size, etag, part_size
+                    )
+                else:
+                    await copy_small_object_async(s3_client, source_bucket, destination_bucket, key, etag)
+            except Exception as e:
+                logging.error(f"Error {'checking' if dry_run else 'copying'} '{key}' from '{source_bucket}' "
+                              f"to '{destination_bucket}': {e}")
+                meter.fail()
+                return
+            meter.add(size, f"Copied '{key}' from '{source_bucket}' to '{destination_bucket}'.")
+
+        await aws_async.bounded_map(copy, aws_async.iterate_in_thread(objects), workers, fold=aws_async.discard)
+
+def sync_s3_buckets(source_bucket: str, destination_bucket: str, dry_run: bool = False,
+                    incremental: bool = False, workers: int = 16,
+                    multipart_threshold: int = 64 * MB, part_size: int = 64 * MB, backend: str = 'threads') -> None:
     """
     Sync objects from a source S3 bucket to a destination S3 bucket.
-    
+
     For each object in the source bucket, the script copies it to the destination bucket.
+    In incremental mode, both buckets are listed together and merge-joined by key, and
+    only objects that are new or whose size or ETag differ are copied. When either ETag is
+    multipart, the copy workers compare the source ETag recorded in the copy's metadata instead.
+    Copies run server-side on a pool of worker threads. Objects larger than the multipart
+    threshold are split into byte ranges that are copied in parallel with UploadPartCopy.
+    With the 'asyncio' backend the copies run as coroutines on one thread instead, so
+    `workers` can be raised to thousands of requests in flight.
     Use the dry_run flag to simulate the process without actually copying the objects.
-    
+
     Args:
         source_bucket (str): The name of the source S3 bucket.
         destination_bucket (str): The name of the destination S3 bucket.
         dry_run (bool): If True, simulate the sync without making any changes.
+        incremental (bool): If True, copy only new or changed objects.
+        workers (int): Number of objects copied concurrently, and of concurrent part copies.
+        multipart_threshold (int): Objects larger than this many bytes use multipart copy.
+        part_size (int): Size in bytes of each multipart copy range.
+        backend (str): 'threads' for thread pools, or 'asyncio' for aiobotocore coroutines.
     """
-    s3 = boto3.resource('s3')
-    source = s3.Bucket(source_bucket)
-    
-    try:
-        for obj in source.objects.all():
-            copy_source = {'Bucket': source_bucket, 'Key': obj.key}
+    if backend == 'asyncio' and not aws_async.available():
+        logging.error(aws_async.MISSING_MESSAGE)
+        sys.exit(1)
+    if part_size < MIN_PART_SIZE:
+        logging.error(f"The part size must be at least {MIN_PART_SIZE // MB} MB, the S3 minimum for multipart parts.")
+        sys.exit(1)
+    if backend == 'threads':
+        # Object copies and part copies run on separate pools that share this client.
+        ensure_pool_size(2 * workers)
+    s3_client = get_client('s3')
+
+    if incremental:
+        objects = iter_changed_keys(iter_objects(s3_client, source_bucket), iter_objects(s3_client, destination_bucket))
+    else:
+        objects = ((key, size, etag, False) for key, size, etag in iter_objects(s3_client, source_bucket))
+
+    multipart_threshold = min(multipart_threshold, MAX_SINGLE_COPY_SIZE)
+    meter = ThroughputMeter()
+
+    def copy(key: str, size: int, etag: str, verify: bool) -> None:
+        try:
+            if verify and has_source_etag(s3_client.head_object(Bucket=destination_bucket, Key=key), etag):
+                meter.skip()
+                return
             if dry_run:
-                print(f"Dry run: Would copy '{obj.key}' from '{source_bucket}' to '{destination_bucket}'.")
+                print(f"Dry run: Would copy '{key}' from '{source_bucket}' to '{destination_bucket}'.")
+                return
+            if size > multipart_threshold:
+                copy_large_object(
+                    s3_client, part_executor, source_bucket, destination_bucket, key, size, etag, part_size
+                )
             else:
-                s3.Object(destination_bucket, obj.key).copy(copy_source)
-                print(f"Copied '{obj.key}' from '{source_bucket}' to '{destination_bucket}'.")
+                copy_small_object(s3_client, source_bucket, destination_bucket, key, etag)
+        except Exception as e:
+            logging.error(f"Error {'checking' if dry_run else 'copying'} '{key}' from '{source_bucket}' "
+                          f"to '{destination_bucket}': {e}")
+            meter.fail()
+            return
+        meter.add(size, f"Copied '{key}' from '{source_bucket}' to '{destination_bucket}'.")
+
+    matched = 0
+    try:
+        if backend == 'asyncio':
+            def counted(objects):
+                nonlocal matched
+                for obj in objects:
+                    matched += 1
+                    yield obj
+            asyncio.run(copy_objects_async(
+                counted(objects), source_bucket, destination_bucket, workers, multipart_threshold, part_size, meter,
+                dry_run=dry_run
+            ))
+        else:
+            # Parts get their own pool so object copies waiting on parts can never starve it.
+            with ThreadPoolExecutor(max_workers=workers) as object_executor, \
+                    ThreadPoolExecutor(max_workers=workers) as part_executor:
+                pending = set()
+                for obj in objects:
+                    # Bound the number of queued copies so listing never outruns copying.
+                    if len(pending) >= workers * 2:
+                        _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.add(object_executor.submit(copy, *obj))
+                    matched += 1
+                wait(pending)
     except Exception as e:
         logging.error(f"Error syncing buckets: {e}")
         sys.exit(1)
-    
-    if not dry_run:
+
+    changed = matched - meter.unchanged
+    if not dry_run and (changed or not incremental):
+        print(meter.summary())
+    if meter.failed:
+        print(f"Failed to {'check' if dry_run else 'copy'} {meter.failed} of {changed} objects "
+              f"from '{source_bucket}' to '{destination_bucket}'.")
+        sys.exit(1)
+    if incremental and not changed:
+        print(f"'{destination_bucket}' is already in sync with '{source_bucket}'.")
+    elif not dry_run:
         print(f"Data synced from '{source_bucket}' to '{destination_bucket}'.")
 
 def parse_arguments() -> argparse.Namespace:
@@ -50,11 +394,41 @@ def parse_arguments() -> argparse.Namespace:
         '--dry-run', action='store_true',
         help="Simulate the sync operation without actually copying objects."
     )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="Copy only objects that are missing from the destination or differ in size or ETag."
+    )
+    parser.add_argument(
+        '--workers', type=int, default=16,
+        help="Number of objects (and multipart ranges) copied concurrently. Default is 16."
+    )
+    parser.add_argument(
+        '--multipart-threshold', type=int, default=64,
+        help="Objects larger than this many MB are copied with parallel multipart ranges. Default is 64."
+    )
+    parser.add_argument(
+        '--part-size', type=int, default=64,
+        help="Size in MB of each multipart copy range (at least 5). Default is 64."
+    )
+    parser.add_argument(
+        '--backend', choices=aws_async.BACKENDS, default='threads',
+        help="Run copies on thread pools, or as asyncio coroutines on one thread (requires aiobotocore). "
+             "Default is threads."
+    )
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    sync_s3_buckets(args.source_bucket, args.destination_bucket, dry_run=args.dry_run)
+    sync_s3_buckets(
+        args.source_bucket,
+        args.destination_bucket,
+        dry_run=args.dry_run,
+        incremental=args.incremental,
+        workers=args.workers,
+        multipart_threshold=args.multipart_threshold * MB,
+        part_size=args.part_size * MB,
+        backend=args.backend
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,46 +1,165 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import asyncio
 import datetime
 import logging
+import operator
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
 
-def delete_old_s3_objects(bucket_name: str, days: int = 30, dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import aws_async  # noqa: E402
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+
+# DeleteObjects accepts at most 1,000 keys per request.
+MAX_DELETE_BATCH = 1000
+
+def iter_expired_objects(s3, bucket_name: str, days: int):
+    """
+    Yield (key, age_days) for every object in the bucket older than the given number of days.
+
+    The bucket is listed page by page, so only one listing page is held in memory at a time.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    paginator = s3.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket_name):
+        for obj in page.get('Contents', []):
+            last_modified = obj.get('LastModified')
+            if not last_modified:
+                continue
+            age = (now - last_modified).days
+            if age > days:
+                yield obj['Key'], age
+
+def chunked(iterable, size: int):
+    """Yield successive lists of at most `size` items from an iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def delete_batch(s3, bucket_name: str, keys: list) -> int:
+    """
+    Delete a batch of keys with a single DeleteObjects call and log per-key errors.
+
+    Returns:
+        int: The number of keys that were deleted successfully.
+    """
+    try:
+        response = s3.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+        )
+    except Exception as e:
+        logging.error(f"Error deleting batch of {len(keys)} objects from bucket '{bucket_name}': {e}")
+        return 0
+    return count_deleted(bucket_name, keys, response)
+
+async def delete_batch_async(s3, bucket_name: str, keys: list) -> int:
+    """Asyncio counterpart of delete_batch() for an aiobotocore S3 client."""
+    try:
+        response = await s3.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+        )
+    except Exception as e:
+        logging.error(f"Error deleting batch of {len(keys)} objects from bucket '{bucket_name}': {e}")
+        return 0
+    return count_deleted(bucket_name, keys, response)
+
+def count_deleted(bucket_name: str, keys: list, response: dict) -> int:
+    """Log the per-key errors of a DeleteObjects response and return the number of keys deleted."""
+    errors = response.get('Errors', [])
+    for error in errors:
+        logging.error(
+            f"Error deleting object '{error.get('Key')}' from bucket '{bucket_name}': "
+            f"{error.get('Code')} {error.get('Message')}"
+        )
+    return len(keys) - len(errors)
+
+async def delete_expired_async(batches, bucket_name: str, workers: int) -> int:
+    """
+    Delete batches of keys with up to `workers` DeleteObjects requests in flight on one thread.
+
+    The blocking listing runs in a worker thread, one batch at a time, while the event
+    loop keeps the deletions going.
+
+    Returns:
+        int: The number of keys that were deleted successfully.
+    """
+    async with aws_async.create_client('s3', max_pool_connections=workers) as s3:
+        return await aws_async.bounded_map(
+            lambda keys: delete_batch_async(s3, bucket_name, keys),
+            aws_async.iterate_in_thread(batches, chunk_size=1),
+            workers,
+            fold=operator.add,
+            initial=0
+        )
+
+def delete_old_s3_objects(bucket_name: str, days: int = 30, dry_run: bool = False,
+                          workers: int = 8, batch_size: int = MAX_DELETE_BATCH, backend: str = 'threads') -> None:
     """
     Delete S3 objects in the specified bucket that are older than the given number of days.
 
+    The bucket is scanned with a paginated listing and expired keys are streamed into
+    DeleteObjects batches that run on a bounded worker pool, so memory use stays flat
+    regardless of bucket size. With the 'asyncio' backend the batches run as coroutines on
+    one thread instead, so `workers` can be raised to thousands of requests in flight.
+
     Args:
         bucket_name (str): The name of the S3 bucket.
         days (int): Delete objects older than this number of days.
         dry_run (bool): If True, simulate deletion without actually removing objects.
+        workers (int): Maximum number of DeleteObjects requests in flight at once.
+        batch_size (int): Number of keys per DeleteObjects request (at most 1,000).
+        backend (str): 'threads' for a thread pool, or 'asyncio' for aiobotocore coroutines.
     """
-    s3 = boto3.client('s3')
+    if backend == 'asyncio' and not aws_async.available():
+        logging.error(aws_async.MISSING_MESSAGE)
+        sys.exit(1)
+    if backend == 'threads':
+        ensure_pool_size(workers)
+    s3 = get_client('s3')
+    batch_size = max(1, min(batch_size, MAX_DELETE_BATCH))
+    expired = iter_expired_objects(s3, bucket_name, days)
+
+    matched = 0
+    deleted = 0
     try:
-        response = s3.list_objects_v2(Bucket=bucket_name)
+        if dry_run:
+            for key, age in expired:
+                print(f"Dry run: Would delete '{key}' (Age: {age} days)")
+                matched += 1
+        elif backend == 'asyncio':
+            def batches():
+                nonlocal matched
+                for batch in chunked(expired, batch_size):
+                    matched += len(batch)
+                    yield [key for key, _ in batch]
+            deleted = asyncio.run(delete_expired_async(batches(), bucket_name, workers))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = set()
+                for batch in chunked(expired, batch_size):
+                    # Keep at most two batches per worker queued so listing never outruns deletion.
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        deleted += sum(future.result() for future in done)
+                    matched += len(batch)
+                    pending.add(executor.submit(delete_batch, s3, bucket_name, [key for key, _ in batch]))
+                deleted += sum(future.result() for future in wait(pending).done)
     except Exception as e:
         logging.error(f"Error listing objects in bucket '{bucket_name}': {e}")
         sys.exit(1)
-    
-    objects = response.get('Contents', [])
-    if not objects:
-        print(f"No objects found in bucket '{bucket_name}'.")
-        return
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    for obj in objects:
-        last_modified = obj.get('LastModified')
-        if not last_modified:
-            continue
-        age = (now - last_modified).days
-        if age > days:
-            if dry_run:
-                print(f"Dry run: Would delete '{obj['Key']}' (Age: {age} days)")
-            else:
-                try:
-                    s3.delete_object(Bucket=bucket_name, Key=obj['Key'])
-                    print(f"Deleted '{obj['Key']}' from '{bucket_name}' (Age: {age} days)")
-                except Exception as e:
-                    logging.error(f"Error deleting object '{obj['Key']}' from bucket '{bucket_name}': {e}")
+    if not matched:
+        print(f"No objects older than {days} days found in bucket '{bucket_name}'.")
+    elif not dry_run:
+        print(f"Deleted {deleted} of {matched} objects older than {days} days from '{bucket_name}'.")
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -58,11 +177,31 @@ def parse_arguments() -> argparse.Namespace:
         '--dry-run', action='store_true',
         help="Simulate deletion without actually deleting any objects."
     )
+    parser.add_argument(
+        '--workers', type=int, default=8,
+        help="Maximum number of concurrent DeleteObjects requests. Default is 8."
+    )
+    parser.add_argument(
+        '--batch-size', type=int, default=MAX_DELETE_BATCH,
+        help="Number of keys per DeleteObjects request (max 1000). Default is 1000."
+    )
+    parser.add_argument(
+        '--backend', choices=aws_async.BACKENDS, default='threads',
+        help="Run requests on a thread pool, or as asyncio coroutines on one thread (requires aiobotocore). "
+             "Default is threads."
+    )
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    delete_old_s3_objects(args.bucket_name, days=args.days, dry_run=args.dry_run)
+    delete_old_s3_objects(
+        args.bucket_name,
+        days=args.days,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        backend=args.backend
+    )
 
 if __name__ == "__main__":
     main()
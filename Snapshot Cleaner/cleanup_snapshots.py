@@ -1,47 +1,133 @@
 #!/usr/bin/env python3
-import boto3
 import argparse
+import asyncio
 import logging
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 
-def cleanup_snapshots(retention_days: int = 30, dry_run: bool = False) -> None:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import aws_async  # noqa: E402
+from aws_clients import ensure_pool_size, get_client  # noqa: E402
+from inventory_cache import DEFAULT_TTL, InventoryCache  # noqa: E402
+
+def get_ami_snapshot_ids(ec2) -> set:
+    """
+    Return the IDs of all snapshots that back an AMI owned by this account.
+
+    Args:
+        ec2: A boto3 EC2 client.
+    """
+    snapshot_ids = set()
+    paginator = ec2.get_paginator('describe_images')
+    for page in paginator.paginate(Owners=['self']):
+        for image in page.get('Images', []):
+            for mapping in image.get('BlockDeviceMappings', []):
+                snapshot_id = mapping.get('Ebs', {}).get('SnapshotId')
+                if snapshot_id:
+                    snapshot_ids.add(snapshot_id)
+    return snapshot_ids
+
+def iter_snapshots(ec2):
+    """Yield every snapshot owned by this account, following pagination."""
+    paginator = ec2.get_paginator('describe_snapshots')
+    for page in paginator.paginate(OwnerIds=['self']):
+        yield from page.get('Snapshots', [])
+
+def list_snapshots(ec2) -> list:
+    """Return the ID and start time of every snapshot owned by this account, for the inventory cache."""
+    return [
+        {'SnapshotId': snapshot['SnapshotId'], 'StartTime': snapshot['StartTime']}
+        for snapshot in iter_snapshots(ec2) if snapshot.get('StartTime')
+    ]
+
+async def delete_snapshots_async(eligible: list, region: str, workers: int) -> list:
+    """
+    Delete (snapshot_id, age_days) pairs on one thread with up to `workers` DeleteSnapshot calls in flight.
+
+    Returns:
+        list: The IDs of the snapshots that were deleted.
+    """
+    async with aws_async.create_client('ec2', region, max_pool_connections=workers) as ec2:
+        async def delete(snapshot: tuple) -> str:
+            snapshot_id, age_days = snapshot
+            try:
+                await ec2.delete_snapshot(SnapshotId=snapshot_id)
+            except Exception as e:
+                logging.error(f"Error deleting snapshot {snapshot_id}: {e}")
+                return None
+            print(f"Deleted snapshot {snapshot_id} (Age: {age_days} days)")
+            return snapshot_id
+
+        return [snapshot_id for snapshot_id in await aws_async.bounded_map(delete, eligible, workers) if snapshot_id]
+
+def cleanup_snapshots(retention_days: int = 30, dry_run: bool = False, workers: int = 10,
+                      cache_ttl: float = DEFAULT_TTL, backend: str = 'threads') -> None:
     """
     Delete EC2 snapshots older than the specified retention period.
 
+    Snapshots referenced by an AMI owned by this account are skipped. Eligible
+    snapshots are deleted concurrently on a bounded thread pool. A dry run reads the
+    snapshot and AMI inventories from the local inventory cache when it is younger than
+    `cache_ttl`; a real run always fetches fresh ones. Deleted snapshots are removed from it. With the 'asyncio' backend the
+    deletions run as coroutines on one thread instead.
+
     Args:
         retention_days (int): Snapshots older than this number of days will be deleted.
         dry_run (bool): If True, simulate deletion without actually deleting snapshots.
+        workers (int): Maximum number of concurrent DeleteSnapshot requests.
+        cache_ttl (float): Maximum age in seconds of cached inventories; 0 always fetches fresh ones.
+        backend (str): 'threads' for a thread pool, or 'asyncio' for aiobotocore coroutines.
     """
-    ec2 = boto3.client('ec2')
+    if backend == 'asyncio' and not aws_async.available():
+        logging.error(aws_async.MISSING_MESSAGE)
+        sys.exit(1)
+    ensure_pool_size(workers)
+    ec2 = get_client('ec2')
+    region = ec2.meta.region_name
+    cache = InventoryCache(ttl=cache_ttl)
+    now = datetime.now(timezone.utc)
+    eligible = []
     try:
-        response = ec2.describe_snapshots(OwnerIds=['self'])
-        snapshots = response.get('Snapshots', [])
+        # Only dry runs read cached inventories: a snapshot registered to an AMI since they
+        # were fetched must never be deleted.
+        ami_snapshot_ids = set(cache.listing('ami-snapshot-ids', region, lambda: sorted(get_ami_snapshot_ids(ec2)),
+                                             refresh=not dry_run))
+        for snapshot in cache.listing('snapshots', region, lambda: list_snapshots(ec2), refresh=not dry_run):
+            age_days = (now - datetime.fromisoformat(snapshot['StartTime'])).days
+            if age_days > retention_days:
+                snapshot_id = snapshot.get('SnapshotId')
+                if snapshot_id in ami_snapshot_ids:
+                    print(f"Skipping snapshot {snapshot_id} (Age: {age_days} days): in use by an AMI")
+                elif dry_run:
+                    print(f"Dry run: Would delete snapshot {snapshot_id} (Age: {age_days} days)")
+                else:
+                    eligible.append((snapshot_id, age_days))
     except Exception as e:
         logging.error(f"Error retrieving snapshots: {e}")
         sys.exit(1)
 
-    now = datetime.now(timezone.utc)
-    deleted_any = False
-
-    for snapshot in snapshots:
-        start_time = snapshot.get('StartTime')
-        if start_time is None:
-            continue
-        age_days = (now - start_time).days
-        if age_days > retention_days:
-            snapshot_id = snapshot.get('SnapshotId')
-            if dry_run:
-                print(f"Dry run: Would delete snapshot {snapshot_id} (Age: {age_days} days)")
-            else:
+    deleted = []
+    if eligible and backend == 'asyncio':
+        deleted = asyncio.run(delete_snapshots_async(eligible, region, workers))
+    elif eligible:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(ec2.delete_snapshot, SnapshotId=snapshot_id): (snapshot_id, age_days)
+                for snapshot_id, age_days in eligible
+            }
+            for future in as_completed(futures):
+                snapshot_id, age_days = futures[future]
                 try:
-                    ec2.delete_snapshot(SnapshotId=snapshot_id)
+                    future.result()
                     print(f"Deleted snapshot {snapshot_id} (Age: {age_days} days)")
-                    deleted_any = True
+                    deleted.append(snapshot_id)
                 except Exception as e:
                     logging.error(f"Error deleting snapshot {snapshot_id}: {e}")
 
-    if not deleted_any and not dry_run:
+    cache.discard('snapshots', region, deleted, 'SnapshotId')
+    if not deleted and not dry_run:
         print("No snapshots older than the retention period were found.")
 
 def parse_arguments() -> argparse.Namespace:
@@ -59,12 +145,31 @@ def parse_arguments() -> argparse.Namespace:
         action="store_true",
         help="Simulate deletion without actually deleting any snapshots."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=10,
+        help="Maximum number of snapshots deleted concurrently (default: 10)."
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help=f"Seconds for which a dry run reuses cached snapshot and AMI inventories; 0 always fetches (default: {DEFAULT_TTL:g})."
+    )
+    parser.add_argument(
+        "--backend",
+        choices=aws_async.BACKENDS,
+        default="threads",
+        help="Delete on a thread pool, or as asyncio coroutines on one thread (requires aiobotocore) (default: threads)."
+    )
     return parser.parse_args()
 
 def main():
     logging.basicConfig(level=logging.INFO)
     args = parse_arguments()
-    cleanup_snapshots(retention_days=args.retention_days, dry_run=args.dry_run)
+    cleanup_snapshots(retention_days=args.retention_days, dry_run=args.dry_run, workers=args.workers,
+                      cache_ttl=args.cache_ttl, backend=args.backend)
 
 if __name__ == "__main__":
     main()
@@ -1,45 +1,182 @@
-import boto3
+#!/usr/bin/env python3
+import argparse
 import logging
+import time
+import sys
+import os
 from botocore.exceptions import ClientError
 
-# Initialize a session using Amazon EC2
-session = boto3.Session(
-    aws_access_key_id='YOUR_ACCESS_KEY',
-    aws_secret_access_key='YOUR_SECRET_KEY',
-    region_name='YOUR_REGION_NAME'
-)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import get_client  # noqa: E402
+from inventory_cache import InventoryCache  # noqa: E402
 
-ec2 = session.client('ec2')
+# Status checks whose 'impaired' state marks an instance as unhealthy.
+STATUS_FILTERS = ('instance-status.status', 'system-status.status')
+REBOOT_CHUNK_SIZE = 100
 
 
-def get_unhealthy_instances():
-    """Retrieve unhealthy EC2 instances."""
-    try:
-        response = ec2.describe_instance_status(
-            Filters=[{'Name': 'instance-status.status', 'Values': ['impaired']}]
-        )
-        return [instance['InstanceId'] for instance in response['InstanceStatuses']]
-    except ClientError as e:
-        logging.error(e)
-        return []
+def get_unhealthy_instances(ec2):
+    """
+    Retrieve EC2 instances with an impaired instance or system status check.
+
+    Errors are raised rather than returned as an empty list, so a failed check is never
+    mistaken for (or cached as) a healthy fleet.
+    """
+    instance_ids = set()
+    paginator = ec2.get_paginator('describe_instance_status')
+    for filter_name in STATUS_FILTERS:
+        for page in paginator.paginate(Filters=[{'Name': filter_name, 'Values': ['impaired']}]):
+            instance_ids.update(status['InstanceId'] for status in page.get('InstanceStatuses', []))
+    return sorted(instance_ids)
+
+
+def reboot_instances(ec2, instance_ids, dry_run=False):
+    """Reboot the given EC2 instances in chunks, returning the IDs that were rebooted."""
+    rebooted = []
+    for start in range(0, len(instance_ids), REBOOT_CHUNK_SIZE):
+        chunk = instance_ids[start:start + REBOOT_CHUNK_SIZE]
+        if dry_run:
+            logging.info(f'Dry run: Would reboot instances: {chunk}')
+            rebooted.extend(chunk)
+            continue
+        try:
+            ec2.reboot_instances(InstanceIds=chunk)
+            logging.info(f'Rebooted instances: {chunk}')
+            rebooted.extend(chunk)
+        except ClientError as e:
+            logging.error(e)
+    return rebooted
+
+
+class RebootGate:
+    """
+    Debounce and cooldown state for instances seen across polls.
+
+    An instance is rebooted only after it has been impaired for `debounce` consecutive
+    polls, and not again until `cooldown` seconds after its last reboot, so flapping
+    hosts are not rebooted in a loop.
+    """
+
+    def __init__(self, debounce=1, cooldown=900):
+        self.debounce = debounce
+        self.cooldown = cooldown
+        self.impaired_polls = {}
+        self.last_reboot = {}
+
+    def select(self, unhealthy_instances, now):
+        """Record a poll's unhealthy instances and return those that should be rebooted now."""
+        self.impaired_polls = {
+            instance_id: self.impaired_polls.get(instance_id, 0) + 1 for instance_id in unhealthy_instances
+        }
+        # Forget cooldowns that have expired so the cache does not grow without bound.
+        self.last_reboot = {
+            instance_id: rebooted_at for instance_id, rebooted_at in self.last_reboot.items()
+            if now - rebooted_at < self.cooldown
+        }
+        return [
+            instance_id for instance_id, polls in self.impaired_polls.items()
+            if polls >= self.debounce and instance_id not in self.last_reboot
+        ]
+
+    def record(self, instance_ids, now):
+        """Start the cooldown for instances that were just rebooted."""
+        for instance_id in instance_ids:
+            self.last_reboot[instance_id] = now
+            self.impaired_polls.pop(instance_id, None)
 
 
-def reboot_instances(instance_ids):
-    """Reboot the given EC2 instances."""
+def poll(ec2, gate, dry_run=False, cache=None, refresh=False):
+    """
+    Run one check of instance health and reboot the instances the gate lets through.
+
+    With an inventory cache, the impaired instance list is read from it unless `refresh`
+    is set, and the cached list is invalidated after a reboot.
+
+    Returns:
+        bool: False if instance health could not be retrieved, otherwise True.
+    """
+    region = ec2.meta.region_name
     try:
-        ec2.reboot_instances(InstanceIds=instance_ids)
-        logging.info(f'Rebooted instances: {instance_ids}')
-    except ClientError as e:
-        logging.error(e)
+        if cache is None:
+            unhealthy_instances = get_unhealthy_instances(ec2)
+        else:
+            unhealthy_instances = cache.listing(
+                'impaired-instances', region, lambda: get_unhealthy_instances(ec2), refresh=refresh
+            )
+    except Exception as e:
+        logging.error(f'Error retrieving instance health: {e}')
+        return False
+    if not unhealthy_instances:
+        logging.info('No unhealthy instances found.')
+        return True
+    now = time.monotonic()
+    to_reboot = gate.select(unhealthy_instances, now)
+    waiting = sorted(set(unhealthy_instances) - set(to_reboot))
+    if waiting:
+        logging.info(f'Unhealthy instances held back by debounce or cooldown: {waiting}')
+    if to_reboot:
+        rebooted = reboot_instances(ec2, to_reboot, dry_run=dry_run)
+        gate.record(rebooted, now)
+        if cache is not None and rebooted and not dry_run:
+            cache.invalidate('impaired-instances', region)
+    return True
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Reboot EC2 instances with impaired instance or system status checks."
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help="Log which instances would be rebooted without rebooting them."
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help="Keep running and poll instance health every --interval seconds."
+    )
+    parser.add_argument(
+        '--interval', type=float, default=10,
+        help="Seconds between polls in watch mode. Default is 10."
+    )
+    parser.add_argument(
+        '--debounce', type=int, default=None,
+        help="Consecutive impaired polls required before a reboot. Default is 2 in watch mode, otherwise 1."
+    )
+    parser.add_argument(
+        '--cooldown', type=float, default=900,
+        help="Seconds to wait after rebooting an instance before it may be rebooted again. Default is 900."
+    )
+    parser.add_argument(
+        '--cache-ttl', type=float, default=0,
+        help="Seconds for which a cached impaired instance list is reused by a single check. "
+             "Health changes quickly, so the default of 0 always fetches. Watch mode always fetches."
+    )
+    return parser.parse_args()
 
 
 def main():
     """Main function to reboot unhealthy instances."""
-    unhealthy_instances = get_unhealthy_instances()
-    if unhealthy_instances:
-        reboot_instances(unhealthy_instances)
-    else:
-        logging.info('No unhealthy instances found.')
+    logging.basicConfig(level=logging.INFO)
+    args = parse_arguments()
+    # One client from the default credential chain, reused for every poll.
+    ec2 = get_client('ec2')
+    debounce = args.debounce if args.debounce is not None else (2 if args.watch else 1)
+    gate = RebootGate(debounce=debounce, cooldown=args.cooldown)
+    cache = InventoryCache(ttl=args.cache_ttl)
+
+    if not args.watch:
+        if not poll(ec2, gate, dry_run=args.dry_run, cache=cache):
+            sys.exit(1)
+        return
+
+    logging.info(f'Watching instance health every {args.interval} seconds.')
+    try:
+        while True:
+            started = time.monotonic()
+            poll(ec2, gate, dry_run=args.dry_run, cache=cache, refresh=True)
+            time.sleep(max(0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        logging.info('Stopped watching instance health.')
 
 
 if __name__ == '__main__':
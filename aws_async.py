@@ -0,0 +1,131 @@
+"""
+Optional asyncio backend for the scripts' high fan-out paths, built on aiobotocore.
+
+Thread pools spend a thread, its stack and a GIL hand-off on every request in flight. The
+asyncio backend keeps thousands of requests in flight on one thread instead, bounded by
+bounded_map(). Clients come from create_client(), which uses the same credentials, region
+defaults and retry settings as aws_clients.get_client(); credentials are resolved once
+when the client is created.
+
+aiobotocore is not required by the rest of the repository. Scripts that offer
+`--backend asyncio` check available() and exit with an error when it is not installed:
+
+    pip install aiobotocore
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from itertools import islice
+
+from aws_clients import client_config, get_session, resolve_region
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session as get_aio_session
+except ImportError:
+    AioConfig = None
+    get_aio_session = None
+
+BACKENDS = ('threads', 'asyncio')
+MISSING_MESSAGE = "The asyncio backend requires aiobotocore. Install it with: pip install aiobotocore"
+
+def available() -> bool:
+    """Return True when aiobotocore is installed."""
+    return get_aio_session is not None
+
+@asynccontextmanager
+async def create_client(service: str, region: str = None, profile: str = None, max_pool_connections: int = None):
+    """
+    Open an aiobotocore client for (service, region, profile), closing it on exit.
+
+    Args:
+        service (str): AWS service name, e.g. 's3'.
+        region (str): Region name. Defaults to the aws_clients default region.
+        profile (str): Profile or assumed role key, as for aws_clients.get_client().
+        max_pool_connections (int): Size of the connection pool; should match the in-flight limit.
+    """
+    if not available():
+        raise RuntimeError(MISSING_MESSAGE)
+    credentials = get_session(profile).get_credentials()
+    frozen = credentials.get_frozen_credentials() if credentials else None
+    overrides = {'max_pool_connections': max_pool_connections} if max_pool_connections else {}
+    async with get_aio_session().create_client(
+        service,
+        region_name=resolve_region(region, profile),
+        aws_access_key_id=frozen.access_key if frozen else None,
+        aws_secret_access_key=frozen.secret_key if frozen else None,
+        aws_session_token=frozen.token if frozen else None,
+        config=client_config(AioConfig, **overrides)
+    ) as client:
+        yield client
+
+async def iterate_in_thread(iterable, chunk_size: int = 1000):
+    """
+    Consume a blocking iterable (e.g. a boto3 listing) in a worker thread and yield its items.
+
+    Items are fetched `chunk_size` at a time, so the event loop keeps serving requests
+    while the next chunk of the listing is retrieved.
+    """
+    iterator = iter(iterable)
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, lambda: list(islice(iterator, chunk_size)))
+        if not chunk:
+            return
+        for item in chunk:
+            yield item
+
+def discard(value, result):
+    """A `fold` for bounded_map() that drops every result."""
+    return value
+
+def _append(results: list, result) -> list:
+    results.append(result)
+    return results
+
+async def bounded_map(func, items, limit: int, fold=None, initial=None):
+    """
+    Await `func(item)` for every item with at most `limit` calls in flight.
+
+    `items` may be a regular or an async iterable. It is consumed lazily, so a task is
+    only created when a slot frees up and queued work stays bounded for any number of items.
+    If a call raises, the remaining calls are cancelled and the exception propagates.
+
+    Without `fold`, every result is kept and returned as a list. With `fold`, each result is
+    combined into a running value as `fold(value, result)`, starting from `initial`, and only
+    that value is kept, so memory stays flat: pass `operator.add` to total counts, or
+    discard() to drop the results.
+
+    Returns:
+        The results of every call in completion order, or the folded value.
+    """
+    if fold is None:
+        return await bounded_map(func, items, limit, fold=_append, initial=[])
+    value = initial
+    pending = set()
+
+    async def drain(return_when) -> None:
+        nonlocal pending, value
+        done, pending = await asyncio.wait(pending, return_when=return_when)
+        for task in done:
+            value = fold(value, task.result())
+
+    async def submit(item) -> None:
+        if len(pending) >= limit:
+            await drain(asyncio.FIRST_COMPLETED)
+        pending.add(asyncio.ensure_future(func(item)))
+
+    try:
+        if hasattr(items, '__aiter__'):
+            async for item in items:
+                await submit(item)
+        else:
+            for item in items:
+                await submit(item)
+        if pending:
+            await drain(asyncio.ALL_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+        # Wait for the cancelled calls to unwind before the exception propagates.
+        await asyncio.gather(*pending, return_exceptions=True)
+    return value
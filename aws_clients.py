@@ -0,0 +1,168 @@
+"""
+Shared boto3 session and client factory for the scripts in this repository.
+
+Every script gets its clients from get_client(), which caches one session per profile
+and one client per (service, region, profile), so concurrent workers share a connection
+pool and TLS sessions instead of each building their own. Clients use adaptive retries,
+TCP keepalive and a larger connection pool than botocore's default of 10.
+
+The client configuration can be tuned with configure() before clients are created, or
+with these environment variables:
+
+    AWS_CLIENT_MAX_POOL_CONNECTIONS  (default: 50)
+    AWS_CLIENT_MAX_ATTEMPTS          (default: 10)
+    AWS_CLIENT_RETRY_MODE            (default: adaptive)
+    AWS_CLIENT_CONNECT_TIMEOUT       (seconds, default: 10)
+    AWS_CLIENT_READ_TIMEOUT          (seconds, default: 60)
+    AWS_CLIENT_TCP_KEEPALIVE         (default: true)
+
+Scripts live in their own directories, so they import this module by adding the
+repository root to sys.path.
+
+The optional asyncio backend in aws_async.py builds its clients from the same settings.
+
+Runners that act on other accounts or regions call assume_role() and set_defaults(),
+after which every get_client() call without an explicit profile or region uses them.
+"""
+import os
+import threading
+
+import boto3
+import botocore.session
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    return default if value is None else value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+_settings = {
+    'max_pool_connections': int(os.environ.get('AWS_CLIENT_MAX_POOL_CONNECTIONS', 50)),
+    'max_attempts': int(os.environ.get('AWS_CLIENT_MAX_ATTEMPTS', 10)),
+    'retry_mode': os.environ.get('AWS_CLIENT_RETRY_MODE', 'adaptive'),
+    'connect_timeout': float(os.environ.get('AWS_CLIENT_CONNECT_TIMEOUT', 10)),
+    'read_timeout': float(os.environ.get('AWS_CLIENT_READ_TIMEOUT', 60)),
+    'tcp_keepalive': _env_bool('AWS_CLIENT_TCP_KEEPALIVE', True),
+}
+_defaults = {'profile': None, 'region': None}
+_sessions = {}
+_clients = {}
+# boto3 sessions are not thread-safe while creating clients, so creation is serialized.
+_lock = threading.RLock()
+
+def configure(**settings) -> None:
+    """
+    Change the client configuration, e.g. configure(max_pool_connections=100, read_timeout=120).
+
+    Cached clients are discarded so the next get_client() call uses the new settings.
+    """
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    with _lock:
+        _settings.update(settings)
+        _clients.clear()
+
+def ensure_pool_size(size: int) -> None:
+    """Grow the connection pool to at least `size`, for callers running that many concurrent requests."""
+    with _lock:
+        if size > _settings['max_pool_connections']:
+            configure(max_pool_connections=size)
+
+def client_config(config_class: type = Config, **overrides) -> Config:
+    """
+    Return the botocore Config built from the current settings and any overrides.
+
+    `config_class` lets the asyncio backend build an aiobotocore AioConfig from the same settings.
+    """
+    settings = dict(_settings, **overrides)
+    return config_class(
+        max_pool_connections=settings['max_pool_connections'],
+        retries={'max_attempts': settings['max_attempts'], 'mode': settings['retry_mode']},
+        connect_timeout=settings['connect_timeout'],
+        read_timeout=settings['read_timeout'],
+        tcp_keepalive=settings['tcp_keepalive'],
+    )
+
+def set_defaults(profile: str = None, region: str = None) -> None:
+    """
+    Set the profile (or assumed role key) and region used when get_client() is called without them.
+
+    The defaults are process-wide, so a process must run one account and region at a time.
+    """
+    with _lock:
+        _defaults['profile'] = profile
+        _defaults['region'] = region
+
+def assume_role(role_arn: str, session_name: str = 'aws-automation-scripts', profile: str = None,
+                duration: int = 3600) -> str:
+    """
+    Assume an IAM role and register a session for it under the role ARN.
+
+    The session's credentials are refreshed automatically before they expire, so long
+    operations keep working. Pass the returned key as `profile` to get_client() or set_defaults().
+
+    Args:
+        role_arn (str): ARN of the role to assume.
+        session_name (str): Role session name recorded in CloudTrail.
+        profile (str): Profile whose credentials assume the role (None for the default chain).
+        duration (int): Lifetime in seconds of each set of temporary credentials.
+    """
+    with _lock:
+        if role_arn in _sessions:
+            return role_arn
+        base_session = boto3.session.Session(profile_name=profile)
+        sts = base_session.client('sts', config=client_config())
+
+        def refresh() -> dict:
+            credentials = sts.assume_role(
+                RoleArn=role_arn, RoleSessionName=session_name, DurationSeconds=duration
+            )['Credentials']
+            return {
+                'access_key': credentials['AccessKeyId'],
+                'secret_key': credentials['SecretAccessKey'],
+                'token': credentials['SessionToken'],
+                'expiry_time': credentials['Expiration'].isoformat(),
+            }
+
+        core_session = botocore.session.get_session()
+        # botocore has no public way to attach refreshable credentials to a session.
+        core_session._credentials = RefreshableCredentials.create_from_metadata(
+            metadata=refresh(), refresh_using=refresh, method='sts-assume-role'
+        )
+        core_session.set_config_variable('region', base_session.region_name)
+        _sessions[role_arn] = boto3.session.Session(botocore_session=core_session)
+        return role_arn
+
+def get_session(profile: str = None) -> boto3.session.Session:
+    """Return the cached session for a profile or assumed role (None for the default)."""
+    with _lock:
+        if profile is None:
+            profile = _defaults['profile']
+        session = _sessions.get(profile)
+        if session is None:
+            session = _sessions[profile] = boto3.session.Session(profile_name=profile)
+        return session
+
+def resolve_region(region: str = None, profile: str = None) -> str:
+    """Return `region`, or the default region, or the region of the profile's session."""
+    return region or _defaults['region'] or get_session(profile).region_name
+
+def get_client(service: str, region: str = None, profile: str = None):
+    """Return the cached client for (service, region, profile), creating it on first use."""
+    with _lock:
+        if profile is None:
+            profile = _defaults['profile']
+        session = get_session(profile)
+        key = (service, resolve_region(region, profile), profile)
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = session.client(service, region_name=key[1], config=client_config())
+        return client
+
+def clear_cache() -> None:
+    """Forget every cached session and client, and reset the defaults."""
+    with _lock:
+        set_defaults()
+        _sessions.clear()
+        _clients.clear()
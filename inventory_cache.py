@@ -0,0 +1,167 @@
+"""
+On-disk cache of resource inventories from describe_* calls, shared by the scripts in this repository.
+
+Each listing (e.g. the available volumes or the security groups of one region) is stored
+as one zlib-compressed JSON blob per (account, kind, region) in a SQLite file, with the
+time it was fetched. Reads within the TTL are served from disk, so scripts run back to
+back pay for an inventory once. Scripts that delete or stop resources remove them from
+the cached listings, or invalidate the listing, so the next reader never acts on them,
+and only read cached listings on dry runs. Listings are keyed by the caller's account;
+when it cannot be determined, the cache is disabled rather than shared between accounts.
+
+The cache file and default TTL can be set with these environment variables:
+
+    AWS_INVENTORY_CACHE_FILE  (default: ~/.cache/aws-inventory/inventory.sqlite3)
+    AWS_INVENTORY_CACHE_TTL   (seconds, default: 300)
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, datetime
+
+from aws_clients import get_client
+
+DEFAULT_CACHE_FILE = os.environ.get(
+    'AWS_INVENTORY_CACHE_FILE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'aws-inventory', 'inventory.sqlite3')
+)
+DEFAULT_TTL = float(os.environ.get('AWS_INVENTORY_CACHE_TTL', 300))
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _item_id(item, id_key: str):
+    return item.get(id_key) if isinstance(item, dict) else item
+
+class InventoryCache:
+    """
+    TTL cache of resource listings per account, kind and region.
+
+    A TTL of 0 or less bypasses the cache: listings are neither read nor stored, but
+    resources that are deleted or change state are still removed from stored listings.
+    The cache is also bypassed when the caller's account cannot be determined.
+
+    Args:
+        path (str): Path of the SQLite cache file.
+        ttl (float): Seconds for which a stored listing is served without calling AWS.
+        account (str): Account the listings belong to. Defaults to the caller's account.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, ttl: float = DEFAULT_TTL, account: str = None):
+        self.path = path
+        self.ttl = ttl
+        # Resolved up front, in the caller's thread, so workers never need their own STS call.
+        self.account = account or self._caller_account()
+        # Workers of one script share the connection, so access to it is serialized.
+        self._lock = threading.Lock()
+        self.connection = None
+        if self.account is None:
+            return
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS listings (
+                account TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                region TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (account, kind, region)
+            )
+        """)
+        self.connection.commit()
+
+    @staticmethod
+    def _caller_account() -> str:
+        try:
+            return get_client('sts').get_caller_identity()['Account']
+        except Exception as e:
+            logging.warning(f"Could not determine the AWS account, so the inventory cache is disabled: {e}")
+            return None
+
+    def get(self, kind: str, region: str):
+        """Return the cached listing if it is younger than the TTL, otherwise None."""
+        if self.ttl <= 0 or self.connection is None:
+            return None
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT fetched_at, data FROM listings WHERE account = ? AND kind = ? AND region = ?",
+                (self.account, kind, region)
+            ).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return json.loads(zlib.decompress(row[1]))
+
+    def put(self, kind: str, region: str, items: list) -> None:
+        """Store a freshly fetched listing, unless the cache is bypassed."""
+        if self.ttl <= 0 or self.connection is None:
+            return
+        data = zlib.compress(json.dumps(items, default=_to_json, separators=(',', ':')).encode())
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?)",
+                (self.account, kind, region, time.time(), data)
+            )
+
+    def listing(self, kind: str, region: str, fetch, refresh: bool = False) -> list:
+        """
+        Return a listing from the cache, or call `fetch()` and store its result.
+
+        `fetch` must return a list of JSON-serializable items; datetimes are stored as ISO
+        8601 strings, so callers receive the same representation whether or not it was cached.
+        """
+        items = None if refresh else self.get(kind, region)
+        if items is None:
+            items = json.loads(json.dumps(fetch(), default=_to_json))
+            self.put(kind, region, items)
+        return items
+
+    def discard(self, kind: str, region: str, resource_ids, id_key: str = None) -> None:
+        """
+        Remove resources from a cached listing after they were deleted or changed state.
+
+        Items are matched on `id_key` when they are dicts, or directly when they are plain IDs.
+        The listing keeps its original fetch time.
+        """
+        resource_ids = set(resource_ids)
+        if not resource_ids or self.connection is None:
+            return
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT data FROM listings WHERE account = ? AND kind = ? AND region = ?",
+                (self.account, kind, region)
+            ).fetchone()
+            if row is None:
+                return
+            items = [item for item in json.loads(zlib.decompress(row[0]))
+                     if _item_id(item, id_key) not in resource_ids]
+            self.connection.execute(
+                "UPDATE listings SET data = ? WHERE account = ? AND kind = ? AND region = ?",
+                (zlib.compress(json.dumps(items, separators=(',', ':')).encode()), self.account, kind, region)
+            )
+
+    def invalidate(self, kind: str, region: str = None) -> None:
+        """Drop a listing for one region, or for every region when `region` is None."""
+        if self.connection is None:
+            return
+        with self._lock, self.connection:
+            if region is None:
+                self.connection.execute(
+                    "DELETE FROM listings WHERE account = ? AND kind = ?", (self.account, kind)
+                )
+            else:
+                self.connection.execute(
+                    "DELETE FROM listings WHERE account = ? AND kind = ? AND region = ?",
+                    (self.account, kind, region)
+                )
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
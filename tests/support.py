@@ -0,0 +1,49 @@
+"""Helpers shared by the tests: loading the scripts and faking AWS."""
+import importlib.util
+import os
+import sys
+from contextlib import contextmanager
+from unittest import mock
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import aws_clients  # noqa: E402
+
+# Credentials and region for moto; they never reach AWS.
+FAKE_ENVIRONMENT = {
+    'AWS_ACCESS_KEY_ID': 'testing',
+    'AWS_SECRET_ACCESS_KEY': 'testing',
+    'AWS_SESSION_TOKEN': 'testing',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'MOTO_EC2_LOAD_DEFAULT_AMIS': 'false',
+}
+
+
+def load_script(path: str):
+    """Import a script by its path relative to the repository root."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(ROOT_DIR, path)
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextmanager
+def mocked_aws():
+    """
+    Run with moto's mock AWS and fake credentials.
+
+    The sessions and clients cached by aws_clients are cleared on entry and
+    exit, so no client outlives the mock it was created under.
+    """
+    from moto import mock_aws
+
+    with mock.patch.dict(os.environ, FAKE_ENVIRONMENT), mock_aws():
+        aws_clients.clear_cache()
+        try:
+            yield
+        finally:
+            aws_clients.clear_cache()
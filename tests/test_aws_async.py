@@ -0,0 +1,128 @@
+import asyncio
+import operator
+import unittest
+from contextlib import asynccontextmanager
+from unittest import mock
+
+from support import load_script
+
+import aws_async
+
+
+class InFlight:
+    """Records the highest number of calls running at once."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    async def call(self, delay: float = 0.001):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.current -= 1
+
+
+class BoundedMapTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_limits_calls_in_flight(self):
+        in_flight = InFlight()
+
+        async def work(item):
+            await in_flight.call()
+            return item * 2
+
+        results = await aws_async.bounded_map(work, range(50), 5)
+        self.assertEqual(sorted(results), [item * 2 for item in range(50)])
+        self.assertEqual(in_flight.peak, 5)
+
+    async def test_folds_or_discards_results(self):
+        async def work(item):
+            return item
+
+        total = await aws_async.bounded_map(
+            work, range(100), 8, fold=operator.add, initial=0
+        )
+        self.assertEqual(total, 4950)
+        discarded = await aws_async.bounded_map(
+            work, range(100), 8, fold=aws_async.discard
+        )
+        self.assertIsNone(discarded)
+
+    async def test_consumes_async_iterables(self):
+        async def work(item):
+            return item
+
+        items = aws_async.iterate_in_thread(iter(range(10)), chunk_size=3)
+        results = await aws_async.bounded_map(work, items, 4)
+        self.assertEqual(sorted(results), list(range(10)))
+
+    async def test_error_cancels_pending_calls_and_propagates(self):
+        cancelled = []
+        submitted = []
+
+        async def work(item):
+            submitted.append(item)
+            if item == 3:
+                raise ValueError("call failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(item)
+                raise
+
+        with self.assertRaises(ValueError):
+            await aws_async.bounded_map(work, range(1000), 4)
+        # Items are consumed lazily, so the failure stops submission early.
+        self.assertLess(len(submitted), 10)
+        self.assertEqual(
+            sorted(cancelled), [item for item in submitted if item != 3]
+        )
+
+
+class FakeS3:
+    """Async S3 client whose DeleteObjects fails for keys named 'locked*'."""
+
+    def __init__(self):
+        self.in_flight = InFlight()
+        self.batches = []
+
+    async def delete_objects(self, Bucket, Delete):
+        await self.in_flight.call()
+        keys = [obj['Key'] for obj in Delete['Objects']]
+        self.batches.append(keys)
+        return {'Errors': [
+            {'Key': key, 'Code': 'AccessDenied', 'Message': 'Access Denied'}
+            for key in keys if key.startswith('locked')
+        ]}
+
+
+class DeleteExpiredAsyncTest(unittest.TestCase):
+
+    def test_deletes_batches_with_fake_client(self):
+        cleaner = load_script('S3 Object Cleaner/delete_old_s3_objects.py')
+        s3 = FakeS3()
+
+        @asynccontextmanager
+        async def create_client(service, region=None, profile=None,
+                                max_pool_connections=None):
+            yield s3
+
+        batches = ([f"{prefix}-{batch}-{index}" for index in range(10)]
+                   for batch in range(20) for prefix in ('old', 'locked'))
+        with mock.patch.object(aws_async, 'create_client', create_client), \
+                self.assertLogs(level='ERROR') as logs:
+            deleted = asyncio.run(
+                cleaner.delete_expired_async(batches, 'bucket', workers=3)
+            )
+
+        self.assertEqual(deleted, 200)
+        self.assertEqual(len(s3.batches), 40)
+        self.assertLessEqual(s3.in_flight.peak, 3)
+        self.assertEqual(len(logs.output), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
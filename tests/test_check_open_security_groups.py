@@ -0,0 +1,87 @@
+import ipaddress
+import unittest
+
+from support import load_script
+
+checker = load_script('Open SG Checker/check_open_security_groups.py')
+
+
+def network(cidr: str):
+    return ipaddress.ip_network(cidr)
+
+
+class CidrIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = checker.CidrIndex(
+            ['0.0.0.0/0', '10.0.0.0/8', '192.168.1.0/24', '::/0'],
+            max_prefix_length=8, max_ipv6_prefix_length=32
+        )
+
+    def test_rule_containing_watched_networks(self):
+        self.assertEqual(sorted(self.index.matches('0.0.0.0/0'), key=str), [
+            (network('0.0.0.0/0'), 'contains'),
+            (network('10.0.0.0/8'), 'contains'),
+            (network('192.168.1.0/24'), 'contains'),
+        ])
+
+    def test_broad_rule_within_a_watched_network(self):
+        self.assertEqual(self.index.matches('10.0.0.0/8'), [
+            (network('0.0.0.0/0'), 'within'),
+            (network('10.0.0.0/8'), 'contains'),
+        ])
+        self.assertEqual(self.index.matches('128.0.0.0/1'), [
+            (network('0.0.0.0/0'), 'within'),
+            (network('192.168.1.0/24'), 'contains'),
+        ])
+
+    def test_narrow_rules_do_not_match(self):
+        self.assertEqual(self.index.matches('10.1.2.0/24'), [])
+        self.assertEqual(self.index.matches('203.0.113.7/32'), [])
+
+    def test_ipv6_rules_use_their_own_prefix_limit(self):
+        self.assertEqual(self.index.matches('2001:db8::/32'),
+                         [(network('::/0'), 'within')])
+        self.assertEqual(self.index.matches('2001:db8::/48'), [])
+
+    def test_matches_agree_with_a_linear_scan(self):
+        watched = [network(f"10.{i}.0.0/16") for i in range(0, 256, 3)]
+        index = checker.CidrIndex([str(n) for n in watched],
+                                  max_prefix_length=12)
+        for cidr in ('10.0.0.0/8', '10.4.0.0/14', '10.9.0.0/16',
+                     '10.9.1.0/24', '11.0.0.0/8'):
+            rule = network(cidr)
+            expected = [
+                (n, 'contains') if rule.supernet_of(n) else (n, 'within')
+                for n in watched
+                if rule.supernet_of(n)
+                or (n.supernet_of(rule) and rule.prefixlen <= 12)
+            ]
+            self.assertEqual(sorted(index.matches(cidr), key=str),
+                             sorted(expected, key=str), cidr)
+
+
+class ScanRegionTest(unittest.TestCase):
+
+    def test_reports_matching_rules_with_ports(self):
+        groups = [{
+            'GroupId': 'sg-1', 'GroupName': 'web', 'IpPermissions': [
+                {'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22,
+                 'Cidrs': ['0.0.0.0/0', None]},
+                {'IpProtocol': '-1', 'FromPort': None, 'ToPort': None,
+                 'Cidrs': ['10.1.0.0/16']},
+                {'IpProtocol': 'udp', 'FromPort': 1000, 'ToPort': 2000,
+                 'Cidrs': ['::/0']},
+            ]
+        }]
+        index = checker.CidrIndex(['0.0.0.0/0', '::/0'])
+        self.assertEqual(checker.scan_region(groups, 'us-east-1', index), [
+            ('us-east-1', 'sg-1', 'web', '0.0.0.0/0', 'tcp/22',
+             network('0.0.0.0/0'), 'contains'),
+            ('us-east-1', 'sg-1', 'web', '::/0', 'udp/1000-2000',
+             network('::/0'), 'contains'),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
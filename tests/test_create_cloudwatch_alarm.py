@@ -0,0 +1,94 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import boto3
+
+from support import load_script, mocked_aws
+
+alarms = load_script('CloudWatch Alarm Creator/create_cloudwatch_alarm.py')
+
+TOPIC_ARN = 'arn:aws:sns:us-east-1:123456789012:alerts'
+
+
+class ReconcileAlarmsTest(unittest.TestCase):
+
+    def setUp(self):
+        context = mocked_aws()
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+        self.ec2 = boto3.client('ec2')
+        self.cloudwatch = boto3.client('cloudwatch')
+
+    def run_instances(self, count: int, team: str) -> list:
+        response = self.ec2.run_instances(
+            ImageId='ami-12345678', MinCount=count, MaxCount=count,
+            TagSpecifications=[{'ResourceType': 'instance', 'Tags': [
+                {'Key': 'team', 'Value': team}
+            ]}]
+        )
+        return sorted(i['InstanceId'] for i in response['Instances'])
+
+    def reconcile(self, **kwargs) -> str:
+        output = StringIO()
+        with redirect_stdout(output):
+            alarms.reconcile_alarms(TOPIC_ARN, workers=4, **kwargs)
+        return output.getvalue()
+
+    def alarm_thresholds(self) -> dict:
+        paginator = self.cloudwatch.get_paginator('describe_alarms')
+        return {
+            alarm['Dimensions'][0]['Value']: alarm['Threshold']
+            for page in paginator.paginate(
+                AlarmNamePrefix=alarms.ALARM_NAME_PREFIX)
+            for alarm in page['MetricAlarms']
+        }
+
+    def test_puts_only_missing_or_changed_alarms(self):
+        web = self.run_instances(3, 'web')
+        self.run_instances(2, 'batch')
+
+        output = self.reconcile(tags=[('team', 'web')])
+        self.assertIn("3 alarms put, 0 deleted, 0 unchanged", output)
+        self.assertEqual(self.alarm_thresholds(),
+                         {instance_id: 70.0 for instance_id in web})
+
+        output = self.reconcile(tags=[('team', 'web')])
+        self.assertIn("0 alarms put, 0 deleted, 3 unchanged", output)
+
+        self.cloudwatch.put_metric_alarm(**alarms.build_alarm_parameters(
+            web[0], 90.0, TOPIC_ARN
+        ))
+        output = self.reconcile(tags=[('team', 'web')])
+        self.assertIn("1 alarms put, 0 deleted, 2 unchanged", output)
+        self.assertEqual(self.alarm_thresholds()[web[0]], 70.0)
+
+    def test_deletes_alarms_of_terminated_instances(self):
+        web = self.run_instances(3, 'web')
+        self.reconcile(instance_ids=web)
+        self.ec2.terminate_instances(InstanceIds=web[:1])
+
+        output = self.reconcile(instance_ids=web)
+        self.assertIn("0 alarms put, 1 deleted, 2 unchanged", output)
+        self.assertEqual(sorted(self.alarm_thresholds()), web[1:])
+
+    def test_dry_run_changes_nothing(self):
+        web = self.run_instances(2, 'web')
+        output = self.reconcile(instance_ids=web, dry_run=True)
+        self.assertIn("2 alarms to put, 0 to delete, 0 unchanged", output)
+        self.assertEqual(self.alarm_thresholds(), {})
+
+
+class AlarmDiffersTest(unittest.TestCase):
+
+    def test_ignores_order_of_dimensions_and_actions(self):
+        desired = alarms.build_alarm_parameters('i-0abc', 70.0, TOPIC_ARN)
+        existing = dict(desired, AlarmActions=[TOPIC_ARN],
+                        Dimensions=list(reversed(desired['Dimensions'])))
+        self.assertFalse(alarms.alarm_differs(existing, desired))
+        self.assertTrue(alarms.alarm_differs(dict(existing, Period=60),
+                                             desired))
+
+
+if __name__ == '__main__':
+    unittest.main()
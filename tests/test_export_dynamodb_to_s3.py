@@ -0,0 +1,153 @@
+import base64
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import boto3
+
+from support import load_script, mocked_aws
+
+exporter = load_script('DynamoDB Exporter/export_dynamodb_to_s3.py')
+
+ITEM_COUNT = 60
+PAGE_SIZE = 5
+# About 200 KB of incompressible text per item, so a page is about 1 MB
+# and a 5 MB part is uploaded every few pages.
+PADDING_BYTES = 150 * 1024
+
+
+class FlakyDynamoDB:
+    """
+    Wraps a DynamoDB client, limiting pages and failing one Scan call.
+
+    `before_call(n)` runs before the n-th Scan call, e.g. to wait for uploads.
+    """
+
+    def __init__(self, client, fail_on_call: int = None, before_call=None):
+        self.client = client
+        self.fail_on_call = fail_on_call
+        self.before_call = before_call
+        self.calls = 0
+        self.items = 0
+
+    def scan(self, **kwargs):
+        self.calls += 1
+        if self.before_call:
+            self.before_call(self.calls)
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("connection reset")
+        response = self.client.scan(Limit=PAGE_SIZE, **kwargs)
+        self.items += len(response['Items'])
+        return response
+
+
+class StreamExportResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        context = mocked_aws()
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+        self.dynamodb = boto3.client('dynamodb')
+        self.s3 = boto3.client('s3')
+        self.s3.create_bucket(Bucket='exports')
+        self.dynamodb.create_table(
+            TableName='orders',
+            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'id', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        for index in range(ITEM_COUNT):
+            padding = base64.b64encode(os.urandom(PADDING_BYTES)).decode()
+            self.dynamodb.put_item(TableName='orders', Item={
+                'id': {'S': f"order-{index:03d}"}, 'padding': {'S': padding}
+            })
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint_file = os.path.join(directory.name, 'checkpoint.json')
+
+    def export(self, dynamodb, resume=False, **kwargs):
+        exporter.stream_export(
+            dynamodb, self.s3, 'orders', 'exports', 'orders.jsonl',
+            dry_run=False, segments=1, max_read_capacity=None,
+            part_size=exporter.MIN_PART_SIZE,
+            checkpoint_file=self.checkpoint_file, resume=resume, **kwargs
+        )
+
+    def wait_for_first_part(self, call: int) -> None:
+        """Hold back later pages until the first part has been uploaded."""
+        if call < 8:
+            return
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            uploads = self.s3.list_multipart_uploads(Bucket='exports')
+            for upload in uploads.get('Uploads', []):
+                parts = self.s3.list_parts(
+                    Bucket='exports', Key=upload['Key'],
+                    UploadId=upload['UploadId']
+                )
+                if parts.get('Parts'):
+                    return
+            time.sleep(0.05)
+
+    def read_lines(self, key: str, compressed: bool = False) -> list:
+        body = self.s3.get_object(Bucket='exports', Key=key)['Body'].read()
+        if compressed:
+            body = gzip.decompress(body)
+        return [json.loads(line)['id'] for line in body.splitlines()]
+
+    def test_resumes_after_a_failed_scan(self):
+        failing = FlakyDynamoDB(self.dynamodb, fail_on_call=9,
+                                before_call=self.wait_for_first_part)
+        with self.assertRaises(SystemExit), self.assertLogs(level='ERROR'):
+            self.export(failing)
+
+        checkpoint = exporter.load_checkpoint(self.checkpoint_file)
+        # The pages in the uploaded first part were checkpointed.
+        self.assertGreater(checkpoint['item_count'], 0)
+        self.assertLess(checkpoint['item_count'], failing.items)
+        self.assertEqual(len(checkpoint['current']['parts']), 1)
+        self.assertIn('ExclusiveStartKey', checkpoint['positions'][0])
+
+        resumed = FlakyDynamoDB(self.dynamodb)
+        self.export(resumed, resume=True)
+        # Only the items after the checkpoint were scanned again.
+        self.assertEqual(resumed.items,
+                         ITEM_COUNT - checkpoint['item_count'])
+        self.assertFalse(os.path.exists(self.checkpoint_file))
+        ids = self.read_lines('orders.jsonl')
+        self.assertEqual(sorted(ids),
+                         [f"order-{index:03d}" for index in range(ITEM_COUNT)])
+
+    def test_resume_rejects_a_checkpoint_for_other_settings(self):
+        with self.assertRaises(SystemExit), self.assertLogs(level='ERROR'):
+            self.export(FlakyDynamoDB(self.dynamodb, fail_on_call=9))
+        with self.assertRaises(SystemExit), \
+                self.assertLogs(level='ERROR') as logs:
+            self.export(FlakyDynamoDB(self.dynamodb), resume=True,
+                        compression='gzip')
+        self.assertIn('compression', logs.output[0])
+
+    def test_rolls_over_part_files_with_a_manifest(self):
+        self.export(FlakyDynamoDB(self.dynamodb), compression='gzip',
+                    max_file_size=exporter.MIN_PART_SIZE)
+        manifest = json.loads(self.s3.get_object(
+            Bucket='exports', Key='orders.jsonl/manifest.json'
+        )['Body'].read())
+        self.assertEqual(manifest['item_count'], ITEM_COUNT)
+        self.assertGreater(len(manifest['files']), 1)
+        ids = []
+        for entry in manifest['files']:
+            lines = self.read_lines(entry['key'], compressed=True)
+            self.assertEqual(len(lines), entry['item_count'])
+            ids.extend(lines)
+        self.assertEqual(sorted(ids),
+                         [f"order-{index:03d}" for index in range(ITEM_COUNT)])
+
+
+if __name__ == '__main__':
+    unittest.main()
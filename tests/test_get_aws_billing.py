@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from support import load_script
+
+billing = load_script('AWS Billing Retriever/get_aws_billing.py')
+
+
+class FakeCostExplorer:
+    """Cost Explorer client returning one cost per day, two days a page."""
+
+    def __init__(self, amount: float, estimated: set = ()):
+        self.amount = amount
+        self.estimated = set(estimated)
+        self.requests = []
+
+    def get_cost_and_usage(self, **request):
+        self.requests.append(request)
+        start = date.fromisoformat(request['TimePeriod']['Start'])
+        end = date.fromisoformat(request['TimePeriod']['End'])
+        if 'NextPageToken' in request:
+            start = date.fromisoformat(request['NextPageToken'])
+        days = [start + timedelta(days=n) for n in range((end - start).days)]
+        response = {'ResultsByTime': [{
+            'TimePeriod': {'Start': day.isoformat()},
+            'Estimated': day.isoformat() in self.estimated,
+            'Total': {'BlendedCost': {
+                'Amount': str(self.amount), 'Unit': 'USD'
+            }},
+        } for day in days[:2]]}
+        if len(days) > 2:
+            response['NextPageToken'] = days[2].isoformat()
+        return response
+
+    def fetched_ranges(self) -> list:
+        return [(r['TimePeriod']['Start'], r['TimePeriod']['End'])
+                for r in self.requests if 'NextPageToken' not in r]
+
+
+class CostCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = billing.CostCache(':memory:', account='111111111111')
+
+    def tearDown(self):
+        self.cache.close()
+
+    def costs(self, ce, start, end, **kwargs):
+        return list(billing.get_daily_costs(
+            ce, self.cache, start, end, **kwargs
+        ))
+
+    def test_fetches_only_missing_days(self):
+        ce = FakeCostExplorer(1.5)
+        rows = self.costs(ce, date(2023, 1, 1), date(2023, 1, 6))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(ce.fetched_ranges(), [('2023-01-01', '2023-01-06')])
+        # Every page was followed.
+        self.assertEqual(len(ce.requests), 3)
+
+        ce = FakeCostExplorer(1.5)
+        rows = self.costs(ce, date(2022, 12, 30), date(2023, 1, 8))
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(ce.fetched_ranges(), [
+            ('2022-12-30', '2023-01-01'), ('2023-01-06', '2023-01-08')
+        ])
+
+    def test_days_without_costs_are_not_refetched(self):
+        start, end = date(2023, 1, 1), date(2023, 1, 3)
+        ce = FakeCostExplorer(0)
+        ce.get_cost_and_usage = lambda **request: {'ResultsByTime': []}
+        self.assertEqual(self.costs(ce, start, end), [])
+        ce = FakeCostExplorer(1.0)
+        self.assertEqual(self.costs(ce, start, end), [])
+        self.assertEqual(ce.requests, [])
+
+    def test_refreshes_recent_and_estimated_days(self):
+        today = datetime.now(timezone.utc).date()
+        start = today - timedelta(days=10)
+        estimated = {(start + timedelta(days=2)).isoformat()}
+        self.costs(FakeCostExplorer(1.0, estimated), start, today)
+
+        ce = FakeCostExplorer(2.0)
+        rows = self.costs(ce, start, today, refresh_days=3, refresh_ttl=0)
+        self.assertEqual(ce.fetched_ranges(), [
+            ((start + timedelta(days=2)).isoformat(),
+             (start + timedelta(days=3)).isoformat()),
+            ((today - timedelta(days=3)).isoformat(), today.isoformat()),
+        ])
+        self.assertEqual([amount for _, _, amount, _ in rows],
+                         [1.0, 1.0, 2.0, 1.0, 1.0, 1.0, 1.0, 2.0, 2.0, 2.0])
+
+        # Within the TTL, nothing is refetched.
+        ce = FakeCostExplorer(3.0)
+        self.costs(ce, start, today, refresh_days=3, refresh_ttl=3600)
+        self.assertEqual(ce.requests, [])
+
+    def test_accounts_do_not_share_costs(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, 'costs.sqlite3')
+            start, end = date(2023, 1, 1), date(2023, 1, 3)
+            amounts = {}
+            for account, amount in (('1111', 1.0), ('2222', 2.0),
+                                    ('1111', 9.0)):
+                cache = billing.CostCache(path, account=account)
+                ce = FakeCostExplorer(amount)
+                rows = billing.get_daily_costs(ce, cache, start, end)
+                amounts.setdefault(account, []).append(
+                    ([row[2] for row in rows], len(ce.requests))
+                )
+                cache.close()
+        self.assertEqual(amounts, {
+            '1111': [([1.0, 1.0], 1), ([1.0, 1.0], 0)],
+            '2222': [([2.0, 2.0], 1)],
+        })
+
+
+class CostTableTest(unittest.TestCase):
+
+    def test_aggregates_grouped_costs(self):
+        start = date(2023, 1, 1)
+        rows = [
+            (f"2023-01-0{day}", service, amount, 'USD')
+            for day in range(1, 5)
+            for service, amount in (('EC2', day * 10.0), ('S3', 1.0))
+        ]
+        table = billing.CostTable.from_rows(start, date(2023, 1, 5), rows)
+        self.assertEqual(table.total(), 104.0)
+        self.assertEqual(table.top_groups(1), [('EC2', 100.0)])
+        self.assertEqual(list(table.daily_totals('S3')), [1.0] * 4)
+        self.assertEqual(list(table.rolling_average(2)),
+                         [11.0, 16.0, 26.0, 36.0])
+        self.assertEqual(table.period_over_period(2)[0],
+                         ('EC2', 30.0, 70.0))
+
+
+if __name__ == '__main__':
+    unittest.main()